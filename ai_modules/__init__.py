@@ -0,0 +1 @@
+"""AI engines behind the SportAI sidebar optimizations."""
@@ -0,0 +1,157 @@
+"""Batch demand forecasting for every facility surface at once.
+
+booking_data.csv is read in chunks and reduced to booking counts per
+(facility, surface, week, hour-of-week). Those counts become one dense
+array of shape (series, weeks, 168), and a single vectorized fit produces
+a weekly trend and an hour-of-week profile for every series together.
+
+Weeks run Monday to Sunday, like hour-of-week. The first and last week of
+an export are usually partial, so hours before the first booking and after
+the last one count as unobserved: the profile is estimated from observed
+hours only, and the trend weights an edge week by the share of a week's
+demand it covers.
+
+Expected columns: ``surface`` and ``start_time``; ``facility`` is optional
+and defaults to "main".
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_cache import file_hash
+
+HOURS_PER_WEEK = 168
+NS_PER_WEEK = 7 * 24 * 3600 * 10**9
+# The epoch is a Thursday; shifting by three days puts week boundaries on Mondays
+MONDAY_OFFSET_NS = 3 * 24 * 3600 * 10**9
+FIT_ROUNDS = 5
+
+# Fitted models shared by every forecaster in the process, keyed by data hash
+_model_cache: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def hourly_counts(path: str, chunksize: int = 200_000) -> pd.DataFrame:
+    """Booking counts per facility, surface, week and hour-of-week, read chunk by chunk"""
+    partials = []
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        start = pd.to_datetime(chunk['start_time'], errors='coerce')
+        valid = start.notna()
+        if not valid.any():
+            continue
+        start = start[valid]
+        frame = pd.DataFrame({
+            'facility': chunk.loc[valid, 'facility'].astype(str) if 'facility' in chunk else 'main',
+            'surface': chunk.loc[valid, 'surface'].astype(str),
+            'week': (start.values.astype('datetime64[ns]').astype(np.int64) + MONDAY_OFFSET_NS) // NS_PER_WEEK,
+            'hour_of_week': start.dt.dayofweek.values * 24 + start.dt.hour.values,
+        })
+        partials.append(frame.groupby(['facility', 'surface', 'week', 'hour_of_week']).size())
+    if not partials:
+        return pd.DataFrame(columns=['facility', 'surface', 'week', 'hour_of_week', 'bookings'])
+    counts = pd.concat(partials).groupby(level=[0, 1, 2, 3]).sum()
+    return counts.rename('bookings').reset_index()
+
+
+def _weighted_trend(totals: np.ndarray, coverage: np.ndarray, weeks: np.ndarray):
+    """Intercept and slope of full-week totals per series, weighting each week by the share observed"""
+    # Full-week total = observed total / coverage and weight = coverage, so their product is the observed total
+    weight_sum = coverage.sum(axis=1)
+    week_mean = (coverage * weeks).sum(axis=1) / weight_sum
+    total_mean = totals.sum(axis=1) / weight_sum
+    centred = weeks[None, :] - week_mean[:, None]
+    denom = (coverage * centred ** 2).sum(axis=1)
+    slope = np.divide((centred * totals).sum(axis=1), denom, out=np.zeros(len(totals)), where=denom > 1e-12)
+    return total_mean - slope * week_mean, slope
+
+
+def fit_counts(counts: pd.DataFrame) -> Dict[str, object]:
+    """Fit weekly trend and hour-of-week profile for every series in one pass"""
+    series = counts[['facility', 'surface']].drop_duplicates().reset_index(drop=True)
+    if series.empty:
+        return {'series': series, 'intercept': np.zeros(0), 'slope': np.zeros(0),
+                'profile': np.zeros((0, HOURS_PER_WEEK)), 'first_week': 0, 'n_weeks': 0}
+
+    series_idx = pd.MultiIndex.from_frame(series).get_indexer(
+        pd.MultiIndex.from_frame(counts[['facility', 'surface']]))
+    first_week = int(counts['week'].min())
+    n_weeks = int(counts['week'].max()) - first_week + 1
+    demand = np.zeros((len(series), n_weeks, HOURS_PER_WEEK))
+    np.add.at(demand, (series_idx, counts['week'].values - first_week, counts['hour_of_week'].values),
+              counts['bookings'].values)
+
+    # Hours before the first booking and after the last one fall outside the export
+    hours = np.arange(HOURS_PER_WEEK)
+    exposure = np.ones((n_weeks, HOURS_PER_WEEK))
+    exposure[0, hours < counts.loc[counts['week'] == first_week, 'hour_of_week'].min()] = 0
+    exposure[-1, hours > counts.loc[counts['week'] == first_week + n_weeks - 1, 'hour_of_week'].max()] = 0
+
+    # The profile needs the trend to compare hours seen in different weeks, and the trend needs the
+    # profile to know how much of an edge week was seen, so the two are refined together
+    totals = demand.sum(axis=2)
+    hourly_totals = demand.sum(axis=1) + 1.0 / HOURS_PER_WEEK
+    weeks = np.arange(n_weeks, dtype=float)
+    level = np.ones((len(series), n_weeks))
+    for _ in range(FIT_ROUNDS):
+        # Share of a week's bookings falling in each hour, lightly smoothed towards uniform
+        seen = level @ exposure
+        seen = np.where(seen > 0, seen, seen.max(axis=1, keepdims=True))
+        profile = hourly_totals / seen
+        profile /= profile.sum(axis=1, keepdims=True)
+        # Weighted least-squares line through each series' weekly totals, all series at once
+        intercept, slope = _weighted_trend(totals, profile @ exposure.T, weeks)
+        level = np.clip(intercept[:, None] + slope[:, None] * weeks, 1e-9, None)
+
+    return {'series': series, 'intercept': intercept, 'slope': slope, 'profile': profile,
+            'first_week': first_week, 'n_weeks': n_weeks}
+
+
+class DemandForecaster:
+    """Forecast hourly bookings for every facility surface from booking_data.csv.
+
+    Fitted models are cached per process by a hash of the data, so repeated
+    clicks on the same file reuse the fit instead of re-reading the CSV.
+    """
+
+    def __init__(self, chunksize: int = 200_000, cache_size: int = 8):
+        self.chunksize = chunksize
+        self.cache_size = cache_size
+        self.model: Optional[Dict[str, object]] = None
+
+    def fit(self, path: str = 'booking_data.csv') -> 'DemandForecaster':
+        key = file_hash(path)
+        with _cache_lock:
+            model = _model_cache.get(key)
+            if model is not None:
+                _model_cache.move_to_end(key)
+        if model is None:
+            model = fit_counts(hourly_counts(path, self.chunksize))
+            with _cache_lock:
+                _model_cache[key] = model
+                while len(_model_cache) > self.cache_size:
+                    _model_cache.popitem(last=False)
+        self.model = model
+        return self
+
+    def predict(self, horizon_weeks: int = 1) -> pd.DataFrame:
+        """Expected bookings per facility, surface, future week and hour-of-week"""
+        if self.model is None:
+            raise RuntimeError("Call fit() before predict()")
+        model = self.model
+        series = model['series']
+        ahead = model['n_weeks'] + np.arange(horizon_weeks, dtype=float)
+        weekly = np.clip(model['intercept'][:, None] + model['slope'][:, None] * ahead, 0, None)
+        expected = weekly[:, :, None] * model['profile'][:, None, :]
+
+        n_series = len(series)
+        return pd.DataFrame({
+            'facility': np.repeat(series['facility'].values, horizon_weeks * HOURS_PER_WEEK),
+            'surface': np.repeat(series['surface'].values, horizon_weeks * HOURS_PER_WEEK),
+            'weeks_ahead': np.tile(np.repeat(np.arange(1, horizon_weeks + 1), HOURS_PER_WEEK), n_series),
+            'hour_of_week': np.tile(np.arange(HOURS_PER_WEEK), n_series * horizon_weeks),
+            'expected_bookings': expected.reshape(-1),
+        })
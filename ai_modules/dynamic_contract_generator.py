@@ -0,0 +1,329 @@
+"""Contract generation from templates, one at a time or in resumable batches.
+
+Templates live in ``contract_templates/<template_id>.txt`` and use
+``string.Template`` placeholders (``$sponsor_name``). Each template is read
+and compiled once per process and reloaded only when the file changes.
+
+Batches render in a thread pool. If a signing service is configured
+(``SPORTAI_SIGNING_URL``), each contract is submitted through one shared,
+rate-limited client that keeps a keep-alive connection per worker thread.
+Every item's status is stored in SQLite, so rerunning a batch with the same
+batch_id skips the items that already finished.
+
+For local testing, ``python -m ai_modules.dynamic_contract_generator
+--stub-server 8765`` runs a fake signing service.
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import os
+import re
+import sqlite3
+import string
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlsplit
+
+TEMPLATE_DIR = 'contract_templates'
+OUTPUT_DIR = 'contracts'
+STATUS_DB = 'contract_batches.db'
+
+_templates: Dict[str, tuple] = {}
+_template_lock = threading.Lock()
+
+
+def _safe_filename(key: str) -> str:
+    """Filesystem-safe name for a CSV-supplied key; unsafe keys get a hash suffix so they stay distinct"""
+    if re.fullmatch(r'[A-Za-z0-9_-]{1,64}', key):
+        return key
+    slug = re.sub(r'[^A-Za-z0-9_-]+', '_', key).strip('_')[:64] or 'item'
+    return f"{slug}-{hashlib.sha256(key.encode('utf-8')).hexdigest()[:10]}"
+
+
+def _inside(directory: str, name: str) -> str:
+    """directory/name, refusing anything that resolves outside directory"""
+    root = os.path.realpath(directory)
+    path = os.path.realpath(os.path.join(root, name))
+    if os.path.dirname(path) != root:
+        raise ValueError(f"Refusing path outside {directory}: {name!r}")
+    return path
+
+
+def get_template(template_id: str, template_dir: str = TEMPLATE_DIR) -> string.Template:
+    """Compiled template, cached until the file's mtime changes"""
+    if not re.fullmatch(r'[A-Za-z0-9_.-]+', template_id) or template_id.startswith('.'):
+        raise ValueError(f"Invalid template id {template_id!r}")
+    path = os.path.join(template_dir, f"{template_id}.txt")
+    mtime = os.stat(path).st_mtime_ns
+    cached = _templates.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        template = string.Template(f.read())
+    with _template_lock:
+        _templates[path] = (mtime, template)
+    return template
+
+
+def render_contract(template_id: str, data: Dict[str, Any], template_dir: str = TEMPLATE_DIR) -> str:
+    """Fill a template; raises KeyError naming any placeholder missing from data"""
+    return get_template(template_id, template_dir).substitute(data)
+
+
+class RateLimiter:
+    """Token bucket shared by all worker threads"""
+
+    def __init__(self, rate_per_second: float, burst: int = 1):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class SigningClient:
+    """Pooled, rate-limited JSON client for a remote signing service.
+
+    Each worker thread reuses one keep-alive connection; requests that get
+    429 or 5xx are retried with exponential backoff.
+    """
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, rate_per_second: float = 10.0,
+                 burst: int = 5, retries: int = 3, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        self.scheme, self.netloc = parts.scheme, parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.api_key = api_key
+        self.retries = retries
+        self.timeout = timeout
+        self.limiter = RateLimiter(rate_per_second, burst)
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def submit(self, document: Dict[str, Any]) -> Dict[str, Any]:
+        body = json.dumps(document).encode('utf-8')
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            conn = self._connection()
+            try:
+                conn.request('POST', f"{self.base_path}/documents", body=body, headers=headers)
+                response = conn.getresponse()
+                payload = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt == self.retries:
+                    raise
+            else:
+                if response.status < 300:
+                    return json.loads(payload or b'{}')
+                if response.status != 429 and response.status < 500:
+                    raise RuntimeError(f"Signing service returned {response.status}: {payload[:200]!r}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"Signing service returned {response.status} after {attempt + 1} attempts")
+            time.sleep(min(2 ** attempt * 0.25, 8))
+
+
+_clients: Dict[tuple, SigningClient] = {}
+_clients_lock = threading.Lock()
+
+
+def signing_client(api_key: Optional[str]) -> Optional[SigningClient]:
+    """The process-wide client for SPORTAI_SIGNING_URL, or None if not configured"""
+    base_url = os.environ.get('SPORTAI_SIGNING_URL')
+    if not base_url:
+        return None
+    key = (base_url, api_key)
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            rate = float(os.environ.get('SPORTAI_SIGNING_RATE', '10'))
+            client = _clients[key] = SigningClient(base_url, api_key, rate_per_second=rate)
+        return client
+
+
+def generate_contract(template_id: str, data: Dict[str, Any], api_key: Optional[str] = None,
+                      template_dir: str = TEMPLATE_DIR) -> Dict[str, Any]:
+    """Render one contract and submit it for signing if a service is configured"""
+    text = render_contract(template_id, data, template_dir)
+    result = {'template_id': template_id, 'contract': text}
+    client = signing_client(api_key)
+    if client is not None:
+        result['signing'] = client.submit({'template_id': template_id, 'content': text, 'data': data})
+    return result
+
+
+class BatchStatus:
+    """Per-item status rows for contract batches"""
+
+    def __init__(self, path: str = STATUS_DB):
+        self.path = path
+        self._local = threading.local()
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS contract_items ('
+            'batch_id TEXT NOT NULL, item_key TEXT NOT NULL, status TEXT NOT NULL, '
+            'output_path TEXT, signing_id TEXT, error TEXT, updated_at REAL NOT NULL, '
+            'PRIMARY KEY (batch_id, item_key))'
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+        return conn
+
+    def set(self, batch_id: str, item_key: str, status: str, **fields):
+        self._conn().execute(
+            'INSERT INTO contract_items (batch_id, item_key, status, output_path, signing_id, error, updated_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(batch_id, item_key) DO UPDATE SET '
+            'status = excluded.status, output_path = COALESCE(excluded.output_path, output_path), '
+            'signing_id = COALESCE(excluded.signing_id, signing_id), error = excluded.error, '
+            'updated_at = excluded.updated_at',
+            (batch_id, item_key, status, fields.get('output_path'), fields.get('signing_id'),
+             fields.get('error'), time.time()),
+        )
+
+    def items(self, batch_id: str) -> Dict[str, Dict[str, Any]]:
+        rows = self._conn().execute(
+            'SELECT item_key, status, output_path, signing_id, error FROM contract_items WHERE batch_id = ?',
+            (batch_id,),
+        )
+        return {r[0]: {'status': r[1], 'output_path': r[2], 'signing_id': r[3], 'error': r[4]} for r in rows}
+
+
+def generate_contracts_batch(template_id: str, items: Iterable[Dict[str, Any]], api_key: Optional[str] = None,
+                             batch_id: Optional[str] = None, max_workers: int = 8,
+                             output_dir: str = OUTPUT_DIR, status_path: str = STATUS_DB,
+                             template_dir: str = TEMPLATE_DIR) -> Dict[str, Any]:
+    """Render (and optionally submit) many contracts concurrently.
+
+    Each item is a data dict; its ``contract_key`` field, or its position,
+    identifies it within the batch. Passing the batch_id of an earlier run
+    resumes it and skips items that already reached their final status.
+    """
+    batch_id = batch_id or uuid.uuid4().hex[:12]
+    status = BatchStatus(status_path)
+    client = signing_client(api_key)
+    final = 'submitted' if client is not None else 'rendered'
+    done = {k for k, v in status.items(batch_id).items() if v['status'] == final}
+    os.makedirs(output_dir, exist_ok=True)
+    batch_dir = _inside(output_dir, _safe_filename(batch_id))
+    os.makedirs(batch_dir, exist_ok=True)
+    get_template(template_id, template_dir)  # fail fast on a missing template, and warm the cache
+
+    def work(item_key: str, data: Dict[str, Any]):
+        try:
+            text = render_contract(template_id, data, template_dir)
+            output_path = _inside(batch_dir, f"{_safe_filename(item_key)}.txt")
+            with open(output_path, 'w', encoding='utf-8') as f:
+                f.write(text)
+            status.set(batch_id, item_key, 'rendered', output_path=output_path)
+            if client is not None:
+                response = client.submit({'template_id': template_id, 'content': text, 'data': data,
+                                          'reference': f"{batch_id}/{item_key}"})
+                status.set(batch_id, item_key, 'submitted', signing_id=str(response.get('id', '')))
+        except Exception as e:
+            status.set(batch_id, item_key, 'failed', error=f"{type(e).__name__}: {e}")
+
+    pending: List[tuple] = []
+    for position, data in enumerate(items):
+        item_key = str(data.get('contract_key', position))
+        if item_key not in done:
+            pending.append((item_key, data))
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='contracts') as pool:
+        list(pool.map(lambda args: work(*args), pending))
+
+    results = status.items(batch_id)
+    counts: Dict[str, int] = {}
+    for row in results.values():
+        counts[row['status']] = counts.get(row['status'], 0) + 1
+    return {'batch_id': batch_id, 'counts': counts, 'skipped': len(done), 'items': results,
+            'complete': counts.get(final, 0) == len(results)}
+
+
+class StubSigningServer(ThreadingHTTPServer):
+    """Local stand-in for a signing service: accepts POST /documents and returns an id"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, fail_every: int = 0):
+        self.received: List[Dict[str, Any]] = []
+        self.fail_every = fail_every
+        self._count = 0
+        self._count_lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), _StubHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> 'StubSigningServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        server = self.server
+        with server._count_lock:
+            server._count += 1
+            fail = server.fail_every and server._count % server.fail_every == 0
+        if fail:
+            payload, code = b'{"error": "rate limited"}', 429
+        else:
+            server.received.append(json.loads(body or b'{}'))
+            payload, code = json.dumps({'id': uuid.uuid4().hex, 'status': 'sent'}).encode('utf-8'), 201
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Contract generation utilities.')
+    parser.add_argument('--stub-server', type=int, metavar='PORT', help='run a local fake signing service')
+    args = parser.parse_args(argv)
+    if args.stub_server is not None:
+        server = StubSigningServer(args.stub_server)
+        print(f"Stub signing service on {server.url} (set SPORTAI_SIGNING_URL to this)")
+        server.serve_forever()
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,408 @@
+"""Tournament and league fixtures: generation, field packing and referees.
+
+Round-robin rounds come from the circle method, computed as index arrays.
+Pool play splits teams into pools by snake seeding and round-robins each
+pool. Games are then packed into (time slot, field) cells. Teams get a
+minimum rest gap between games and an optional per-day game cap. Each
+team's games are kept as a sorted slot list, so checking a candidate slot
+is a binary search. Referees are matched to the games of each time slot
+as a bipartite matching (qualification level, availability, game cap),
+preferring the least-loaded referees.
+
+One change triggers a local repair, not a regeneration:
+- withdraw(team) frees the team's cells and retries unplaced games there.
+- close_field(field, from_slot, to_slot) moves only the displaced games,
+  to the nearest feasible cell.
+Only the slots those games touch get their referees rematched.
+
+Time is in integer slots: slot = day * slots_per_day + slot_in_day.
+"""
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def round_robin(teams: Sequence[Any], double: bool = False) -> List[List[Tuple[Any, Any]]]:
+    """Rounds of (home, away) pairs where every team meets every other once (twice if double)"""
+    n = len(teams)
+    if n < 2:
+        return []
+    size = n + (n % 2)
+    rounds = []
+    # Circle method: position 0 is fixed, the rest rotate one step per round
+    positions = np.arange(size)
+    for r in range(size - 1):
+        order = np.concatenate(([0], np.roll(positions[1:], r)))
+        home, away = order[:size // 2], order[::-1][:size // 2]
+        pairs = []
+        for i, (h, a) in enumerate(zip(home, away)):
+            if h >= n or a >= n:
+                continue  # bye
+            # Alternate home and away for the fixed team and across tables
+            if (i == 0 and r % 2) or (i and i % 2):
+                h, a = a, h
+            pairs.append((teams[h], teams[a]))
+        rounds.append(pairs)
+    if double:
+        rounds += [[(a, h) for h, a in pairs] for pairs in rounds]
+    return rounds
+
+
+def make_pools(teams: Sequence[Any], pool_size: int) -> List[List[Any]]:
+    """Split seeded teams (best first) into pools by snake seeding"""
+    count = max(1, -(-len(teams) // pool_size))
+    pools: List[List[Any]] = [[] for _ in range(count)]
+    for i, team in enumerate(teams):
+        lap, offset = divmod(i, count)
+        pools[offset if lap % 2 == 0 else count - 1 - offset].append(team)
+    return pools
+
+
+def max_bipartite_matching(adjacency: Dict[Any, List[Any]]) -> Dict[Any, Any]:
+    """Maximum matching of left nodes to right nodes (augmenting paths).
+
+    Each left node's candidate list is tried in order, so callers can list
+    preferred right nodes first.
+    """
+    match_right: Dict[Any, Any] = {}
+
+    def augment(left, seen) -> bool:
+        for right in adjacency[left]:
+            if right in seen:
+                continue
+            seen.add(right)
+            if right not in match_right or augment(match_right[right], seen):
+                match_right[right] = left
+                return True
+        return False
+
+    for left in adjacency:
+        augment(left, set())
+    return {left: right for right, left in match_right.items()}
+
+
+class FixtureState:
+    """Packed fixtures that can absorb withdrawals and field closures"""
+
+    def __init__(self, fields: Sequence[str], days: int, slots_per_day: int, rest_slots: int = 1,
+                 max_per_day: Optional[int] = None):
+        self.fields = [str(f) for f in fields]
+        self.field_index = {f: i for i, f in enumerate(self.fields)}
+        self.days = days
+        self.slots_per_day = slots_per_day
+        self.n_slots = days * slots_per_day
+        self.rest_slots = rest_slots
+        self.max_per_day = max_per_day
+        # busy[slot, field]: 0 free, 1 game, 2 closed
+        self.busy = np.zeros((self.n_slots, len(self.fields)), dtype=np.int8)
+        self.free_count = np.full(self.n_slots, len(self.fields), dtype=np.int32)
+        self.games: Dict[str, Dict[str, Any]] = {}
+        self.cells: Dict[Tuple[int, int], str] = {}
+        self.team_slots: Dict[Any, List[int]] = {}
+        self.team_games: Dict[Any, set] = {}
+        self.unplaced: List[str] = []
+        self.referees: Dict[str, Dict[str, Any]] = {}
+        self.ref_load: Dict[str, int] = {}
+
+    # Packing
+
+    def add_game(self, game_id: str, home: Any, away: Any, pool: str = '', round_no: int = 0, level: int = 0,
+                 earliest: int = 0) -> Optional[Tuple[int, str]]:
+        game = {'game_id': game_id, 'home': home, 'away': away, 'pool': pool, 'round': round_no, 'level': level,
+                'earliest': earliest, 'slot': None, 'field': None, 'referee': None}
+        self.games[game_id] = game
+        for team in (home, away):
+            self.team_games.setdefault(team, set()).add(game_id)
+        # Start after both teams' latest games so rounds stay in order and the scan stays short
+        start = max(earliest, self._ready(home), self._ready(away))
+        if self._place(game, start) or (start > earliest and self._place(game, earliest)):
+            return game['slot'], self.fields[game['field']]
+        self.unplaced.append(game_id)
+        return None
+
+    def _ready(self, team: Any) -> int:
+        slots = self.team_slots.get(team)
+        return slots[-1] + self.rest_slots + 1 if slots else 0
+
+    def _team_ok(self, team: Any, slot: int) -> bool:
+        slots = self.team_slots.get(team, ())
+        i = bisect_left(slots, slot)
+        gap = self.rest_slots + 1
+        if i < len(slots) and slots[i] - slot < gap:
+            return False
+        if i and slot - slots[i - 1] < gap:
+            return False
+        if self.max_per_day is not None:
+            day_start = slot - slot % self.slots_per_day
+            lo, hi = bisect_left(slots, day_start), bisect_left(slots, day_start + self.slots_per_day)
+            if hi - lo >= self.max_per_day:
+                return False
+        return True
+
+    def _candidates(self, start: int, near: bool) -> Iterable[int]:
+        """Slots with a free field, from start forward (or outward from start if near)"""
+        open_slots = np.flatnonzero(self.free_count > 0)
+        later = open_slots[np.searchsorted(open_slots, start):]
+        if not near:
+            return later
+        earlier = open_slots[:np.searchsorted(open_slots, start)][::-1]
+        # Interleave by distance from start so a displaced game moves as little as possible
+        order = np.argsort(np.concatenate((later - start, start - earlier)), kind='stable')
+        return np.concatenate((later, earlier))[order]
+
+    def _place(self, game: Dict[str, Any], start: int, near: bool = False) -> bool:
+        for slot in self._candidates(start, near):
+            slot = int(slot)
+            if slot < game['earliest']:
+                continue
+            if self._team_ok(game['home'], slot) and self._team_ok(game['away'], slot):
+                field = int(np.argmin(self.busy[slot]))
+                self._occupy(game, slot, field)
+                return True
+        return False
+
+    def _occupy(self, game: Dict[str, Any], slot: int, field: int):
+        self.busy[slot, field] = 1
+        self.free_count[slot] -= 1
+        self.cells[(slot, field)] = game['game_id']
+        game['slot'], game['field'] = slot, field
+        for team in (game['home'], game['away']):
+            insort(self.team_slots.setdefault(team, []), slot)
+
+    def _vacate(self, game: Dict[str, Any]):
+        slot, field = game['slot'], game['field']
+        if slot is None:
+            return
+        if self.busy[slot, field] == 1:
+            self.busy[slot, field] = 0
+            self.free_count[slot] += 1
+        del self.cells[(slot, field)]
+        for team in (game['home'], game['away']):
+            slots = self.team_slots[team]
+            del slots[bisect_left(slots, slot)]
+        self._unassign_referee(game)
+        game['slot'], game['field'] = None, None
+
+    # Referees
+
+    def set_referees(self, referees: Iterable[Dict[str, Any]]):
+        """referees: ``{'id', 'level'=0, 'max_games'=None, 'unavailable'=[slots]}``; assigns every slot"""
+        self.referees = {str(r['id']): {'level': r.get('level', 0), 'max_games': r.get('max_games'),
+                                        'unavailable': set(r.get('unavailable', ()))} for r in referees}
+        self.ref_load = dict.fromkeys(self.referees, 0)
+        for game in self.games.values():
+            game['referee'] = None
+        self._match_slots({g['slot'] for g in self.games.values() if g['slot'] is not None})
+
+    def _unassign_referee(self, game: Dict[str, Any]):
+        if game['referee'] is not None:
+            self.ref_load[game['referee']] -= 1
+            game['referee'] = None
+
+    def _slot_games(self, slot: int) -> List[Dict[str, Any]]:
+        return [self.games[self.cells[(slot, f)]] for f in range(len(self.fields)) if (slot, f) in self.cells]
+
+    def _qualified(self, game: Dict[str, Any], slot: int) -> List[str]:
+        return [ref for ref, info in self.referees.items()
+                if info['level'] >= game['level'] and slot not in info['unavailable']
+                and (info['max_games'] is None or self.ref_load[ref] < info['max_games'])]
+
+    def _match_slots(self, slots: Iterable[int]):
+        """Rematch every game in each slot from scratch"""
+        if not self.referees:
+            return
+        for slot in sorted(slots):
+            games = self._slot_games(slot)
+            for game in games:
+                self._unassign_referee(game)
+            adjacency = {game['game_id']: sorted(self._qualified(game, slot), key=self.ref_load.get)
+                         for game in games}
+            for game_id, ref in max_bipartite_matching(adjacency).items():
+                self.games[game_id]['referee'] = ref
+                self.ref_load[ref] += 1
+
+    def _fill_referees(self, slots: Iterable[int]):
+        """Give games without a referee a free one, rematching a slot only when none is free"""
+        if not self.referees:
+            return
+        for slot in set(slots):
+            games = self._slot_games(slot)
+            busy = {g['referee'] for g in games if g['referee'] is not None}
+            for game in games:
+                if game['referee'] is not None:
+                    continue
+                free = [ref for ref in self._qualified(game, slot) if ref not in busy]
+                if not free:
+                    # An augmenting path may still free a referee by moving others
+                    self._match_slots([slot])
+                    break
+                ref = min(free, key=self.ref_load.get)
+                game['referee'] = ref
+                self.ref_load[ref] += 1
+                busy.add(ref)
+
+    # Incremental repair
+
+    def withdraw(self, team: Any) -> Dict[str, List[str]]:
+        """Remove a team's games and reuse the freed cells for waiting games"""
+        removed = sorted(self.team_games.pop(team, ()))
+        freed, opponents = set(), set()
+        for game_id in removed:
+            game = self.games[game_id]
+            if game['slot'] is not None:
+                freed.add(game['slot'])
+            self._vacate(game)
+            del self.games[game_id]
+            opponent = game['away'] if game['home'] == team else game['home']
+            self.team_games.get(opponent, set()).discard(game_id)
+            opponents.add(opponent)
+        self.unplaced = [g for g in self.unplaced if g in self.games]
+        self.team_slots.pop(team, None)
+        placed = self._retry_unplaced(freed, opponents)
+        # Freed referees may now cover games in those slots that had none
+        self._fill_referees(freed | {self.games[g]['slot'] for g in placed})
+        return {'removed': removed, 'placed': placed}
+
+    def _slot_range(self, from_slot: int, to_slot: Optional[int]) -> Tuple[int, int]:
+        """[from_slot, to_slot) clamped to the schedule; checked before any state changes"""
+        to_slot = self.n_slots if to_slot is None else int(to_slot)
+        from_slot = int(from_slot)
+        if from_slot > to_slot:
+            raise ValueError(f"from_slot {from_slot} is after to_slot {to_slot}")
+        return min(max(from_slot, 0), self.n_slots), min(max(to_slot, 0), self.n_slots)
+
+    def close_field(self, field: str, from_slot: int = 0, to_slot: Optional[int] = None) -> Dict[str, List[str]]:
+        """Close a field for [from_slot, to_slot) and move only the games that were on it"""
+        f = self.field_index[str(field)]
+        from_slot, to_slot = self._slot_range(from_slot, to_slot)
+        displaced = [self.cells[(s, f)] for s in range(from_slot, to_slot) if (s, f) in self.cells]
+        touched = set()
+        original = {}
+        for game_id in displaced:
+            game = self.games[game_id]
+            original[game_id] = game['slot']
+            touched.add(game['slot'])
+            self._vacate(game)
+        for s in range(from_slot, to_slot):
+            if self.busy[s, f] == 0:
+                self.free_count[s] -= 1
+            self.busy[s, f] = 2
+        moved, stranded = [], []
+        for game_id in sorted(displaced, key=original.get):
+            game = self.games[game_id]
+            if self._place(game, original[game_id], near=True):
+                moved.append(game_id)
+                touched.add(game['slot'])
+            else:
+                stranded.append(game_id)
+                self.unplaced.append(game_id)
+        self._fill_referees(touched)
+        return {'moved': moved, 'unplaced': stranded}
+
+    def reopen_field(self, field: str, from_slot: int = 0, to_slot: Optional[int] = None) -> List[str]:
+        """Reopen a closed range; waiting games are retried there"""
+        f = self.field_index[str(field)]
+        from_slot, to_slot = self._slot_range(from_slot, to_slot)
+        for s in range(from_slot, to_slot):
+            if self.busy[s, f] == 2:
+                self.busy[s, f] = 0
+                self.free_count[s] += 1
+        placed = self._retry_unplaced(range(from_slot, to_slot))
+        self._fill_referees({self.games[g]['slot'] for g in placed})
+        return placed
+
+    def _retry_unplaced(self, slots: Iterable[int], relaxed_teams: Iterable[Any] = ()) -> List[str]:
+        """Retry waiting games in newly freed slots.
+
+        Games involving a team whose constraints were relaxed get a full
+        search, since any slot may now fit them.
+        """
+        slots = sorted(set(slots))
+        relaxed = set(relaxed_teams)
+        placed, waiting = [], []
+        for game_id in self.unplaced:
+            game = self.games[game_id]
+            if game['home'] in relaxed or game['away'] in relaxed:
+                ok = self._place(game, game['earliest'])
+            else:
+                ok = self._place_in(game, slots)
+            (placed if ok else waiting).append(game_id)
+        self.unplaced = waiting
+        return placed
+
+    def _place_in(self, game: Dict[str, Any], slots: List[int]) -> bool:
+        for slot in slots:
+            if (self.free_count[slot] > 0 and slot >= game['earliest']
+                    and self._team_ok(game['home'], slot) and self._team_ok(game['away'], slot)):
+                self._occupy(game, slot, int(np.argmin(self.busy[slot])))
+                return True
+        return False
+
+    # Output
+
+    def to_frame(self) -> pd.DataFrame:
+        rows = []
+        for game in self.games.values():
+            slot = game['slot']
+            rows.append({
+                'game_id': game['game_id'], 'pool': game['pool'], 'round': game['round'],
+                'home': game['home'], 'away': game['away'],
+                'day': None if slot is None else slot // self.slots_per_day,
+                'slot': None if slot is None else slot % self.slots_per_day,
+                'field': None if slot is None else self.fields[game['field']],
+                'referee': game['referee'],
+            })
+        frame = pd.DataFrame(rows)
+        return frame.sort_values(['day', 'slot', 'field'], na_position='last').reset_index(drop=True) if rows else frame
+
+    def check(self) -> List[str]:
+        """Constraint violations in the current fixtures (empty when valid)"""
+        problems = []
+        for team, slots in self.team_slots.items():
+            for a, b in zip(slots, slots[1:]):
+                if b - a <= self.rest_slots:
+                    problems.append(f"{team}: games at slots {a} and {b} break the rest gap")
+        seen = {}
+        for game in self.games.values():
+            if game['referee'] is not None and game['slot'] is not None:
+                key = (game['referee'], game['slot'])
+                if key in seen:
+                    problems.append(f"referee {game['referee']} double-booked at slot {game['slot']}")
+                seen[key] = game['game_id']
+        if (self.busy == 1).sum() != len(self.cells):
+            problems.append('field occupancy out of sync with placed games')
+        waiting = set(self.unplaced)
+        for game in self.games.values():
+            if (game['slot'] is None) != (game['game_id'] in waiting):
+                problems.append(f"game {game['game_id']} is neither placed nor waiting to be placed")
+        return problems
+
+
+def build_fixtures(teams: Sequence[Any], fields: Sequence[str], days: int, slots_per_day: int,
+                   pool_size: Optional[int] = None, double: bool = False, rest_slots: int = 1,
+                   max_per_day: Optional[int] = None, referees: Optional[Iterable[Dict[str, Any]]] = None,
+                   levels: Optional[Dict[Any, int]] = None) -> FixtureState:
+    """Generate and pack a league (pool_size None) or pool-play tournament.
+
+    teams are in seed order, best first. levels optionally maps a team to
+    the referee level its games need.
+    """
+    state = FixtureState(fields, days, slots_per_day, rest_slots, max_per_day)
+    pools = make_pools(teams, pool_size) if pool_size else [list(teams)]
+    schedule = []
+    for p, pool in enumerate(pools):
+        name = f"Pool {p + 1}" if pool_size else 'League'
+        for r, pairs in enumerate(round_robin(pool, double)):
+            for i, (home, away) in enumerate(pairs):
+                schedule.append((r, p, i, name, home, away))
+    # Round-major order spreads every pool's games evenly over the slots
+    schedule.sort(key=lambda item: item[:3])
+    levels = levels or {}
+    for r, p, i, name, home, away in schedule:
+        level = max(levels.get(home, 0), levels.get(away, 0))
+        state.add_game(f"{name}-R{r + 1}-G{i + 1}", home, away, name, r + 1, level)
+    if referees is not None:
+        state.set_referees(referees)
+    return state
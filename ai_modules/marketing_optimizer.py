@@ -0,0 +1,222 @@
+"""Vectorized campaign planning across email, SMS and Slack.
+
+Every recipient x channel pair gets an expected value in one pass:
+predicted response x channel lift, weighted up for members at risk of
+churning. Budget allocation is a multiple-choice knapsack (at most one
+channel per recipient, total cost within budget). It is solved through its
+Lagrangian: for a price on spend, each recipient takes the channel with the
+best value minus priced cost. Bisection on that price meets the budget, and
+each step is one array operation over all recipients. Whatever budget the
+priced choice leaves unspent is then filled greedily, adding or upgrading
+channels by value gained per extra cost.
+
+Scored segments are cached by a hash of their rows, so re-planning a
+campaign with a new budget or channel mix reuses the scoring.
+
+invites.csv: ``recipient_id[, segment, response_prob, churn_score, member_id,
+has_email, has_sms, has_slack]``
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+CHANNELS: Dict[str, Dict[str, float]] = {
+    'email': {'cost': 0.002, 'lift': 1.0},
+    'sms': {'cost': 0.02, 'lift': 1.8},
+    'slack': {'cost': 0.0005, 'lift': 0.7},
+}
+DEFAULT_RESPONSE = 0.05
+CHURN_WEIGHT = 1.5
+
+_segment_cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+_cache_lock = threading.Lock()
+SEGMENT_CACHE_SIZE = 256
+
+
+def _segment_key(frame: pd.DataFrame, channels: Dict[str, Dict[str, float]]) -> str:
+    h = hashlib.sha256(repr(sorted((c, v['lift']) for c, v in channels.items())).encode('utf-8'))
+    h.update('|'.join(frame.columns).encode('utf-8'))
+    h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def score_invites(invites: pd.DataFrame, channels: Dict[str, Dict[str, float]] = CHANNELS) -> np.ndarray:
+    """Expected response value per recipient (rows) and channel (columns)"""
+    n = len(invites)
+    response = (pd.to_numeric(invites['response_prob'], errors='coerce').fillna(DEFAULT_RESPONSE).to_numpy(float)
+                if 'response_prob' in invites else np.full(n, DEFAULT_RESPONSE))
+    churn = (pd.to_numeric(invites['churn_score'], errors='coerce').fillna(0).to_numpy(float)
+             if 'churn_score' in invites else np.zeros(n))
+    base = response * (1.0 + CHURN_WEIGHT * churn)
+    lifts = np.array([channels[c]['lift'] for c in channels])
+    values = base[:, None] * lifts[None, :]
+    for j, channel in enumerate(channels):
+        column = f"has_{channel}"
+        if column in invites:
+            reachable = invites[column].fillna(False).astype(bool).to_numpy()
+            values[~reachable, j] = -np.inf
+    return values
+
+
+def _cached_scores(invites: pd.DataFrame, channels: Dict[str, Dict[str, float]]) -> np.ndarray:
+    """Scores assembled segment by segment, reusing segments scored before"""
+    if 'segment' in invites:
+        groups = invites.groupby('segment', sort=False, dropna=False).indices
+    else:
+        groups = {None: np.arange(len(invites))}
+    values = np.empty((len(invites), len(channels)))
+    for rows in groups.values():
+        segment = invites.iloc[rows]
+        key = _segment_key(segment, channels)
+        with _cache_lock:
+            cached = _segment_cache.get(key)
+            if cached is not None:
+                _segment_cache.move_to_end(key)
+        if cached is None:
+            cached = score_invites(segment, channels)
+            with _cache_lock:
+                _segment_cache[key] = cached
+                while len(_segment_cache) > SEGMENT_CACHE_SIZE:
+                    _segment_cache.popitem(last=False)
+        values[rows] = cached
+    return values
+
+
+def allocate_budget(values: np.ndarray, costs: np.ndarray, budget: float, iterations: int = 60):
+    """Pick at most one channel per row to maximise value within budget.
+
+    Returns (channel index per row, -1 for none; price on spend).
+    """
+    def choose(price: float):
+        net = values - price * costs[None, :]
+        best = np.argmax(net, axis=1)
+        chosen = np.where(np.take_along_axis(net, best[:, None], axis=1)[:, 0] > 0, best, -1)
+        spend = costs[chosen[chosen >= 0]].sum()
+        return chosen, spend
+
+    chosen, spend = choose(0.0)
+    if spend <= budget:
+        return chosen, 0.0
+    finite = values[np.isfinite(values)]
+    positive_costs = costs[costs > 0]
+    low, high = 0.0, (finite.max() / positive_costs.min() if finite.size and positive_costs.size else 1.0) * 2
+    best_choice = choose(high)[0]
+    for _ in range(iterations):
+        mid = (low + high) / 2
+        chosen, spend = choose(mid)
+        if spend <= budget:
+            high, best_choice = mid, chosen
+        else:
+            low = mid
+    # The priced choice flips whole groups of equal rows at once and can leave much of the budget unspent
+    filled = _greedy_fill(values, costs, best_choice, budget)
+    cheapest = _cheapest_channel(values, costs, budget)
+    if _plan_value(values, cheapest) > _plan_value(values, filled):
+        filled = cheapest
+    return filled, high
+
+
+def _plan_value(values: np.ndarray, chosen: np.ndarray) -> float:
+    rows = np.flatnonzero(chosen >= 0)
+    return float(values[rows, chosen[rows]].sum())
+
+
+def _plan_spend(costs: np.ndarray, chosen: np.ndarray) -> float:
+    return float(costs[chosen[chosen >= 0]].sum())
+
+
+def _greedy_fill(values: np.ndarray, costs: np.ndarray, chosen: np.ndarray, budget: float,
+                 max_rounds: int = 100) -> np.ndarray:
+    """Spend what is left by adding or upgrading channels in order of value gained per extra cost.
+
+    Each round takes every row's best affordable move, then applies them
+    best-ratio first while they fit.
+    """
+    chosen = chosen.copy()
+    rows = np.arange(len(values))
+    slack = budget * 1e-9
+    for _ in range(max_rounds):
+        remaining = budget - _plan_spend(costs, chosen)
+        current_value = np.where(chosen >= 0, values[rows, np.maximum(chosen, 0)], 0.0)
+        current_cost = np.where(chosen >= 0, costs[np.maximum(chosen, 0)], 0.0)
+        gain = values - current_value[:, None]
+        extra = costs[None, :] - current_cost[:, None]
+        allowed = np.isfinite(gain) & (gain > 0) & (extra <= remaining + slack)
+        if not allowed.any():
+            break
+        # Moves that gain value without costing more come first
+        ratio = np.where(allowed, gain / np.maximum(extra, 1e-12), -np.inf)
+        move = np.argmax(ratio, axis=1)
+        candidates = np.flatnonzero(allowed[rows, move])
+        order = candidates[np.argsort(-ratio[candidates, move[candidates]], kind='stable')]
+        fits = np.cumsum(extra[order, move[order]]) <= remaining + slack
+        # The cumulative sum only grows for positive costs, so the fitting moves are a prefix
+        take = order[:int(np.argmin(fits)) if not fits.all() else len(order)]
+        if not len(take):
+            take = order[:1]
+        chosen[take] = move[take]
+    return chosen
+
+
+def _cheapest_channel(values: np.ndarray, costs: np.ndarray, budget: float) -> np.ndarray:
+    """Baseline plan: each row's cheapest reachable channel, highest value rows first, until the budget runs out"""
+    reachable = np.isfinite(values) & (values > 0)
+    masked_costs = np.where(reachable, costs[None, :], np.inf)
+    channel = np.argmin(masked_costs, axis=1)
+    rows = np.flatnonzero(reachable.any(axis=1))
+    value = values[rows, channel[rows]]
+    order = rows[np.argsort(-value / np.maximum(costs[channel[rows]], 1e-12), kind='stable')]
+    fits = np.cumsum(costs[channel[order]]) <= budget * (1 + 1e-9)
+    chosen = np.full(len(values), -1)
+    chosen[order[fits]] = channel[order[fits]]
+    return chosen
+
+
+def _member_id_text(ids: pd.Series) -> pd.Series:
+    """Ids as the text the score table stores; a numeric column with gaps reads as float, so 101.0 -> '101'"""
+    if ids.dtype.kind == 'f':
+        present = ids.dropna()
+        if (present == present.round()).all():
+            ids = ids.astype('Int64')
+    return ids.astype(str).where(ids.notna())
+
+
+def optimize_campaign(invites: pd.DataFrame, budget: float, channels: Optional[Dict[str, Dict[str, float]]] = None,
+                      churn_db: str = 'churn_scores.db') -> Dict[str, object]:
+    """Plan which channel (if any) each invitee gets within budget.
+
+    If invites has member_id but no churn_score and the churn score table
+    exists, stored churn scores are joined in first.
+    """
+    channels = channels or CHANNELS
+    invites = invites.reset_index(drop=True)
+    if 'churn_score' not in invites and 'member_id' in invites and os.path.exists(churn_db):
+        from ai_modules.membership_churn import load_churn_scores
+        # read_csv gives numeric ids while the score table stores text; compare both as strings
+        invites = invites.assign(member_id=_member_id_text(invites['member_id']))
+        scores = load_churn_scores(member_ids=invites['member_id'].dropna().unique(), db_path=churn_db)
+        scores = scores[['member_id', 'score']].assign(member_id=scores['member_id'].astype(str))
+        invites = invites.merge(scores.rename(columns={'score': 'churn_score'}), on='member_id', how='left')
+
+    names = list(channels)
+    costs = np.array([channels[c]['cost'] for c in names])
+    values = _cached_scores(invites, channels)
+    chosen, price = allocate_budget(values, costs, budget)
+
+    picked = chosen >= 0
+    rows = np.flatnonzero(picked)
+    plan = pd.DataFrame({
+        'recipient_id': invites['recipient_id'].to_numpy()[rows],
+        'channel': np.array(names, dtype=object)[chosen[rows]],
+        'expected_response': values[rows, chosen[rows]],
+        'cost': costs[chosen[rows]],
+    })
+    summary = plan.groupby('channel').agg(recipients=('recipient_id', 'size'), spend=('cost', 'sum'),
+                                          expected_responses=('expected_response', 'sum'))
+    return {'plan': plan, 'summary': summary, 'spend': float(plan['cost'].sum()),
+            'unreached': int((~picked).sum()), 'spend_price': price}
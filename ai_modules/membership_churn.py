@@ -0,0 +1,182 @@
+"""Streaming churn scoring with a persisted score table.
+
+member_features.csv is read in fixed-size chunks so memory stays bounded
+however many members there are. Each row's features are hashed. Only
+members that are new or whose hash changed since the last run are scored
+(one vectorized logistic pass per chunk) and written back; members no longer
+in the file are dropped from the table once it has been read. Other tools read
+the stored scores instead of recomputing them:
+
+    from ai_modules.membership_churn import load_churn_scores
+    at_risk = load_churn_scores(min_score=0.7)
+
+Nightly refresh without Streamlit:
+
+    python -m ai_modules.membership_churn member_features.csv
+"""
+import argparse
+import hashlib
+import sqlite3
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_DB = 'churn_scores.db'
+
+# Logistic weights on the feature columns we know about; missing columns count as 0
+DEFAULT_WEIGHTS: Dict[str, float] = {
+    'days_since_last_visit': 0.045,
+    'visits_last_30d': -0.22,
+    'tenure_months': -0.035,
+    'credits_balance': -0.01,
+    'missed_payments': 0.6,
+    'complaints': 0.45,
+}
+DEFAULT_BIAS = -1.0
+RISK_BANDS = [(0.7, 'high'), (0.4, 'medium'), (0.0, 'low')]
+
+
+def connect(db_path: str = DEFAULT_DB) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute(
+        'CREATE TABLE IF NOT EXISTS churn_scores ('
+        'member_id TEXT PRIMARY KEY, feature_hash INTEGER NOT NULL, '
+        'score REAL NOT NULL, risk TEXT NOT NULL, scored_at REAL NOT NULL)'
+    )
+    conn.execute('CREATE INDEX IF NOT EXISTS churn_scores_score ON churn_scores (score)')
+    return conn
+
+
+class ChurnPredictor:
+    """Logistic churn model scored in vectorized chunks against a persisted table"""
+
+    def __init__(self, weights: Optional[Dict[str, float]] = None, bias: float = DEFAULT_BIAS,
+                 db_path: str = DEFAULT_DB, chunksize: int = 50_000):
+        self.weights = dict(weights or DEFAULT_WEIGHTS)
+        self.bias = bias
+        self.db_path = db_path
+        self.chunksize = chunksize
+
+    def predict(self, features: pd.DataFrame) -> np.ndarray:
+        """Churn probability for each row"""
+        logits = np.full(len(features), self.bias)
+        for column, weight in self.weights.items():
+            if column in features:
+                logits += weight * pd.to_numeric(features[column], errors='coerce').fillna(0).to_numpy(float)
+        return 1.0 / (1.0 + np.exp(-logits))
+
+    @staticmethod
+    def risk_band(scores: np.ndarray) -> np.ndarray:
+        bands = np.full(len(scores), RISK_BANDS[-1][1], dtype=object)
+        for threshold, label in reversed(RISK_BANDS[:-1]):
+            bands[scores >= threshold] = label
+        return bands
+
+    def model_salt(self) -> int:
+        """Fingerprint of the weights and bias, so a model change rescores everyone"""
+        model = repr((sorted(self.weights.items()), self.bias)).encode('utf-8')
+        return int.from_bytes(hashlib.sha256(model).digest()[:8], 'little', signed=True)
+
+    def feature_hashes(self, chunk: pd.DataFrame) -> np.ndarray:
+        """Per-row hash of the model's feature columns and parameters, as signed ints SQLite can store"""
+        columns = [c for c in self.weights if c in chunk]
+        hashes = pd.util.hash_pandas_object(chunk[columns], index=False).to_numpy().view(np.int64)
+        return hashes ^ np.int64(self.model_salt())
+
+    def score_file(self, path: str = 'member_features.csv', force: bool = False) -> Dict[str, int]:
+        """Rescore members whose features changed since the last run.
+
+        Returns counts of rows read, members rescored and members removed
+        because they are no longer in the file.
+        """
+        conn = connect(self.db_path)
+        stats = {'rows': 0, 'rescored': 0, 'removed': 0}
+        try:
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS incoming '
+                         '(member_id TEXT PRIMARY KEY, feature_hash INTEGER NOT NULL)')
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS seen (member_id TEXT PRIMARY KEY)')
+            conn.execute('DELETE FROM seen')
+            for chunk in pd.read_csv(path, chunksize=self.chunksize, dtype={'member_id': str}):
+                chunk = chunk.drop_duplicates('member_id', keep='last').reset_index(drop=True)
+                stats['rows'] += len(chunk)
+                with conn:
+                    conn.executemany('INSERT OR IGNORE INTO seen VALUES (?)', zip(chunk['member_id']))
+                hashes = self.feature_hashes(chunk)
+                if force:
+                    changed = chunk
+                else:
+                    changed = chunk[self._changed_mask(conn, chunk['member_id'], hashes)]
+                if changed.empty:
+                    continue
+                scores = self.predict(changed)
+                now = time.time()
+                with conn:
+                    conn.executemany(
+                        'INSERT INTO churn_scores (member_id, feature_hash, score, risk, scored_at) '
+                        'VALUES (?, ?, ?, ?, ?) ON CONFLICT(member_id) DO UPDATE SET '
+                        'feature_hash = excluded.feature_hash, score = excluded.score, '
+                        'risk = excluded.risk, scored_at = excluded.scored_at',
+                        zip(changed['member_id'], hashes[changed.index].tolist(), scores.tolist(),
+                            self.risk_band(scores).tolist(), [now] * len(changed)),
+                    )
+                stats['rescored'] += len(changed)
+            # Only reached once the whole file has been read, so a failed run never drops scores
+            with conn:
+                stats['removed'] = conn.execute(
+                    'DELETE FROM churn_scores WHERE member_id NOT IN (SELECT member_id FROM seen)').rowcount
+        finally:
+            conn.close()
+        return stats
+
+    @staticmethod
+    def _changed_mask(conn: sqlite3.Connection, member_ids: pd.Series, hashes: np.ndarray) -> np.ndarray:
+        """True for rows that are new or whose hash differs from the stored one"""
+        with conn:
+            conn.execute('DELETE FROM incoming')
+            conn.executemany('INSERT INTO incoming VALUES (?, ?)', zip(member_ids, hashes.tolist()))
+        unchanged = {row[0] for row in conn.execute(
+            'SELECT i.member_id FROM incoming i JOIN churn_scores s '
+            'ON s.member_id = i.member_id AND s.feature_hash = i.feature_hash'
+        )}
+        return ~member_ids.isin(unchanged).to_numpy()
+
+
+def load_churn_scores(member_ids: Optional[Iterable[str]] = None, min_score: Optional[float] = None,
+                      db_path: str = DEFAULT_DB) -> pd.DataFrame:
+    """Stored churn scores, optionally for given members or above a score"""
+    conn = connect(db_path)
+    try:
+        query = 'SELECT member_id, score, risk, scored_at FROM churn_scores'
+        clauses, params = [], []
+        if min_score is not None:
+            clauses.append('score >= ?')
+            params.append(min_score)
+        if member_ids is not None:
+            # A temp table join has no limit on how many ids are asked for, unlike IN (?, ?, ...)
+            conn.execute('CREATE TEMP TABLE IF NOT EXISTS wanted (member_id TEXT PRIMARY KEY)')
+            conn.executemany('INSERT OR IGNORE INTO wanted VALUES (?)', ((str(i),) for i in member_ids))
+            clauses.append('member_id IN (SELECT member_id FROM wanted)')
+        if clauses:
+            query += ' WHERE ' + ' AND '.join(clauses)
+        return pd.read_sql_query(query + ' ORDER BY score DESC', conn, params=params)
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Rescore members whose features changed.')
+    parser.add_argument('path', nargs='?', default='member_features.csv')
+    parser.add_argument('--db', default=DEFAULT_DB)
+    parser.add_argument('--force', action='store_true', help='rescore every member')
+    args = parser.parse_args(argv)
+    stats = ChurnPredictor(db_path=args.db).score_file(args.path, force=args.force)
+    print(f"{stats['rows']} members read, {stats['rescored']} rescored, {stats['removed']} removed")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,190 @@
+"""Constraint-based facility scheduling with incremental re-solve.
+
+Resources are indexed by surface type. Each resource keeps its bookings as a
+sorted interval list, so a conflict check is a binary search rather than a
+scan. Requests that could not be placed are indexed by (surface, hour slot).
+Cancelling a booking then retries only the waiting requests that overlap the
+freed time, and adding a booking touches only its own surface.
+
+resources.json: ``[{"id": "turf-1", "surface": "turf"}, ...]``
+schedule_requests.csv: ``request_id, surface, start, end[, priority]`` with
+ISO timestamps. Higher priority is placed first.
+"""
+import csv
+import json
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+SLOT_MINUTES = 60
+
+
+def to_minutes(value: Any) -> int:
+    """Minutes since the epoch for an ISO string, datetime or number"""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    return int(value.timestamp() // 60)
+
+
+class ResourceCalendar:
+    """Non-overlapping bookings on one resource, kept sorted by start"""
+
+    def __init__(self, resource_id: str):
+        self.resource_id = resource_id
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.request_ids: List[str] = []
+
+    def is_free(self, start: int, end: int) -> bool:
+        i = bisect_right(self.starts, start)
+        if i and self.ends[i - 1] > start:
+            return False
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def gap_before(self, start: int) -> int:
+        """Idle minutes between the previous booking and start; smaller is a tighter fit"""
+        i = bisect_right(self.starts, start)
+        return start - self.ends[i - 1] if i else start
+
+    def book(self, start: int, end: int, request_id: str):
+        i = bisect_left(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.request_ids.insert(i, request_id)
+
+    def release(self, start: int, request_id: str):
+        i = bisect_left(self.starts, start)
+        while self.request_ids[i] != request_id:
+            i += 1
+        del self.starts[i], self.ends[i], self.request_ids[i]
+
+
+class ScheduleState:
+    """A solved schedule that can absorb single adds and cancellations"""
+
+    def __init__(self, resources: Iterable[Dict[str, Any]]):
+        self.calendars: Dict[str, ResourceCalendar] = {}
+        self.by_surface: Dict[str, List[ResourceCalendar]] = {}
+        for resource in resources:
+            calendar = ResourceCalendar(str(resource['id']))
+            self.calendars[calendar.resource_id] = calendar
+            self.by_surface.setdefault(str(resource['surface']), []).append(calendar)
+        self.requests: Dict[str, Tuple[str, int, int, float]] = {}
+        self.assignments: Dict[str, str] = {}
+        self.waiting: Dict[Tuple[str, int], set] = {}
+
+    @staticmethod
+    def _slots(start: int, end: int) -> range:
+        return range(start // SLOT_MINUTES, (end - 1) // SLOT_MINUTES + 1)
+
+    def _place(self, request_id: str) -> bool:
+        surface, start, end, _ = self.requests[request_id]
+        best, best_gap = None, None
+        for calendar in self.by_surface.get(surface, ()):
+            if calendar.is_free(start, end):
+                gap = calendar.gap_before(start)
+                if best is None or gap < best_gap:
+                    best, best_gap = calendar, gap
+                    if gap == 0:
+                        break
+        if best is None:
+            return False
+        best.book(start, end, request_id)
+        self.assignments[request_id] = best.resource_id
+        return True
+
+    def _wait(self, request_id: str):
+        surface, start, end, _ = self.requests[request_id]
+        for slot in self._slots(start, end):
+            self.waiting.setdefault((surface, slot), set()).add(request_id)
+
+    def _unwait(self, request_id: str):
+        surface, start, end, _ = self.requests[request_id]
+        for slot in self._slots(start, end):
+            bucket = self.waiting.get((surface, slot))
+            if bucket is not None:
+                bucket.discard(request_id)
+                if not bucket:
+                    del self.waiting[(surface, slot)]
+
+    def add(self, request: Dict[str, Any]) -> Optional[str]:
+        """Place one request; returns the resource id or None if it has to wait"""
+        request_id = str(request['request_id'])
+        if request_id in self.requests:
+            self.cancel(request_id)
+        self._register(request)
+        if self._place(request_id):
+            return self.assignments[request_id]
+        self._wait(request_id)
+        return None
+
+    def cancel(self, request_id: str) -> List[str]:
+        """Drop a request and retry waiting requests that overlap the freed time.
+
+        Returns the ids of requests that were placed as a result.
+        """
+        request_id = str(request_id)
+        if request_id not in self.requests:
+            return []
+        surface, start, end, _ = self.requests[request_id]
+        resource_id = self.assignments.pop(request_id, None)
+        if resource_id is None:
+            self._unwait(request_id)
+            del self.requests[request_id]
+            return []
+        self.calendars[resource_id].release(start, request_id)
+        del self.requests[request_id]
+
+        candidates = set()
+        for slot in self._slots(start, end):
+            candidates.update(self.waiting.get((surface, slot), ()))
+        placed = []
+        for candidate in sorted(candidates, key=self._order):
+            if self._place(candidate):
+                self._unwait(candidate)
+                placed.append(candidate)
+        return placed
+
+    def _register(self, request: Dict[str, Any]):
+        request_id = str(request['request_id'])
+        start, end = to_minutes(request['start']), to_minutes(request['end'])
+        if end <= start:
+            raise ValueError(f"Request {request_id} ends before it starts")
+        self.requests[request_id] = (str(request['surface']), start, end, float(request.get('priority') or 0))
+
+    def _order(self, request_id: str) -> Tuple[float, int, str]:
+        _, start, _, priority = self.requests[request_id]
+        return (-priority, start, request_id)
+
+    def solve(self, requests: Iterable[Dict[str, Any]]):
+        """Place a batch of requests, highest priority then earliest start first"""
+        for request in requests:
+            self._register(request)
+        for request_id in sorted(self.requests, key=self._order):
+            if request_id not in self.assignments and not self._place(request_id):
+                self._wait(request_id)
+        return self
+
+    def unscheduled(self) -> List[str]:
+        return sorted(r for r in self.requests if r not in self.assignments)
+
+
+def load_resources(path: str = 'resources.json') -> List[Dict[str, Any]]:
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def load_requests(path: str = 'schedule_requests.csv') -> List[Dict[str, Any]]:
+    with open(path, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def optimize_schedule(requests: Iterable[Dict[str, Any]], resources: Iterable[Dict[str, Any]]) -> ScheduleState:
+    """Assign every request to a free resource of its surface type.
+
+    Returns the ScheduleState so callers can keep adding or cancelling
+    bookings without re-solving the week.
+    """
+    return ScheduleState(resources).solve(requests)
@@ -0,0 +1,154 @@
+"""Vectorized sponsor-to-asset matching.
+
+Every sponsor x asset pair is scored as a matrix: budget fit (share of the
+sponsor's budget the asset uses, zero when unaffordable), audience overlap
+(Jaccard similarity of audience tags) and category exclusivity (pairs where
+the asset excludes the sponsor's category are ruled out). Only the top-k
+sponsors per asset go into the greedy assignment, which enforces one sponsor
+per asset, sponsor budgets, and one sponsor per category within each zone.
+
+assets.csv: ``asset_id, price[, zone, audience, excluded_categories]``
+sponsors.csv: ``sponsor_id, budget[, category, audience]``
+Tag columns are ``;``-separated.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+BUDGET_WEIGHT = 0.4
+AUDIENCE_WEIGHT = 0.6
+BLOCK_SIZE = 2048
+
+_result_cache: "OrderedDict[str, Dict[str, pd.DataFrame]]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def frame_digest(*frames: pd.DataFrame, extra: str = '') -> str:
+    """Stable hash of DataFrame contents (and column names) for cache keys"""
+    h = hashlib.sha256(extra.encode('utf-8'))
+    for frame in frames:
+        h.update('|'.join(map(str, frame.columns)).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(frame, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _tags(column: pd.Series) -> List[List[str]]:
+    return [[t.strip().lower() for t in str(v).split(';') if t.strip()] if pd.notna(v) else []
+            for v in column]
+
+
+def _tag_matrix(tag_lists: List[List[str]], vocabulary: Dict[str, int]) -> np.ndarray:
+    matrix = np.zeros((len(tag_lists), max(len(vocabulary), 1)), dtype=np.float32)
+    rows = [i for i, tags in enumerate(tag_lists) for t in tags if t in vocabulary]
+    cols = [vocabulary[t] for tags in tag_lists for t in tags if t in vocabulary]
+    matrix[rows, cols] = 1.0
+    return matrix
+
+
+def score_block(price, budget, asset_tags, sponsor_tags, excluded) -> np.ndarray:
+    """Scores for all sponsors (rows) against a block of assets (columns)"""
+    budget_fit = price[None, :] / budget[:, None]
+    inter = sponsor_tags @ asset_tags.T
+    union = sponsor_tags.sum(axis=1)[:, None] + asset_tags.sum(axis=1)[None, :] - inter
+    audience = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+    scores = BUDGET_WEIGHT * budget_fit + AUDIENCE_WEIGHT * audience
+    scores[(budget_fit > 1.0) | excluded] = -np.inf
+    return scores
+
+
+def match_sponsors(assets: pd.DataFrame, sponsors: pd.DataFrame, top_k: int = 5) -> Dict[str, pd.DataFrame]:
+    """Rank sponsors for every asset and pick an exclusivity-respecting assignment.
+
+    Returns ``{'candidates': top_k sponsors per asset, 'assignments': chosen pairs}``.
+    Results are cached per process by a hash of both inputs.
+    """
+    key = frame_digest(assets, sponsors, extra=str(top_k))
+    with _cache_lock:
+        if key in _result_cache:
+            _result_cache.move_to_end(key)
+            return _result_cache[key]
+
+    result = _match(assets.reset_index(drop=True), sponsors.reset_index(drop=True), top_k)
+    with _cache_lock:
+        _result_cache[key] = result
+        while len(_result_cache) > 8:
+            _result_cache.popitem(last=False)
+    return result
+
+
+def _match(assets: pd.DataFrame, sponsors: pd.DataFrame, top_k: int) -> Dict[str, pd.DataFrame]:
+    n_assets, n_sponsors = len(assets), len(sponsors)
+    empty = pd.DataFrame(columns=['asset_id', 'sponsor_id', 'score', 'price'])
+    if not n_assets or not n_sponsors:
+        return {'candidates': empty, 'assignments': empty}
+
+    price = assets['price'].astype(float).to_numpy(np.float32)
+    budget = sponsors['budget'].astype(float).clip(lower=1e-9).to_numpy(np.float32)
+    category = (sponsors['category'].fillna('').astype(str).str.lower() if 'category' in sponsors
+                else pd.Series([''] * n_sponsors))
+    zone = assets['zone'].fillna('').astype(str) if 'zone' in assets else pd.Series([''] * n_assets)
+
+    asset_tag_lists = _tags(assets['audience']) if 'audience' in assets else [[]] * n_assets
+    sponsor_tag_lists = _tags(sponsors['audience']) if 'audience' in sponsors else [[]] * n_sponsors
+    vocabulary = {t: i for i, t in enumerate(sorted({t for tags in asset_tag_lists + sponsor_tag_lists for t in tags}))}
+    asset_tags = _tag_matrix(asset_tag_lists, vocabulary)
+    sponsor_tags = _tag_matrix(sponsor_tag_lists, vocabulary)
+
+    categories = {c: i for i, c in enumerate(sorted(set(category)))}
+    sponsor_category = category.map(categories).to_numpy()
+    excluded_lists = _tags(assets['excluded_categories']) if 'excluded_categories' in assets else [[]] * n_assets
+    excluded_matrix = _tag_matrix(excluded_lists, categories).astype(bool)
+
+    k = min(top_k, n_sponsors)
+    top_sponsors = np.empty((n_assets, k), dtype=np.int64)
+    top_scores = np.empty((n_assets, k), dtype=np.float32)
+    for lo in range(0, n_assets, BLOCK_SIZE):
+        hi = min(lo + BLOCK_SIZE, n_assets)
+        excluded = excluded_matrix[lo:hi][:, sponsor_category].T
+        scores = score_block(price[lo:hi], budget, asset_tags[lo:hi], sponsor_tags, excluded)
+        part = np.argpartition(-scores, k - 1, axis=0)[:k]
+        part_scores = np.take_along_axis(scores, part, axis=0)
+        order = np.argsort(-part_scores, axis=0)
+        top_sponsors[lo:hi] = np.take_along_axis(part, order, axis=0).T
+        top_scores[lo:hi] = np.take_along_axis(part_scores, order, axis=0).T
+
+    flat_scores = top_scores.reshape(-1)
+    valid = np.isfinite(flat_scores)
+    flat_assets = np.repeat(np.arange(n_assets), k)[valid]
+    flat_sponsors = top_sponsors.reshape(-1)[valid]
+    flat_scores = flat_scores[valid]
+    candidates = pd.DataFrame({
+        'asset_id': assets['asset_id'].to_numpy()[flat_assets],
+        'sponsor_id': sponsors['sponsor_id'].to_numpy()[flat_sponsors],
+        'score': flat_scores,
+        'price': price[flat_assets],
+    })
+
+    # Greedy assignment over candidate pairs only, best score first
+    remaining = budget.astype(float).copy()
+    taken_assets = np.zeros(n_assets, dtype=bool)
+    # (zone, category) -> the sponsor that holds it; that sponsor may take more assets in the zone
+    slot_owner: Dict[tuple, int] = {}
+    chosen = []
+    zone_values = zone.to_numpy()
+    category_values = category.to_numpy()
+    for i in np.argsort(-flat_scores, kind='stable'):
+        a, s = flat_assets[i], flat_sponsors[i]
+        if taken_assets[a] or remaining[s] < price[a]:
+            continue
+        slot = (zone_values[a], category_values[s])
+        # Sponsors without a category, or assets without a zone, carry no exclusivity
+        exclusive = bool(slot[0] and slot[1])
+        if exclusive and slot_owner.get(slot, s) != s:
+            continue
+        taken_assets[a] = True
+        remaining[s] -= price[a]
+        if exclusive:
+            slot_owner[slot] = s
+        chosen.append(i)
+    assignments = candidates.iloc[chosen].reset_index(drop=True)
+    return {'candidates': candidates, 'assignments': assignments}
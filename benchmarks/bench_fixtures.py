@@ -0,0 +1,76 @@
+"""Benchmark fixture generation, packing, referee matching and repairs.
+
+    python benchmarks/bench_fixtures.py [--teams 64 256 1024] [--pool-size 4] [--league]
+
+Fields scale with the team count (one per 8 teams) over a three-day event.
+Each row reports the full build (generate, pack, referee matching), then the
+average cost of a single team withdrawal and of closing one field for half a
+day, each repaired incrementally rather than rebuilt.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_modules.fixture_engine import build_fixtures  # noqa: E402
+
+DAYS = 3
+SLOTS_PER_DAY = 12
+
+
+def run(team_counts, pool_size, league, repairs):
+    print(f"{'teams':>6} {'games':>7} {'fields':>6} {'build s':>8} {'unplaced':>8} "
+          f"{'withdraw ms':>11} {'close ms':>9} {'valid':>5}")
+    for n in team_counts:
+        rng = random.Random(n)
+        teams = [f"T{i}" for i in range(n)]
+        fields = [f"F{i}" for i in range(max(2, n // 8))]
+        # League play needs far more slots than a weekend event
+        if league:
+            # Enough slots for each team's rest gaps and for the total field load, plus slack
+            games = n * (n - 1) // 2
+            days = -(-int(max((n - 1) * 2, games / len(fields)) * 1.15) // SLOTS_PER_DAY)
+        else:
+            days = DAYS
+        referees = [{'id': f"R{i}", 'level': rng.randint(0, 2)} for i in range(int(len(fields) * 1.5))]
+        levels = {team: rng.randint(0, 2) for team in teams}
+        started = time.perf_counter()
+        state = build_fixtures(teams, fields, days, SLOTS_PER_DAY, pool_size=None if league else pool_size,
+                               rest_slots=1, max_per_day=None if league else 2, referees=referees, levels=levels)
+        build = time.perf_counter() - started
+        games, unplaced = len(state.games), len(state.unplaced)
+
+        started = time.perf_counter()
+        withdrawn = rng.sample(teams, min(repairs, len(teams)))
+        for team in withdrawn:
+            state.withdraw(team)
+        withdraw_ms = (time.perf_counter() - started) / len(withdrawn) * 1000
+
+        started = time.perf_counter()
+        for field in rng.sample(fields, min(repairs, len(fields))):
+            start = rng.randrange(0, state.n_slots - SLOTS_PER_DAY // 2)
+            state.close_field(field, start, start + SLOTS_PER_DAY // 2)
+        close_ms = (time.perf_counter() - started) / min(repairs, len(fields)) * 1000
+
+        valid = 'yes' if not state.check() else 'NO'
+        print(f"{n:>6} {games:>7} {len(fields):>6} {build:>8.3f} {unplaced:>8} "
+              f"{withdraw_ms:>11.2f} {close_ms:>9.2f} {valid:>5}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--teams', type=int, nargs='+', default=[64, 256, 1024])
+    parser.add_argument('--pool-size', type=int, default=4)
+    parser.add_argument('--league', action='store_true', help='full round robin instead of pool play')
+    parser.add_argument('--repairs', type=int, default=10, help='withdrawals and field closures to time')
+    args = parser.parse_args(argv)
+    if args.repairs < 1:
+        parser.error('--repairs must be at least 1')
+    run(args.teams, args.pool_size, args.league, args.repairs)
+
+
+if __name__ == '__main__':
+    main()
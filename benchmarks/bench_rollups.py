@@ -0,0 +1,80 @@
+"""Benchmark dashboard reads from the usage rollups as history grows.
+
+    python benchmarks/bench_rollups.py [--years 0.5 1 5]
+
+For each history length, synthetic bookings are ingested in weekly chunks,
+then a facility heatmap and a 30-day daily revenue series are read. For
+comparison, the same heatmap is also computed by re-aggregating the raw
+bookings, the way the dashboards used to on every render.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from usage_rollups import UsageRollups  # noqa: E402
+
+FACILITIES = ['North Dome', 'South Fields', 'Ice Center']
+SURFACES = ['turf', 'court', 'dome', 'ice', 'diamond']
+
+
+def synthetic_bookings(years: float, per_day: int = 400, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    days = int(years * 365)
+    n = days * per_day
+    day = np.repeat(np.arange(days), per_day)
+    start = (pd.Timestamp('2021-01-04') + pd.to_timedelta(day, 'D')
+             + pd.to_timedelta(rng.integers(12, 44, n) * 30, 'min'))
+    return pd.DataFrame({
+        'booking_id': np.arange(n).astype(str),
+        'facility': rng.choice(FACILITIES, n),
+        'surface': rng.choice(SURFACES, n),
+        'start': start,
+        'end': start + pd.to_timedelta(rng.choice([30, 60, 90, 120], n), 'min'),
+        'revenue': rng.choice([40.0, 80.0, 120.0, 160.0], n),
+    })
+
+
+def raw_heatmap(bookings: pd.DataFrame, facility: str) -> pd.DataFrame:
+    subset = bookings[bookings['facility'] == facility]
+    hours = (subset['end'] - subset['start']).dt.total_seconds() / 3600
+    return hours.groupby([subset['start'].dt.weekday, subset['start'].dt.hour]).sum().unstack(fill_value=0)
+
+
+def timed(func, repeat: int = 20) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - started) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[0])
+    parser.add_argument('--years', type=float, nargs='+', default=[0.5, 1, 5])
+    args = parser.parse_args()
+    print(f"{'years':>6} {'bookings':>10} {'ingest s':>9} {'heatmap ms':>11} {'series ms':>10} {'raw ms':>8}")
+    for years in args.years:
+        bookings = synthetic_bookings(years)
+        with tempfile.TemporaryDirectory() as tmp:
+            rollups = UsageRollups(os.path.join(tmp, 'rollups.db'))
+            started = time.perf_counter()
+            weeks = (bookings['start'] - bookings['start'].min()).dt.days // 7
+            for _, chunk in bookings.groupby(weeks, sort=True):
+                rollups.ingest_bookings(chunk)
+            ingest = time.perf_counter() - started
+            end = bookings['start'].max()
+            heatmap = timed(lambda: rollups.heatmap('hours', facility='North Dome'))
+            series = timed(lambda: rollups.series('revenue', 'day', start=end - pd.Timedelta(days=30), end=end,
+                                                  facility='North Dome'))
+            raw = timed(lambda: raw_heatmap(bookings, 'North Dome'), repeat=3)
+        print(f"{years:>6} {len(bookings):>10} {ingest:>9.2f} {heatmap:>11.3f} {series:>10.3f} {raw:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,82 @@
+"""Benchmark the schedule optimizer on synthetic weekly workloads.
+
+    python benchmarks/bench_scheduling.py [--sizes 10000 50000 100000]
+
+Reports the full solve time for each request count, then the average cost
+of adding and cancelling single bookings on the solved week.
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_modules.scheduling_optimizer import optimize_schedule  # noqa: E402
+
+SURFACES = ['turf', 'court', 'dome', 'ice', 'diamond']
+WEEK_MINUTES = 7 * 24 * 60
+
+
+def synthetic_workload(n_requests: int, per_surface: int = 8, per_week: int = 2000, seed: int = 0):
+    """A season of 30-120 minute requests on half-hour boundaries over a fixed facility.
+
+    The number of weeks grows with the request count, so per-week load (and the
+    share of requests that fit) stays the same at every size.
+    """
+    rng = random.Random(seed)
+    weeks = max(1, -(-n_requests // per_week))
+    resources = [{'id': f"{surface}-{i}", 'surface': surface}
+                 for surface in SURFACES for i in range(per_surface)]
+    requests = []
+    for i in range(n_requests):
+        start = rng.randrange(0, weeks * WEEK_MINUTES // 30) * 30
+        requests.append({
+            'request_id': f"r{i}",
+            'surface': rng.choice(SURFACES),
+            'start': start,
+            'end': start + rng.choice([30, 60, 90, 120]),
+            'priority': rng.randint(0, 3),
+        })
+    return requests, resources
+
+
+def run(sizes, incremental_ops: int = 1000):
+    print(f"{'requests':>9} {'resources':>9} {'solve s':>9} {'placed %':>9} {'add us':>9} {'cancel us':>10}")
+    for size in sizes:
+        requests, resources = synthetic_workload(size)
+        started = time.perf_counter()
+        state = optimize_schedule(requests, resources)
+        solve_seconds = time.perf_counter() - started
+        placed = 100.0 * len(state.assignments) / size
+
+        rng = random.Random(1)
+        horizon = max(r['end'] for r in requests)
+        started = time.perf_counter()
+        for i in range(incremental_ops):
+            start = rng.randrange(0, horizon // 30) * 30
+            state.add({'request_id': f"extra{i}", 'surface': rng.choice(SURFACES),
+                       'start': start, 'end': start + 60})
+        add_us = (time.perf_counter() - started) / incremental_ops * 1e6
+
+        assigned = list(state.assignments)
+        victims = rng.sample(assigned, min(incremental_ops, len(assigned)))
+        started = time.perf_counter()
+        for request_id in victims:
+            state.cancel(request_id)
+        cancel_us = (time.perf_counter() - started) / max(len(victims), 1) * 1e6
+
+        print(f"{size:>9} {len(resources):>9} {solve_seconds:>9.3f} {placed:>9.1f} {add_us:>9.1f} {cancel_us:>10.1f}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+    parser.add_argument('--ops', type=int, default=1000, help='incremental adds/cancels to time')
+    args = parser.parse_args(argv)
+    run(args.sizes, args.ops)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Load test for the SportAIApp shell and tools with many concurrent sessions.
+
+    python benchmarks/load_test.py --workers 4 --sessions 8 --iterations 20
+    python benchmarks/load_test.py ... --save-baseline benchmarks/baseline.json
+    python benchmarks/load_test.py ... --compare benchmarks/baseline.json   # exits 1 on regression
+
+Sessions are driven headlessly through Streamlit's AppTest. Each worker is
+its own process, like one Streamlit server worker, so the workers are the
+concurrent load. AppTest is not thread-safe, so a worker's sessions take
+turns step by step: they share that process's caches but never overlap.
+
+Every session logs in, then repeatedly searches for tools, switches to a
+tool and presses an AI sidebar button. The report gives per-step errors
+next to p50, p95 and p99 latency (failed steps are not in the
+percentiles), overall throughput and the peak RSS of each worker. The run
+exits 1 when the error rate goes over --max-error-rate. Pass --workdir to
+run against a directory holding the data files the AI buttons read.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import time
+from typing import Any, Dict, List
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_APP = os.path.join(ROOT, 'sportai_main_app_file.py')
+STEPS = ['login', 'search', 'switch_tool', 'ai_button']
+SEARCH_TERMS = ['schedule', 'revenue', 'sponsor', 'dash', 'member', 'pdf', 'tournament', 'pricing', 'sync']
+AI_BUTTONS = ['📈 Forecast Demand', '📅 Optimize Schedule', '🤝 Match Sponsors', '⚠️ Predict Churn',
+              '📢 Optimize Campaign']
+LOGIN = ('admin@sportai.com', 'admin123')
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class Session:
+    """One simulated user driving an AppTest instance"""
+
+    def __init__(self, app_path: str, rng: random.Random, timeout: float):
+        from streamlit.testing.v1 import AppTest
+        self.at = AppTest.from_file(app_path, default_timeout=timeout)
+        self.rng = rng
+
+    def _check(self):
+        if self.at.exception:
+            raise RuntimeError(self.at.exception[0].message)
+
+    def login(self):
+        at = self.at.run()
+        at.sidebar.text_input(key='login_email').input(LOGIN[0])
+        at.sidebar.text_input(key='login_password').input(LOGIN[1])
+        next(b for b in at.sidebar.button if b.label == 'Login').click().run()
+        self._check()
+        if 'user' not in at.session_state:
+            raise RuntimeError('login failed')
+
+    def _search_box(self):
+        return next(t for t in self.at.sidebar.text_input if 'Search' in t.label)
+
+    def search(self):
+        self._search_box().input(self.rng.choice(SEARCH_TERMS)).run()
+        self._check()
+
+    def switch_tool(self):
+        self._search_box().input('').run()
+        box = self.at.sidebar.selectbox(key='tool_selection')
+        box.select(self.rng.choice(box.options)).run()
+        self._check()
+
+    def ai_button(self):
+        buttons = [b for b in self.at.sidebar.button if b.label in AI_BUTTONS]
+        if buttons:
+            self.rng.choice(buttons).click().run()
+            self._check()
+
+
+def run_worker(args: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one worker's sessions interleaved; returns raw latencies and failures per step"""
+    logging.disable(logging.WARNING)
+    if args['workdir']:
+        os.chdir(args['workdir'])
+    rng = random.Random(args['seed'])
+    latencies: Dict[str, List[float]] = {step: [] for step in STEPS}
+    failed: Dict[str, int] = dict.fromkeys(STEPS, 0)
+    errors: Dict[str, int] = {}
+    sessions: List[Session] = []
+
+    def timed(step: str, func):
+        started = time.perf_counter()
+        try:
+            func()
+        except Exception as e:
+            key = f"{step}: {type(e).__name__}: {str(e)[:80]}"
+            errors[key] = errors.get(key, 0) + 1
+            failed[step] += 1
+            return False
+        latencies[step].append(time.perf_counter() - started)
+        return True
+
+    started = time.perf_counter()
+    for _ in range(args['sessions']):
+        session = Session(args['app'], random.Random(rng.random()), args['timeout'])
+        if timed('login', session.login):
+            sessions.append(session)
+    for _ in range(args['iterations']):
+        for session in sessions:
+            for step in STEPS[1:]:
+                timed(step, getattr(session, step))
+    elapsed = time.perf_counter() - started
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return {'worker': args['worker'], 'latencies': latencies, 'failed': failed, 'errors': errors, 'elapsed': elapsed,
+            'peak_rss_mb': (peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024)}
+
+
+def summarize(results: List[Dict[str, Any]], wall: float) -> Dict[str, Any]:
+    steps = {}
+    for step in STEPS:
+        values = sorted(v for r in results for v in r['latencies'][step])
+        failed = sum(r['failed'][step] for r in results)
+        attempts = len(values) + failed
+        steps[step] = {'count': len(values),
+                       'errors': failed,
+                       'error_rate': failed / attempts if attempts else 0.0,
+                       'p50_ms': percentile(values, 50) * 1000,
+                       'p95_ms': percentile(values, 95) * 1000,
+                       'p99_ms': percentile(values, 99) * 1000}
+    total = sum(s['count'] for s in steps.values())
+    failed = sum(s['errors'] for s in steps.values())
+    errors: Dict[str, int] = {}
+    for r in results:
+        for key, count in r['errors'].items():
+            errors[key] = errors.get(key, 0) + count
+    return {'steps': steps, 'total_steps': total, 'failed_steps': failed,
+            'error_rate': failed / (total + failed) if total + failed else 0.0,
+            'wall_seconds': wall, 'throughput': total / wall if wall else 0,
+            'workers': {r['worker']: round(r['peak_rss_mb'], 1) for r in results}, 'errors': errors}
+
+
+def print_report(summary: Dict[str, Any]):
+    print(f"{'step':<12} {'count':>7} {'errors':>7} {'err %':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for step, row in summary['steps'].items():
+        print(f"{step:<12} {row['count']:>7} {row['errors']:>7} {row['error_rate']:>6.1%} "
+              f"{row['p50_ms']:>9.1f} {row['p95_ms']:>9.1f} {row['p99_ms']:>9.1f}")
+    print(f"\n{summary['total_steps']} steps in {summary['wall_seconds']:.1f}s "
+          f"= {summary['throughput']:.1f} steps/s, {summary['failed_steps']} failed ({summary['error_rate']:.1%})")
+    for worker, rss in sorted(summary['workers'].items()):
+        print(f"worker {worker}: peak RSS {rss} MB")
+    for key, count in sorted(summary['errors'].items()):
+        print(f"ERROR x{count}  {key}")
+
+
+def compare(summary: Dict[str, Any], baseline: Dict[str, Any], tolerance: float, floor_ms: float,
+            max_error_rate: float) -> List[str]:
+    """Steps whose p95 or error rate (or overall throughput) regressed beyond tolerance"""
+    regressions = []
+    for step, row in summary['steps'].items():
+        base = baseline['steps'].get(step)
+        if not base:
+            continue
+        error_limit = max(base.get('error_rate', 0.0), max_error_rate)
+        if row['error_rate'] > error_limit:
+            regressions.append(f"{step}: error rate {row['error_rate']:.1%} > {error_limit:.1%}")
+        if not base['count'] or not row['count']:
+            continue
+        limit = max(base['p95_ms'] * (1 + tolerance), base['p95_ms'] + floor_ms)
+        if row['p95_ms'] > limit:
+            regressions.append(f"{step}: p95 {row['p95_ms']:.1f} ms > {limit:.1f} ms "
+                               f"(baseline {base['p95_ms']:.1f} ms)")
+    if summary['throughput'] < baseline['throughput'] * (1 - tolerance):
+        regressions.append(f"throughput {summary['throughput']:.1f} steps/s < baseline "
+                           f"{baseline['throughput']:.1f} steps/s - {tolerance:.0%}")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description='Load test the SportAI app with concurrent AppTest sessions.')
+    parser.add_argument('--workers', type=int, default=2, help='worker processes')
+    parser.add_argument('--sessions', '--users', dest='sessions', type=int, default=4,
+                        help='sessions per worker, run in turn (the workers run concurrently)')
+    parser.add_argument('--iterations', type=int, default=10, help='search/switch/AI rounds per session')
+    parser.add_argument('--app', default=DEFAULT_APP)
+    parser.add_argument('--workdir', default=None, help='directory with the data files tools read')
+    parser.add_argument('--timeout', type=float, default=60.0, help='per-run AppTest timeout in seconds')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--compare', metavar='PATH', help='fail if p95 or throughput regress against a baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='allowed regression fraction')
+    parser.add_argument('--floor-ms', type=float, default=5.0, help='ignore p95 regressions smaller than this')
+    parser.add_argument('--max-error-rate', type=float, default=0.01,
+                        help='fail when more than this fraction of steps error')
+    args = parser.parse_args(argv)
+
+    jobs = [{'worker': i, 'sessions': args.sessions, 'iterations': args.iterations, 'app': os.path.abspath(args.app),
+             'workdir': args.workdir and os.path.abspath(args.workdir), 'timeout': args.timeout,
+             'seed': args.seed * 1000 + i} for i in range(args.workers)]
+    started = time.perf_counter()
+    with multiprocessing.get_context('spawn').Pool(args.workers) as pool:
+        results = pool.map(run_worker, jobs)
+    summary = summarize(results, time.perf_counter() - started)
+    summary['config'] = {'workers': args.workers, 'sessions': args.sessions, 'iterations': args.iterations}
+    print_report(summary)
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(summary, f, indent=2)
+        print(f"\nBaseline saved to {args.save_baseline}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get('config') != summary['config']:
+            print(f"\nWarning: baseline config {baseline.get('config')} differs from {summary['config']}")
+        regressions = compare(summary, baseline, args.tolerance, args.floor_ms, args.max_error_rate)
+        if regressions:
+            print('\nREGRESSIONS:')
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print('\nNo regressions against baseline.')
+    if summary['error_rate'] > args.max_error_rate or not summary['total_steps']:
+        print(f"\nFAILED: error rate {summary['error_rate']:.1%} > {args.max_error_rate:.1%}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""In-process change feed for booking, check-in and revenue events.
+
+    from change_feed import publish
+    publish('checkin', facility='North Dome', member_id='M123', surface='turf')
+    publish('booking', facility='North Dome', booking_id='B1042', surface='turf',
+            start='2026-05-02 18:00', end='2026-05-02 19:30', amount=120)
+
+Every event gets a sequence number and goes into a bounded ring buffer.
+Consumers remember the last sequence they saw and ask for what came after
+it, so catching up costs the number of new events, never a full reload.
+Anyone who fell further behind than the buffer holds is told there is a
+gap and should refresh from the source of truth.
+
+``live_totals`` subscribes once per process and folds each event into
+today's per-facility counters as it is published. Bookings and revenue
+with an id go into the shared usage rollups, which also seed the counters,
+so totals survive a restart and agree across workers. A dashboard viewer
+reads that snapshot plus its own new events; it never recomputes totals.
+The events themselves do not cross process boundaries.
+"""
+import logging
+import threading
+import time
+from collections import deque
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+EVENT_KINDS = ('booking', 'cancellation', 'checkin', 'revenue')
+
+
+class ChangeFeed:
+    """Sequenced ring buffer with synchronous subscribers"""
+
+    def __init__(self, capacity: int = 10000):
+        self.events = deque(maxlen=capacity)
+        self.seq = 0
+        self._subscribers: List[Tuple[Callable[[Dict[str, Any]], None], Optional[frozenset]]] = []
+        self._cond = threading.Condition()
+
+    def publish(self, kind: str, facility: Optional[str] = None, **data) -> int:
+        """Append an event and run subscribers; returns its sequence number"""
+        with self._cond:
+            self.seq += 1
+            event = {'seq': self.seq, 'kind': kind, 'facility': facility, 'at': time.time(), 'data': data}
+            self.events.append(event)
+            subscribers = list(self._subscribers)
+            self._cond.notify_all()
+        for callback, kinds in subscribers:
+            if kinds is None or kind in kinds:
+                try:
+                    callback(event)
+                except Exception:
+                    # A broken subscriber must not stop the publisher's page from rendering
+                    logger.exception('change feed subscriber failed on %s', kind)
+        return event['seq']
+
+    def since(self, seq: int, kinds: Optional[Iterable[str]] = None) -> Tuple[List[Dict[str, Any]], int, bool]:
+        """(events after seq, latest seq, whether events were lost from the buffer)"""
+        with self._cond:
+            latest = self.seq
+            if seq >= latest:
+                return [], latest, False
+            oldest = self.events[0]['seq'] if self.events else latest + 1
+            gap = seq + 1 < oldest
+            # Walk back from the newest end: the cost is the number of new events
+            count = min(latest - seq, len(self.events))
+            new = list(islice(reversed(self.events), count))[::-1]
+        if kinds is not None:
+            kinds = set(kinds)
+            new = [e for e in new if e['kind'] in kinds]
+        return new, latest, gap
+
+    def wait(self, seq: int, timeout: Optional[float] = None) -> bool:
+        """Block until an event after seq exists (for consumers outside Streamlit)"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.seq > seq, timeout)
+
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None],
+                  kinds: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """Call callback for every published event (in the publisher's thread); returns an unsubscribe function"""
+        entry = (callback, frozenset(kinds) if kinds is not None else None)
+        with self._cond:
+            self._subscribers.append(entry)
+
+        def unsubscribe():
+            with self._cond:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        return unsubscribe
+
+
+class LiveTotals:
+    """Today's per-facility counters: the usage rollups plus this process's own events.
+
+    Booking, cancellation and revenue events that carry an id (booking_id or
+    txn_id) are folded into the shared usage rollups, and bookings and
+    revenue are read back from there, so every worker shows the same totals
+    and a restart starts from them instead of zero. Check-ins, cancellation
+    counts and events without an id are counted in this process only.
+    """
+
+    COUNTERS = ('bookings', 'cancellations', 'checkins', 'revenue')
+
+    def __init__(self, rollups=None):
+        self.day = date.today()
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._rollups = rollups
+        self._base: Dict[str, Dict[str, float]] = {}
+        self._base_key: Optional[Tuple[date, int]] = None
+        self._lock = threading.Lock()
+
+    def rollups(self):
+        if self._rollups is None:
+            from usage_rollups import get_rollups
+            self._rollups = get_rollups()
+        return self._rollups
+
+    def _roll_up(self, event: Dict[str, Any]) -> bool:
+        """Fold an event into the usage rollups; False if it has to be counted locally"""
+        import pandas as pd
+
+        data, facility = event['data'], event['facility'] or 'All'
+        try:
+            if event['kind'] == 'booking' and {'booking_id', 'surface', 'start'} <= data.keys():
+                start = pd.Timestamp(data['start'])
+                end = pd.Timestamp(data['end']) if data.get('end') else start + pd.Timedelta(hours=1)
+                self.rollups().ingest_bookings(pd.DataFrame([{
+                    'booking_id': data['booking_id'], 'facility': facility, 'surface': data['surface'],
+                    'start': start, 'end': end, 'revenue': float(data.get('amount', 0))}]))
+                return True
+            if event['kind'] == 'cancellation' and 'booking_id' in data:
+                self.rollups().cancel_bookings([data['booking_id']])
+                # The rollups net the booking out; the cancellation itself is still counted here
+                return False
+            if event['kind'] == 'revenue' and 'txn_id' in data:
+                self.rollups().ingest_transactions(pd.DataFrame([{
+                    'txn_id': data['txn_id'], 'facility': facility, 'surface': data.get('surface', ''),
+                    'timestamp': datetime.fromtimestamp(event['at']).replace(microsecond=0),
+                    'amount': float(data.get('amount', 0))}]))
+                return True
+        except Exception:
+            logger.exception('could not fold %s event into the usage rollups', event['kind'])
+        return False
+
+    def apply(self, event: Dict[str, Any]):
+        field = {'booking': 'bookings', 'cancellation': 'cancellations', 'checkin': 'checkins',
+                 'revenue': 'revenue'}.get(event['kind'])
+        if field is None:
+            return
+        if self._roll_up(event):
+            return
+        amount = float(event['data'].get('amount', 0)) if field == 'revenue' else 1
+        with self._lock:
+            today = date.fromtimestamp(event['at'])
+            if today != self.day:
+                self.day, self.totals = today, {}
+            counters = self.totals.setdefault(event['facility'] or 'All', dict.fromkeys(self.COUNTERS, 0))
+            counters[field] += amount
+            if field == 'bookings' and 'amount' in event['data']:
+                counters['revenue'] += float(event['data']['amount'])
+
+    def _seed(self):
+        """Reload today's rolled-up totals when the rollups have changed (or the day has)"""
+        today = date.today()
+        try:
+            rollups = self.rollups()
+            key = (today, rollups.version())
+            if key != self._base_key:
+                base = rollups.day_totals(today)
+                with self._lock:
+                    self._base, self._base_key = base, key
+        except Exception:
+            logger.exception('could not read the usage rollups')
+
+    def snapshot(self, facility: Optional[str] = None) -> Dict[str, float]:
+        """Counters for one facility, or summed over all of them"""
+        self._seed()
+        with self._lock:
+            base = self._base if self._base_key and self._base_key[0] == date.today() else {}
+            local = self.totals if date.today() == self.day else {}
+            rows = ([local.get(facility, {}), base.get(facility, {})] if facility
+                    else list(local.values()) + list(base.values()))
+            return {name: sum(row.get(name, 0) for row in rows) for name in self.COUNTERS}
+
+    def facilities(self) -> List[str]:
+        self._seed()
+        with self._lock:
+            return sorted(set(self.totals) | set(self._base))
+
+
+feed = ChangeFeed()
+live_totals = LiveTotals()
+feed.subscribe(live_totals.apply, EVENT_KINDS)
+
+
+def publish(kind: str, facility: Optional[str] = None, **data) -> int:
+    return feed.publish(kind, facility, **data)
@@ -0,0 +1,202 @@
+"""Shared, process-wide cache for the CSV and JSON datasets tools read.
+
+    from data_cache import load_csv, load_json
+    assets = load_csv('assets.csv')
+
+Each file is parsed once per process and kept in memory until it changes or
+is evicted. A change is noticed by mtime/size and confirmed by content hash,
+so touching a file without editing it costs a hash, not a parse. Parsed CSVs
+are also written to an Arrow (Feather) copy in the cache directory when
+pyarrow is installed, index included. A new worker or a cache miss then
+reads that copy instead of parsing the CSV again, and an edit to the CSV
+replaces its copy rather than adding one. In-memory entries are evicted least
+recently used first once the memory budget (SPORTAI_DATA_CACHE_MB) is
+exceeded.
+
+Frames are shared by every session in the process. Treat them as read-only
+and call ``.copy()`` before modifying one.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+_file_hashes: Dict[str, Tuple[Tuple[int, int], str]] = {}
+_file_hashes_lock = threading.Lock()
+
+
+def file_hash(path: str) -> str:
+    """sha256 of a file's contents, memoised on (path, mtime, size)"""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    version = (stat.st_mtime_ns, stat.st_size)
+    with _file_hashes_lock:
+        known = _file_hashes.get(path)
+    if known is not None and known[0] == version:
+        return known[1]
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    with _file_hashes_lock:
+        _file_hashes[path] = (version, digest)
+    return digest
+
+
+class DatasetCache:
+    """LRU of parsed datasets keyed by path and parse options"""
+
+    def __init__(self, memory_budget_mb: float = 512, cache_dir: str = '.sportai_cache'):
+        self.memory_budget = int(memory_budget_mb * 1024 * 1024)
+        self.cache_dir = cache_dir
+        self.entries: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # A fixed stripe of locks: one parse per key at a time without a lock per key ever seen
+        self._key_locks = [threading.Lock() for _ in range(64)]
+
+    def _key_lock(self, key: tuple) -> threading.Lock:
+        return self._key_locks[hash(key) % len(self._key_locks)]
+
+    def _lookup(self, key: tuple, stat: os.stat_result) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry['stat'] == (stat.st_mtime_ns, stat.st_size):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry
+        return None
+
+    def _store(self, key: tuple, entry: Dict[str, Any]):
+        with self._lock:
+            old = self.entries.pop(key, None)
+            if old is not None:
+                self.used_bytes -= old['bytes']
+            self.entries[key] = entry
+            self.used_bytes += entry['bytes']
+            # Never evict the entry just stored, even if it alone exceeds the budget
+            while self.used_bytes > self.memory_budget and len(self.entries) > 1:
+                _, evicted = self.entries.popitem(last=False)
+                self.used_bytes -= evicted['bytes']
+
+    def _load(self, path: str, kind: str, options: Dict[str, Any], parse) -> Any:
+        path = os.path.abspath(path)
+        key = (path, kind, json.dumps(options, sort_keys=True, default=str))
+        stat = os.stat(path)
+        entry = self._lookup(key, stat)
+        if entry is not None:
+            return entry['data']
+
+        with self._key_lock(key):
+            stat = os.stat(path)
+            entry = self._lookup(key, stat)
+            if entry is not None:
+                return entry['data']
+            self.misses += 1
+            digest = file_hash(path)
+            with self._lock:
+                previous = self.entries.get(key)
+            if previous is not None and previous['hash'] == digest:
+                # Touched but not edited: keep the parsed data
+                data = previous['data']
+            else:
+                data = parse(path, key, digest)
+            if isinstance(data, pd.DataFrame):
+                size = int(data.memory_usage(deep=True).sum())
+            else:
+                size = len(json.dumps(data))
+            self._store(key, {'data': data, 'stat': (stat.st_mtime_ns, stat.st_size), 'hash': digest, 'bytes': size})
+            return data
+
+    def _columnar_path(self, key: tuple, digest: str) -> str:
+        name = hashlib.sha256(repr(key).encode('utf-8')).hexdigest()[:16]
+        return os.path.join(self.cache_dir, f"{name}-{digest[:16]}.feather")
+
+    def _drop_stale_columnar(self, columnar: str):
+        """Delete copies of the same dataset made from earlier versions of the file"""
+        prefix = os.path.basename(columnar).split('-')[0] + '-'
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if (entry.name.startswith(prefix) and entry.name.endswith('.feather')
+                    and entry.path != columnar):
+                try:
+                    os.remove(entry.path)
+                except OSError:
+                    # Another worker removed it first, or still has it open on Windows
+                    pass
+
+    def load_csv(self, path: str, **read_kwargs) -> pd.DataFrame:
+        """Parsed CSV, shared read-only across sessions"""
+        def parse(abspath: str, key: tuple, digest: str) -> pd.DataFrame:
+            columnar = self._columnar_path(key, digest)
+            if ARROW_AVAILABLE and os.path.exists(columnar):
+                try:
+                    return feather.read_table(columnar).to_pandas()
+                except Exception:
+                    pass
+            frame = pd.read_csv(abspath, **read_kwargs)
+            if ARROW_AVAILABLE:
+                self._write_columnar(frame, columnar)
+                self._drop_stale_columnar(columnar)
+            return frame
+        return self._load(path, 'csv', read_kwargs, parse)
+
+    def _write_columnar(self, frame: pd.DataFrame, columnar: str):
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp = f"{columnar}.{os.getpid()}.{threading.get_ident()}.tmp"
+            # Keep the index so index_col= loads match a fresh parse
+            feather.write_feather(pa.Table.from_pandas(frame, preserve_index=True), tmp)
+            os.replace(tmp, columnar)
+        except Exception:
+            # Columns Arrow can't represent just skip the on-disk copy
+            pass
+
+    def load_json(self, path: str) -> Any:
+        """Parsed JSON document, shared read-only across sessions"""
+        def parse(abspath: str, key: tuple, digest: str) -> Any:
+            with open(abspath, 'r') as f:
+                return json.load(f)
+        return self._load(path, 'json', {}, parse)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {'entries': len(self.entries), 'used_mb': self.used_bytes / 1024 / 1024,
+                    'budget_mb': self.memory_budget / 1024 / 1024, 'hits': self.hits, 'misses': self.misses}
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.used_bytes = 0
+
+
+datasets = DatasetCache(
+    memory_budget_mb=float(os.environ.get('SPORTAI_DATA_CACHE_MB', '512')),
+    cache_dir=os.environ.get('SPORTAI_DATA_CACHE_DIR', '.sportai_cache'),
+)
+
+
+def load_csv(path: str, **read_kwargs) -> pd.DataFrame:
+    return datasets.load_csv(path, **read_kwargs)
+
+
+def load_json(path: str) -> Any:
+    return datasets.load_json(path)
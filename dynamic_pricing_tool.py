@@ -0,0 +1,57 @@
+"""Dynamic Pricing Tool: live slot prices and revenue projections.
+
+Prices are read from the process-wide pricing grid, which is built once
+per booking file and then repriced slot by slot as bookings land, so the
+page only slices arrays. Projections compare the dynamic grid against flat
+base rates with the same batched Monte Carlo run.
+"""
+import os
+from datetime import date, timedelta
+
+import streamlit as st
+
+from pricing_engine import get_pricing_engine
+
+
+def run():
+    st.title("💰 Dynamic Pricing Tool")
+    if not os.path.exists('booking_data.csv'):
+        st.info("💡 Add booking_data.csv (facility, surface, start_time[, end_time]) to price upcoming slots")
+        return
+    try:
+        engine = get_pricing_engine()
+    except Exception as e:
+        st.error(f"❌ Error building the price grid: {e}")
+        return
+    if not engine.facilities:
+        st.info("No facilities found in booking_data.csv yet.")
+        return
+
+    col1, col2 = st.columns(2)
+    facility = col1.selectbox("Facility", engine.facilities, key="pricing_facility")
+    day = col2.date_input("Day", value=date.today(), min_value=date.today(),
+                          max_value=date.today() + timedelta(hours=engine.horizon - 1), key="pricing_day")
+    table = engine.price_table(facility, day, day + timedelta(days=1))
+    st.markdown(f"### 🕒 Hourly Prices — {facility}, {day:%a %b %d}")
+    if table.empty:
+        st.markdown("No prices for this day.")
+    else:
+        table.index = table.index.strftime('%H:%M')
+        st.dataframe(table.style.format("${:,.2f}"), use_container_width=True)
+    st.caption(f"Grid version {engine.version}: prices update as bookings and cancellations come in.")
+
+    st.markdown("### 📊 Revenue Projection")
+    n_sims = st.select_slider("Simulations", options=[500, 1000, 2000, 5000, 10000], value=2000,
+                              key="pricing_sims")
+    if st.button("🎲 Run Projection", key="pricing_project"):
+        with st.spinner("Simulating demand..."):
+            dynamic = engine.simulate_revenue(n_sims, seed=0)
+            flat = engine.simulate_revenue(n_sims, prices=engine.flat_prices(), seed=0)
+        uplift = dynamic['mean'] - flat['mean']
+        metric_cols = st.columns(3)
+        metric_cols[0].metric("💰 Expected (dynamic)", f"${dynamic['mean']:,.0f}",
+                              f"{'+' if uplift >= 0 else '-'}${abs(uplift):,.0f} vs flat rates")
+        metric_cols[1].metric("📉 5th percentile", f"${dynamic['p5']:,.0f}")
+        metric_cols[2].metric("📈 95th percentile", f"${dynamic['p95']:,.0f}")
+        st.dataframe(dynamic['by_facility'].round(2).to_frame().assign(
+            flat_rate_revenue=flat['by_facility'].round(2)), use_container_width=True)
@@ -0,0 +1,554 @@
+"""Asynchronous, batched outbound notifications for email, SMS and Slack.
+
+Pages and alert modules call ``notify(...)``. That is one SQLite insert and
+never touches the network. A background asyncio loop drains the outbox:
+
+- one worker per channel claims due messages in batches
+- a per-channel token bucket caps the send rate
+- failed sends are retried with exponential backoff up to MAX_ATTEMPTS;
+  when part of an email batch was delivered, only the rest is retried
+- a pending message with the same (channel, dedupe_key) as one already
+  queued is coalesced into it instead of queued twice
+
+The outbox is a local SQLite file, so queued messages survive restarts.
+Several worker processes can share it: a claimed batch is leased and only
+becomes due again if its sender dies before marking it. The dispatcher
+deletes sent messages older than SPORTAI_OUTBOX_RETENTION_DAYS (default 30)
+about once an hour.
+
+``subscribe_booking_notices()`` queues an email for every booking or
+cancellation published on the change feed with an ``email`` field.
+
+Channels are configured from the environment:
+  email  SPORTAI_SMTP_HOST, SPORTAI_SMTP_PORT, SPORTAI_SMTP_USER,
+         SPORTAI_SMTP_PASSWORD, SPORTAI_SMTP_FROM
+  sms    SPORTAI_SMS_URL    (JSON POST {"messages": [{"to", "body"}, ...]})
+  slack  SPORTAI_SLACK_WEBHOOK_URL  (one post per batch, messages joined)
+
+MockHTTPSink and MockSMTPSink are local stand-ins for testing.
+"""
+import asyncio
+import http.client
+import json
+import os
+import smtplib
+import socketserver
+import sqlite3
+import threading
+import time
+from email.message import EmailMessage
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
+
+OUTBOX_DB = 'notifications.db'
+MAX_ATTEMPTS = 6
+LEASE_SECONDS = 120
+RETENTION_DAYS = float(os.environ.get('SPORTAI_OUTBOX_RETENTION_DAYS', '30'))
+PURGE_INTERVAL = 3600
+
+
+class Outbox:
+    """Persistent message queue in SQLite"""
+
+    def __init__(self, path: str = OUTBOX_DB):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS outbox ('
+            'id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, recipient TEXT NOT NULL, '
+            'subject TEXT NOT NULL DEFAULT "", body TEXT NOT NULL, dedupe_key TEXT, '
+            'status TEXT NOT NULL DEFAULT "pending", attempts INTEGER NOT NULL DEFAULT 0, '
+            'next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, last_error TEXT, sent_at REAL)'
+        )
+        if 'sent_at' not in {row[1] for row in conn.execute('PRAGMA table_info(outbox)')}:
+            conn.execute('ALTER TABLE outbox ADD COLUMN sent_at REAL')
+        conn.execute('CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, channel, next_attempt_at)')
+        # Coalescing: at most one pending message per (channel, dedupe_key)
+        conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS outbox_dedupe ON outbox (channel, dedupe_key) '
+                     "WHERE status = 'pending' AND dedupe_key IS NOT NULL")
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def put(self, channel: str, recipient: str, body: str, subject: str = '',
+            dedupe_key: Optional[str] = None) -> bool:
+        """Queue a message; False if it was coalesced into an identical pending one"""
+        now = time.time()
+        cursor = self._conn().execute(
+            'INSERT OR IGNORE INTO outbox (channel, recipient, subject, body, dedupe_key, next_attempt_at, created_at) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (channel, recipient, subject, body, dedupe_key, now, now),
+        )
+        return cursor.rowcount == 1
+
+    def put_many(self, messages: List[Dict[str, Any]]) -> int:
+        """Queue many messages in one transaction; returns how many were not coalesced"""
+        now = time.time()
+        conn = self._conn()
+        before = conn.total_changes
+        with conn:
+            conn.execute('BEGIN')
+            conn.executemany(
+                'INSERT OR IGNORE INTO outbox (channel, recipient, subject, body, dedupe_key, next_attempt_at, '
+                'created_at) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                [(m['channel'], m['recipient'], m.get('subject', ''), m['body'], m.get('dedupe_key'), now, now)
+                 for m in messages],
+            )
+        return conn.total_changes - before
+
+    def claim(self, channel: str, limit: int) -> List[Dict[str, Any]]:
+        """Lease up to limit due messages for one channel"""
+        conn = self._conn()
+        now = time.time()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                "SELECT id, recipient, subject, body, attempts FROM outbox WHERE status = 'pending' "
+                'AND channel = ? AND next_attempt_at <= ? ORDER BY id LIMIT ?',
+                (channel, now, limit),
+            ).fetchall()
+            if rows:
+                conn.executemany('UPDATE outbox SET next_attempt_at = ?, attempts = attempts + 1 WHERE id = ?',
+                                 [(now + LEASE_SECONDS, row[0]) for row in rows])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return [{'id': r[0], 'recipient': r[1], 'subject': r[2], 'body': r[3], 'attempts': r[4] + 1} for r in rows]
+
+    def mark_sent(self, ids: List[int]):
+        if ids:
+            now = time.time()
+            with self._conn() as conn:
+                conn.executemany("UPDATE outbox SET status = 'sent', last_error = NULL, sent_at = ? WHERE id = ?",
+                                 [(now, i) for i in ids])
+
+    def purge_sent(self, older_than_days: float = RETENTION_DAYS) -> int:
+        """Delete sent messages older than the retention period; returns how many"""
+        cutoff = time.time() - older_than_days * 86400
+        with self._conn() as conn:
+            # Rows sent before sent_at existed fall back to when they were queued
+            return conn.execute("DELETE FROM outbox WHERE status = 'sent' AND COALESCE(sent_at, created_at) < ?",
+                                (cutoff,)).rowcount
+
+    def mark_failed(self, messages: List[Dict[str, Any]], error: str, backoff: float):
+        now = time.time()
+        updates = []
+        for message in messages:
+            if message['attempts'] >= MAX_ATTEMPTS:
+                updates.append(('failed', now, error, message['id']))
+            else:
+                delay = min(backoff * 2 ** (message['attempts'] - 1), 3600)
+                updates.append(('pending', now + delay, error, message['id']))
+        if updates:
+            with self._conn() as conn:
+                conn.executemany('UPDATE outbox SET status = ?, next_attempt_at = ?, last_error = ? WHERE id = ?',
+                                 updates)
+
+    def next_due(self, channel: str) -> Optional[float]:
+        row = self._conn().execute(
+            "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending' AND channel = ?", (channel,)
+        ).fetchone()
+        return row[0]
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Message counts per channel and status"""
+        result: Dict[str, Dict[str, int]] = {}
+        for channel, status, n in self._conn().execute(
+                'SELECT channel, status, COUNT(*) FROM outbox GROUP BY channel, status'):
+            result.setdefault(channel, {})[status] = n
+        return result
+
+
+class EmailSender:
+    """Sends a batch of emails over one SMTP connection"""
+
+    def __init__(self, host: str, port: int = 25, user: Optional[str] = None, password: Optional[str] = None,
+                 sender: str = 'noreply@sportai.com', starttls: bool = False):
+        self.host, self.port = host, port
+        self.user, self.password = user, password
+        self.sender = sender
+        self.starttls = starttls
+
+    def send_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, str]:
+        """Send each message; returns {id: error} for the ones not delivered.
+
+        SMTP is not atomic across a batch, so messages the server accepted
+        before a failure are never reported as failed and never resent.
+        """
+        failed: Dict[int, str] = {}
+        smtp = smtplib.SMTP(self.host, self.port, timeout=30)
+        try:
+            if self.starttls:
+                smtp.starttls()
+            if self.user:
+                smtp.login(self.user, self.password or '')
+            for position, message in enumerate(messages):
+                email = EmailMessage()
+                email['From'] = self.sender
+                email['To'] = message['recipient']
+                email['Subject'] = message['subject'] or 'SportAI notification'
+                email.set_content(message['body'])
+                try:
+                    smtp.send_message(email)
+                except (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError) as e:
+                    # The server refused this message; the connection is still usable
+                    failed[message['id']] = f"{type(e).__name__}: {e}"
+                except (smtplib.SMTPException, OSError) as e:
+                    # Connection lost: this message and the rest of the batch were not delivered
+                    for rest in messages[position:]:
+                        failed[rest['id']] = f"{type(e).__name__}: {e}"
+                    break
+        finally:
+            try:
+                smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                smtp.close()
+        return failed
+
+
+class WebhookSender:
+    """POSTs a batch as JSON over a keep-alive connection.
+
+    With ``join_text`` set, the batch becomes a single {"text": ...} post
+    (Slack incoming webhooks); otherwise it is sent as {"messages": [...]}.
+    """
+
+    def __init__(self, url: str, join_text: bool = False, timeout: float = 30.0):
+        parts = urlsplit(url)
+        self.scheme, self.netloc = parts.scheme, parts.netloc
+        self.path = (parts.path or '/') + (f"?{parts.query}" if parts.query else '')
+        self.join_text = join_text
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def send_batch(self, messages: List[Dict[str, Any]]) -> Dict[int, str]:
+        """One POST for the whole batch: it is delivered or fails as a unit (raises)"""
+        if self.join_text:
+            payload = {'text': '\n'.join(m['body'] for m in messages)}
+        else:
+            payload = {'messages': [{'to': m['recipient'], 'body': m['body']} for m in messages]}
+        body = json.dumps(payload).encode('utf-8')
+        conn = self._connection()
+        try:
+            conn.request('POST', self.path, body=body, headers={'Content-Type': 'application/json'})
+            response = conn.getresponse()
+            response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            self._local.conn = None
+            raise
+        if response.status >= 300:
+            raise RuntimeError(f"HTTP {response.status}")
+        return {}
+
+
+class AsyncTokenBucket:
+    def __init__(self, rate_per_second: float, burst: int):
+        self.rate = rate_per_second
+        self.capacity = max(burst, 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+
+    async def acquire(self, n: int = 1):
+        # Whole batches larger than the bucket are allowed through one bucket-full at a time
+        n = min(n, self.capacity)
+        while True:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            if self.tokens >= n:
+                self.tokens -= n
+                return
+            await asyncio.sleep((n - self.tokens) / self.rate)
+
+
+def channels_from_env() -> Dict[str, Dict[str, Any]]:
+    """Configured channels: sender, batch size and rate limit (messages/second)"""
+    channels = {}
+    if os.environ.get('SPORTAI_SMTP_HOST'):
+        channels['email'] = {
+            'sender': EmailSender(os.environ['SPORTAI_SMTP_HOST'], int(os.environ.get('SPORTAI_SMTP_PORT', '25')),
+                                  os.environ.get('SPORTAI_SMTP_USER'), os.environ.get('SPORTAI_SMTP_PASSWORD'),
+                                  os.environ.get('SPORTAI_SMTP_FROM', 'noreply@sportai.com'),
+                                  starttls=os.environ.get('SPORTAI_SMTP_STARTTLS', '') == '1'),
+            'batch_size': 50, 'rate': float(os.environ.get('SPORTAI_EMAIL_RATE', '50')),
+        }
+    if os.environ.get('SPORTAI_SMS_URL'):
+        channels['sms'] = {'sender': WebhookSender(os.environ['SPORTAI_SMS_URL']),
+                           'batch_size': 100, 'rate': float(os.environ.get('SPORTAI_SMS_RATE', '30'))}
+    if os.environ.get('SPORTAI_SLACK_WEBHOOK_URL'):
+        channels['slack'] = {'sender': WebhookSender(os.environ['SPORTAI_SLACK_WEBHOOK_URL'], join_text=True),
+                             'batch_size': 20, 'rate': float(os.environ.get('SPORTAI_SLACK_RATE', '20'))}
+    return channels
+
+
+class Dispatcher:
+    """Background asyncio loop draining the outbox, one worker per channel"""
+
+    def __init__(self, outbox: Outbox, channels: Dict[str, Dict[str, Any]], backoff: float = 5.0,
+                 idle_poll: float = 2.0, retention_days: float = RETENTION_DAYS):
+        self.outbox = outbox
+        self.channels = channels
+        self.backoff = backoff
+        self.idle_poll = idle_poll
+        self.retention_days = retention_days
+        self._purged_at = 0.0
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Dict[str, asyncio.Event] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+
+    def start(self) -> 'Dispatcher':
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, daemon=True, name='notification-dispatcher')
+        self._thread.start()
+        return self
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_until_complete(self._main())
+
+    async def _main(self):
+        self._wake = {name: asyncio.Event() for name in self.channels}
+        await asyncio.gather(*(self._worker(name, config) for name, config in self.channels.items()))
+
+    def wake(self, channel: str):
+        """Tell a channel worker new mail arrived (thread-safe)"""
+        event = self._wake.get(channel)
+        if event is not None and self.loop is not None:
+            self.loop.call_soon_threadsafe(event.set)
+
+    def stop(self, timeout: float = 5.0):
+        self._stopping = True
+        for channel in self.channels:
+            self.wake(channel)
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    async def _worker(self, channel: str, config: Dict[str, Any]):
+        bucket = AsyncTokenBucket(config['rate'], burst=config['batch_size'])
+        wake = self._wake[channel]
+        while not self._stopping:
+            # The outbox is SQLite: claims run in the default executor so the loop never blocks on disk
+            batch = await self.loop.run_in_executor(None, self.outbox.claim, channel, config['batch_size'])
+            if not batch:
+                due = await self.loop.run_in_executor(None, self.outbox.next_due, channel)
+                delay = self.idle_poll if due is None else min(max(due - time.time(), 0.05), self.idle_poll)
+                wake.clear()
+                try:
+                    await asyncio.wait_for(wake.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await bucket.acquire(len(batch))
+            try:
+                failed = await self.loop.run_in_executor(None, config['sender'].send_batch, batch) or {}
+            except Exception as e:
+                # Raised before anything was delivered
+                failed = {m['id']: f"{type(e).__name__}: {e}" for m in batch}
+            await self.loop.run_in_executor(None, self._acknowledge, batch, failed)
+
+    def _acknowledge(self, batch: List[Dict[str, Any]], failed: Dict[int, str]):
+        """Mark delivered messages sent and retry only the ones that failed"""
+        self.outbox.mark_sent([m['id'] for m in batch if m['id'] not in failed])
+        by_error: Dict[str, List[Dict[str, Any]]] = {}
+        for message in batch:
+            if message['id'] in failed:
+                by_error.setdefault(failed[message['id']], []).append(message)
+        for error, messages in by_error.items():
+            self.outbox.mark_failed(messages, error, self.backoff)
+        now = time.time()
+        if now - self._purged_at >= PURGE_INTERVAL:
+            self._purged_at = now
+            self.outbox.purge_sent(self.retention_days)
+
+
+_outbox: Optional[Outbox] = None
+_dispatcher: Optional[Dispatcher] = None
+_booking_notices = False
+_start_lock = threading.Lock()
+
+
+def get_outbox() -> Outbox:
+    global _outbox
+    with _start_lock:
+        if _outbox is None:
+            _outbox = Outbox(os.environ.get('SPORTAI_OUTBOX_DB', OUTBOX_DB))
+        return _outbox
+
+
+def start_dispatcher() -> Optional[Dispatcher]:
+    """Start the process-wide dispatcher once; None if no channel is configured"""
+    global _dispatcher
+    outbox = get_outbox()
+    with _start_lock:
+        if _dispatcher is None:
+            channels = channels_from_env()
+            if channels:
+                _dispatcher = Dispatcher(outbox, channels).start()
+        return _dispatcher
+
+
+def notify(channel: str, recipient: str, body: str, subject: str = '', dedupe_key: Optional[str] = None) -> bool:
+    """Queue an outbound message without blocking on the network.
+
+    Returns False if an identical pending alert (same channel and
+    dedupe_key) was already queued.
+    """
+    queued = get_outbox().put(channel, recipient, body, subject, dedupe_key)
+    if queued and _dispatcher is not None:
+        _dispatcher.wake(channel)
+    return queued
+
+
+def notify_many(messages: List[Dict[str, Any]]) -> int:
+    """Queue a burst of alerts (dicts with channel, recipient, body[, subject, dedupe_key]) in one write"""
+    queued = get_outbox().put_many(messages)
+    if _dispatcher is not None:
+        for channel in {m['channel'] for m in messages}:
+            _dispatcher.wake(channel)
+    return queued
+
+
+BOOKING_NOTICES = {
+    'booking': ('Booking confirmed', 'Your booking {booking_id} at {facility} is confirmed for {start}.'),
+    'cancellation': ('Booking cancelled', 'Your booking {booking_id} at {facility} has been cancelled.'),
+}
+
+
+def booking_notice(event: Dict[str, Any]) -> bool:
+    """Queue the email for a booking or cancellation change-feed event; False if there is no one to tell"""
+    data = event['data']
+    if event['kind'] not in BOOKING_NOTICES or not data.get('email') or 'booking_id' not in data:
+        return False
+    subject, template = BOOKING_NOTICES[event['kind']]
+    body = template.format(booking_id=data['booking_id'], facility=event['facility'] or 'the facility',
+                           start=data.get('start', 'the booked time'))
+    # A repeated event for the same booking (and start) is coalesced while the first is still queued
+    return notify('email', data['email'], body, subject,
+                  dedupe_key=f"{event['kind']}:{data['booking_id']}:{data.get('start', '')}")
+
+
+def subscribe_booking_notices():
+    """Send booking and cancellation emails from the change feed (once per process)"""
+    global _booking_notices
+    with _start_lock:
+        if not _booking_notices:
+            from change_feed import feed
+            feed.subscribe(booking_notice, tuple(BOOKING_NOTICES))
+            _booking_notices = True
+
+
+class MockHTTPSink(ThreadingHTTPServer):
+    """Local HTTP endpoint that records every JSON POST it receives"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0, status: int = 200):
+        self.received: List[Any] = []
+        self.status = status
+        super().__init__(('127.0.0.1', port), _SinkHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}/hook"
+
+    def start(self) -> 'MockHTTPSink':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _SinkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.received.append(json.loads(body or b'null'))
+        self.send_response(self.server.status)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, format, *args):
+        pass
+
+
+class MockSMTPSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server that accepts and records messages"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0, reject: Optional[List[str]] = None, drop_after: int = 0):
+        self.messages: List[Dict[str, Any]] = []
+        # Recipients refused with 550, and a message count after which connections are dropped
+        self.reject = set(reject or ())
+        self.drop_after = drop_after
+        super().__init__(('127.0.0.1', port), _SMTPHandler)
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def start(self) -> 'MockSMTPSink':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _SMTPHandler(socketserver.StreamRequestHandler):
+    def reply(self, line: str):
+        self.wfile.write((line + '\r\n').encode('ascii'))
+
+    def handle(self):
+        self.reply('220 mock ESMTP')
+        sender, recipients = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode('utf-8', 'replace').strip()
+            verb = command[:4].upper()
+            if verb in ('HELO', 'EHLO'):
+                self.reply('250 mock')
+            elif verb == 'MAIL':
+                if self.server.drop_after and len(self.server.messages) >= self.server.drop_after:
+                    return
+                sender, recipients = command[10:].strip('<> '), []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                recipient = command[8:].strip('<> ')
+                if recipient in self.server.reject:
+                    self.reply('550 No such user')
+                    continue
+                recipients.append(recipient)
+                self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 End data with <CR><LF>.<CR><LF>')
+                data = []
+                while True:
+                    chunk = self.rfile.readline()
+                    if not chunk or chunk in (b'.\r\n', b'.\n'):
+                        break
+                    data.append(chunk)
+                self.server.messages.append({'from': sender, 'to': recipients, 'data': b''.join(data)})
+                self.reply('250 OK')
+            elif verb == 'QUIT':
+                self.reply('221 Bye')
+                return
+            else:
+                self.reply('250 OK')
@@ -0,0 +1,282 @@
+"""Dynamic pricing grid for every facility, surface and hourly slot.
+
+    from pricing_engine import get_pricing_engine
+    engine = get_pricing_engine()             # built from booking_data.csv on first use
+    engine.price('North Dome', 'turf', '2026-05-02 18:00')
+    table = engine.price_table('North Dome', '2026-05-02', '2026-05-03')   # hours x surfaces
+    projection = engine.simulate_revenue(n_sims=5000)
+
+The grid is one facility x surface x hour array covering the next
+``horizon_days``. It is computed in a single vectorized pass from the demand
+forecast (expected bookings per slot) and current occupancy (bookings
+already on the books), so tools read prices instead of computing them:
+
+    utilization = max(expected, booked) / capacity
+    price = base_rate[surface] * clip(1 + sensitivity * (utilization - target), floor, cap)
+
+A booking or cancellation published on the change feed reprices only the
+slots it covers. Revenue projections draw Poisson demand for every open
+slot across a batch of simulations at once, with demand scaled by price
+through a constant elasticity.
+
+Base rates come from SPORTAI_BASE_RATES (JSON, surface -> hourly rate) and
+capacity from SPORTAI_SURFACE_CAPACITY (JSON, surface -> bookable units).
+"""
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from change_feed import feed
+
+DEFAULT_BASE_RATE = 100.0
+HOURS_PER_WEEK = 168
+
+
+def _hours(values) -> np.ndarray:
+    """Timestamps as whole hours since 1970-01-01 (naive local time), rounded down"""
+    stamps = pd.to_datetime(pd.Series(values), errors='coerce')
+    if stamps.dt.tz is not None:
+        stamps = stamps.dt.tz_localize(None)
+    hours = stamps.to_numpy('datetime64[h]')
+    return np.where(np.isnat(hours), np.iinfo(np.int64).min, hours.astype(np.int64))
+
+
+def _hour(value) -> int:
+    """Scalar version of _hours for single lookups"""
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is not None:
+        stamp = stamp.tz_localize(None)
+    return stamp.value // (3600 * 10**9)
+
+
+def _hour_of_week(hours: np.ndarray) -> np.ndarray:
+    # 1970-01-01 was a Thursday; +3 puts Monday at 0, as in the demand forecast
+    return ((hours // 24 + 3) % 7) * 24 + hours % 24
+
+
+def _json_env(name: str) -> Dict[str, float]:
+    raw = os.environ.get(name)
+    return {str(k): float(v) for k, v in json.loads(raw).items()} if raw else {}
+
+
+class PricingEngine:
+    """Precomputed price grid with incremental repricing and batched revenue simulation"""
+
+    def __init__(self, base_rates: Optional[Dict[str, float]] = None, capacity: Optional[Dict[str, float]] = None,
+                 horizon_days: int = 14, target_utilization: float = 0.7, sensitivity: float = 0.8,
+                 floor: float = 0.7, cap: float = 1.6, elasticity: float = 0.6, step: float = 0.5):
+        self.base_rates = dict(base_rates or {})
+        self.capacity = dict(capacity or {})
+        self.horizon = horizon_days * 24
+        self.target = target_utilization
+        self.sensitivity = sensitivity
+        self.floor, self.cap = floor, cap
+        self.elasticity = elasticity
+        self.step = step
+        self.version = 0
+        self.start_hour = 0
+        self.facilities: List[str] = []
+        self.surfaces: List[str] = []
+        self._index: Dict[str, Dict[str, int]] = {'facility': {}, 'surface': {}}
+        self.expected = self.booked = self.prices = np.zeros((0, 0, self.horizon))
+        self._base = self._units = np.zeros(0)
+        self._lock = threading.Lock()
+
+    def build(self, forecast: pd.DataFrame, bookings: Optional[pd.DataFrame] = None,
+              start=None) -> 'PricingEngine':
+        """Compute the whole grid from a DemandForecaster.predict() frame and booking rows.
+
+        bookings needs ``facility`` (optional), ``surface`` and ``start_time``;
+        ``end_time`` spreads a booking over every hour it covers, otherwise it
+        fills one hour.
+        """
+        start_hour = _hour(start if start is not None else pd.Timestamp.now().floor('D'))
+        bookings = bookings if bookings is not None else pd.DataFrame(columns=['facility', 'surface', 'start_time'])
+        booking_facility = (bookings['facility'].astype(str) if 'facility' in bookings
+                            else pd.Series('main', index=bookings.index))
+        facilities = sorted(set(forecast['facility'].astype(str)) | set(booking_facility))
+        surfaces = sorted(set(forecast['surface'].astype(str)) | set(bookings['surface'].astype(str)))
+        index = {'facility': {name: i for i, name in enumerate(facilities)},
+                 'surface': {name: i for i, name in enumerate(surfaces)}}
+        shape = (len(facilities), len(surfaces), self.horizon)
+        slot_hours = start_hour + np.arange(self.horizon)
+
+        # Expected bookings: look each slot up in the forecast by (weeks ahead, hour of week)
+        weeks = int(forecast['weeks_ahead'].max()) if len(forecast) else 1
+        demand = np.zeros((len(facilities), len(surfaces), weeks, HOURS_PER_WEEK))
+        if len(forecast):
+            demand[forecast['facility'].astype(str).map(index['facility']).to_numpy(),
+                   forecast['surface'].astype(str).map(index['surface']).to_numpy(),
+                   forecast['weeks_ahead'].to_numpy() - 1,
+                   forecast['hour_of_week'].to_numpy()] = forecast['expected_bookings'].to_numpy(float)
+        week_of_slot = np.minimum(np.arange(self.horizon) // HOURS_PER_WEEK, weeks - 1)
+        expected = demand[:, :, week_of_slot, _hour_of_week(slot_hours)]
+
+        booked = np.zeros(shape)
+        if len(bookings):
+            first = _hours(bookings['start_time'])
+            last = _hours(bookings['end_time']) if 'end_time' in bookings else first
+            # A blank or unparseable end_time fills one hour, like a booking with no end_time at all
+            last = np.where(last == np.iinfo(np.int64).min, first, last - 1)
+            last = np.maximum(last, first)
+            keep = (first > np.iinfo(np.int64).min) & (last >= start_hour) & (first < start_hour + self.horizon)
+            first = np.maximum(first[keep], start_hour) - start_hour
+            last = np.minimum(last[keep], start_hour + self.horizon - 1) - start_hour
+            spans = last - first + 1
+            row = np.repeat(np.arange(len(first)), spans)
+            slot = first[row] + np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+            f = booking_facility[keep].map(index['facility']).to_numpy()[row]
+            s = bookings['surface'][keep].astype(str).map(index['surface']).to_numpy()[row]
+            np.add.at(booked, (f, s, slot), 1)
+
+        base = np.array([self.base_rates.get(name, DEFAULT_BASE_RATE) for name in surfaces], dtype=float)
+        units = np.array([max(self.capacity.get(name, 1.0), 1e-9) for name in surfaces], dtype=float)
+        prices = self._price(expected, booked, base[None, :, None], units[None, :, None])
+        with self._lock:
+            self.start_hour, self.facilities, self.surfaces, self._index = start_hour, facilities, surfaces, index
+            self.expected, self.booked, self.prices = expected, booked, prices
+            self._base, self._units = base, units
+            self.version += 1
+        return self
+
+    def _price(self, expected: np.ndarray, booked: np.ndarray, base: np.ndarray, units: np.ndarray) -> np.ndarray:
+        utilization = np.maximum(expected, booked) / units
+        multiplier = np.clip(1 + self.sensitivity * (utilization - self.target), self.floor, self.cap)
+        return np.round(base * multiplier / self.step) * self.step
+
+    def apply_booking(self, facility: Optional[str], surface: str, start, end=None, count: int = 1) -> int:
+        """Add (or, with a negative count, remove) a booking and reprice its slots; returns slots repriced"""
+        with self._lock:
+            f = self._index['facility'].get(facility or 'main')
+            s = self._index['surface'].get(str(surface))
+            if f is None or s is None:
+                # Not on the grid yet; the next rebuild picks it up
+                return 0
+            first = _hour(start) - self.start_hour
+            last = _hour(end) - 1 - self.start_hour if end is not None and not pd.isna(end) else first
+            first, last = max(first, 0), min(max(last, first), self.horizon - 1)
+            if first > last:
+                return 0
+            cells = slice(first, last + 1)
+            booked = self.booked[f, s, cells] = np.maximum(self.booked[f, s, cells] + count, 0)
+            self.prices[f, s, cells] = self._price(self.expected[f, s, cells], booked, self._base[s], self._units[s])
+            self.version += 1
+            return last - first + 1
+
+    def on_event(self, event: Dict[str, Any]):
+        """Change feed subscriber for booking and cancellation events carrying surface and start"""
+        data = event['data']
+        if 'surface' in data and 'start' in data:
+            self.apply_booking(event['facility'], data['surface'], data['start'], data.get('end'),
+                               1 if event['kind'] == 'booking' else -1)
+
+    def price(self, facility: str, surface: str, when) -> Optional[float]:
+        """Current price of the slot containing ``when``, or None if it is off the grid"""
+        hour = _hour(when)
+        with self._lock:
+            f = self._index['facility'].get(facility)
+            s = self._index['surface'].get(surface)
+            slot = hour - self.start_hour
+            if f is None or s is None or not 0 <= slot < self.horizon:
+                return None
+            return float(self.prices[f, s, slot])
+
+    def price_table(self, facility: str, start=None, end=None) -> pd.DataFrame:
+        """Prices for one facility over [start, end): one row per hour, one column per surface"""
+        first = max(_hour(start) - self.start_hour, 0) if start is not None else 0
+        last = min(_hour(end) - self.start_hour, self.horizon) if end is not None else self.horizon
+        f = self._index['facility'].get(facility)
+        if f is None or first >= last:
+            return pd.DataFrame(columns=self.surfaces, dtype=float)
+        hours = (self.start_hour + np.arange(first, last)) * 3600
+        return pd.DataFrame(self.prices[f, :, first:last].T, columns=self.surfaces,
+                            index=pd.to_datetime(hours, unit='s'))
+
+    def flat_prices(self) -> np.ndarray:
+        """Base rate in every slot, for comparing against the dynamic grid"""
+        return np.broadcast_to(self._base[None, :, None], self.prices.shape).copy()
+
+    def simulate_revenue(self, n_sims: int = 2000, prices: Optional[np.ndarray] = None, batch_size: int = 500,
+                         seed: Optional[int] = None) -> Dict[str, Any]:
+        """Monte Carlo revenue over the horizon at the given (default: current) prices.
+
+        Remaining demand per slot is Poisson with mean max(expected - booked, 0)
+        scaled by (price / base rate) ** -elasticity, capped at the open units.
+        Simulations run batch_size at a time over all open slots together.
+        """
+        with self._lock:
+            prices = self.prices.copy() if prices is None else np.asarray(prices, dtype=float)
+            expected, booked = self.expected.copy(), self.booked.copy()
+            base, units = self._base, self._units
+        booked_revenue = float((booked * prices).sum())
+        relative = prices / base[None, :, None]
+        rate = np.maximum(expected - booked, 0) * relative ** -self.elasticity
+        open_units = np.floor(np.maximum(units[None, :, None] - booked, 0))
+        # Slots with no demand or nothing left to sell cannot add revenue; leave them out
+        active = (rate > 0) & (open_units > 0)
+        rate, open_units, active_prices = rate[active], open_units[active], prices[active]
+        facility_of = np.nonzero(active)[0]
+
+        rng = np.random.default_rng(seed)
+        totals = np.empty(n_sims)
+        by_facility = np.zeros(len(self.facilities))
+        for first in range(0, n_sims, batch_size):
+            count = min(batch_size, n_sims - first)
+            sold = np.minimum(rng.poisson(rate, size=(count, len(rate))), open_units)
+            revenue = sold * active_prices
+            totals[first:first + count] = revenue.sum(axis=1) + booked_revenue
+            by_facility += np.bincount(facility_of, weights=revenue.sum(axis=0), minlength=len(self.facilities))
+
+        booked_by_facility = (booked * prices).sum(axis=(1, 2))
+        return {
+            'n_sims': n_sims,
+            'booked_revenue': booked_revenue,
+            'mean': float(totals.mean()) if n_sims else booked_revenue,
+            'p5': float(np.percentile(totals, 5)) if n_sims else booked_revenue,
+            'p50': float(np.percentile(totals, 50)) if n_sims else booked_revenue,
+            'p95': float(np.percentile(totals, 95)) if n_sims else booked_revenue,
+            'by_facility': pd.Series(booked_by_facility + by_facility / max(n_sims, 1), index=self.facilities,
+                                     name='expected_revenue'),
+        }
+
+
+_engine: Optional[PricingEngine] = None
+_engine_key: Optional[tuple] = None
+_engine_lock = threading.Lock()
+
+
+def get_pricing_engine(path: str = 'booking_data.csv', horizon_days: int = 14) -> PricingEngine:
+    """Process-wide engine, rebuilt only when the booking file changes or the day rolls over.
+
+    Between rebuilds the grid is kept current by booking and cancellation
+    events from the change feed.
+    """
+    global _engine, _engine_key
+    from ai_modules.demand_forecasting import DemandForecaster
+    from data_cache import file_hash, load_csv
+
+    digest = file_hash(path) if os.path.exists(path) else None
+    key = (os.path.abspath(path), digest, horizon_days, time.strftime('%Y-%m-%d'))
+    with _engine_lock:
+        if _engine is not None and _engine_key == key:
+            return _engine
+        engine = _engine or PricingEngine(_json_env('SPORTAI_BASE_RATES'), _json_env('SPORTAI_SURFACE_CAPACITY'),
+                                          horizon_days=horizon_days)
+        engine.horizon = horizon_days * 24
+        if digest is None:
+            forecast = pd.DataFrame(columns=['facility', 'surface', 'weeks_ahead', 'hour_of_week',
+                                             'expected_bookings'])
+            bookings = None
+        else:
+            forecast = DemandForecaster().fit(path).predict(horizon_weeks=-(-horizon_days // 7) + 1)
+            bookings = load_csv(path)
+        engine.build(forecast, bookings)
+        if _engine is None:
+            feed.subscribe(engine.on_event, ('booking', 'cancellation'))
+        _engine, _engine_key = engine, key
+        return engine
@@ -0,0 +1,80 @@
+"""Public Schedule: open and booked hours per facility, with live prices.
+
+Calendar data comes from the shared schedule cache. Each viewer keeps the
+ETag of the range it last rendered and the price grid version, so a rerun
+with no booking or price changes in that range reuses the tables it
+already built instead of rebuilding them from bookings and prices.
+"""
+from datetime import date, timedelta
+
+import pandas as pd
+import streamlit as st
+
+from schedule_cache import get_schedule_cache
+
+
+def _day_table(day, price_table) -> pd.DataFrame:
+    """Hour x surface table of bookings, with the live price for open hours where one exists"""
+    hours = day['hours']
+    table = pd.DataFrame({surface: ["🔴 Booked" if n else "🟢 Open" for n in counts]
+                          for surface, counts in hours.items()}, index=[f"{h:02d}:00" for h in range(24)])
+    if price_table is not None and not price_table.empty:
+        for surface in table.columns.intersection(price_table.columns):
+            prices = price_table[surface].reindex(range(24)).to_numpy()
+            table[surface] = [f"🟢 ${p:,.0f}" if label == "🟢 Open" and p == p else label
+                              for label, p in zip(table[surface], prices)]
+    return table
+
+
+def _pricing_engine():
+    try:
+        from pricing_engine import get_pricing_engine
+        return get_pricing_engine()
+    except Exception:
+        return None
+
+
+def _prices(engine, facility, first, days):
+    """Hourly price table per day, keyed by ISO date"""
+    tables = {}
+    for i in range(days):
+        day = first + timedelta(days=i)
+        table = engine.price_table(facility, day, day + timedelta(days=1))
+        table.index = table.index.hour
+        tables[day.isoformat()] = table
+    return tables
+
+
+def run():
+    st.title("📅 Public Schedule")
+    cache = get_schedule_cache()
+    facilities = cache.facilities()
+    if not facilities:
+        st.info("💡 No bookings yet. Add booking_data.csv (facility, surface, start_time[, end_time]).")
+        return
+
+    col1, col2, col3 = st.columns(3)
+    facility = col1.selectbox("Facility", facilities, key="public_schedule_facility")
+    first = col2.date_input("From", value=date.today(), key="public_schedule_start")
+    days = col3.selectbox("Days", [1, 3, 7], index=1, key="public_schedule_days")
+    show_prices = st.checkbox("Show live prices", value=True, key="public_schedule_prices")
+
+    etag = cache.etag(facility, first, days)
+    engine = _pricing_engine() if show_prices else None
+    price_version = engine.version if engine is not None else None
+    view = st.session_state.get('public_schedule_view')
+    if view is None or view['etag'] != etag or view['price_version'] != price_version:
+        # Price tables are sliced only when the view is rebuilt, not on every rerun
+        price_tables = _prices(engine, facility, first, days) if engine is not None else None
+        _, payload = cache.calendar(facility, first, days)
+        view = {'etag': etag, 'price_version': price_version,
+                'tables': [(d['date'], len(d['bookings']),
+                            _day_table(d, (price_tables or {}).get(d['date']))) for d in payload['days']]}
+        st.session_state['public_schedule_view'] = view
+
+    for day_iso, count, table in view['tables']:
+        st.markdown(f"### {date.fromisoformat(day_iso):%A, %B %d} — {count} bookings")
+        if table.empty:
+            st.markdown("🟢 Everything is open.")
+        else:
+            st.dataframe(table, use_container_width=True)
@@ -0,0 +1,89 @@
+"""Real-time facility dashboard driven by the in-process change feed.
+
+Only the live panel refreshes: it is a Streamlit fragment that reruns on its
+own timer, so a refresh never reruns the app shell or the other widgets.
+Each refresh reads the process-wide counters (already up to date) and
+appends just the events published since that viewer's last refresh. The
+weekday x hour heatmap below it is read from the usage rollups.
+"""
+import os
+from collections import deque
+from datetime import datetime
+
+import streamlit as st
+
+from change_feed import feed, live_totals, publish
+from usage_rollups import get_rollups
+
+REFRESH_SECONDS = float(os.environ.get('SPORTAI_LIVE_REFRESH_SECONDS', '2'))
+ACTIVITY_ROWS = 50
+
+EVENT_ICONS = {'booking': '📅', 'cancellation': '❌', 'checkin': '✅', 'revenue': '💰'}
+
+
+def _describe(event) -> str:
+    data = event['data']
+    details = ', '.join(f"{k}: {v}" for k, v in data.items())
+    return f"{EVENT_ICONS.get(event['kind'], '•')} {event['kind'].title()}" + (f" ({details})" if details else '')
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def live_panel(facility):
+    # A new viewer starts with the most recent activity already in the buffer
+    view = st.session_state.setdefault('live_dashboard', {'seq': max(feed.seq - ACTIVITY_ROWS, 0),
+                                                          'log': deque(maxlen=ACTIVITY_ROWS)})
+    events, view['seq'], gap = feed.since(view['seq'])
+    if gap:
+        st.caption("⚠️ Some events were missed while this view was idle; totals are still current.")
+    view['log'].extendleft(events)
+    activity = [e for e in view['log'] if facility is None or e['facility'] == facility]
+
+    totals = live_totals.snapshot(facility)
+    metric_cols = st.columns(4)
+    metric_cols[0].metric("📅 Bookings Today", int(totals['bookings']))
+    metric_cols[1].metric("❌ Cancellations", int(totals['cancellations']))
+    metric_cols[2].metric("✅ Check-ins", int(totals['checkins']))
+    metric_cols[3].metric("💰 Revenue Today", f"${totals['revenue']:,.2f}")
+
+    st.markdown("### 📡 Live Activity")
+    if activity:
+        st.dataframe(
+            [{"Time": datetime.fromtimestamp(e['at']).strftime('%H:%M:%S'),
+              "Facility": e['facility'] or '—',
+              "Event": _describe(e)} for e in activity],
+            use_container_width=True, hide_index=True,
+        )
+    else:
+        st.markdown("No activity yet. New bookings, check-ins and payments appear here as they happen.")
+
+
+def run():
+    st.title("⚡ Real-Time Dashboard")
+    facilities = live_totals.facilities()
+    choice = st.selectbox("Facility", ["All Facilities"] + facilities, key="live_dashboard_facility")
+    live_panel(None if choice == "All Facilities" else choice)
+
+    with st.expander("🔥 Usage by Weekday and Hour"):
+        # Read from the materialized rollups: a slice of the weekday x hour cube, not a scan of bookings
+        rollups = get_rollups()
+        metric = st.radio("Metric", ['hours', 'bookings', 'revenue'], horizontal=True,
+                          key="live_dashboard_heatmap_metric")
+        heatmap_facility = None if choice == "All Facilities" else choice
+        if heatmap_facility is not None and heatmap_facility not in rollups.facilities():
+            st.markdown("No usage history for this facility yet.")
+        elif not rollups.facilities():
+            st.markdown("No usage history yet. Load it with `python usage_rollups.py bookings <export.csv>`.")
+        else:
+            st.dataframe(rollups.heatmap(metric, heatmap_facility).round(1), use_container_width=True)
+
+    user = st.session_state.get('user') or {}
+    if user.get('role') == 'admin':
+        with st.expander("🧪 Publish Test Event (Admin Only)"):
+            kind = st.selectbox("Event type", list(EVENT_ICONS), key="live_dashboard_test_kind")
+            test_facility = st.text_input("Facility", value="Main Complex", key="live_dashboard_test_facility")
+            amount = st.number_input("Amount ($)", min_value=0.0, value=25.0, step=5.0,
+                                     key="live_dashboard_test_amount")
+            if st.button("Publish", key="live_dashboard_publish"):
+                payload = {'amount': amount} if kind in ('revenue', 'booking') else {}
+                publish(kind, test_facility, source='test', **payload)
+                st.success(f"Published a {kind} event for {test_facility}.")
@@ -0,0 +1,237 @@
+"""Per-render timing and resource instrumentation for SportAI tools.
+
+``monitor.track(name)`` wraps a tool render and records wall time, CPU time
+of the script thread, peak traced allocations (when SPORTAI_TRACE_MEMORY is
+set) and whether it raised. Records go to an in-process ring buffer. A
+sampled fraction of renders runs under cProfile, and the profile is written
+to disk only when that render was slower than the threshold.
+
+The buffer can be read as a summary (admin panel), as Prometheus text
+(``prometheus_text``, ``write_textfile`` or the optional /metrics server on
+SPORTAI_METRICS_PORT) or as JSON lines (``write_jsonl``). The server listens
+on 127.0.0.1 unless SPORTAI_METRICS_HOST says otherwise, since tool names
+and error counts are not for the public internet.
+"""
+import cProfile
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+class RenderMonitor:
+    """Ring buffer of render records plus slow-render profiling"""
+
+    def __init__(self, capacity: int = 4096, slow_seconds: float = 2.0, profile_sample_rate: float = 0.05,
+                 profile_dir: str = 'render_profiles', trace_memory: bool = False):
+        self.records = deque(maxlen=capacity)
+        self.slow_seconds = slow_seconds
+        self.profile_sample_rate = profile_sample_rate
+        self.profile_dir = profile_dir
+        self.trace_memory = trace_memory
+        self.totals: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+        if trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    @classmethod
+    def from_env(cls) -> 'RenderMonitor':
+        return cls(
+            capacity=int(os.environ.get('SPORTAI_RENDER_BUFFER', '4096')),
+            slow_seconds=float(os.environ.get('SPORTAI_SLOW_RENDER_SECONDS', '2.0')),
+            profile_sample_rate=float(os.environ.get('SPORTAI_PROFILE_SAMPLE_RATE', '0.05')),
+            profile_dir=os.environ.get('SPORTAI_PROFILE_DIR', 'render_profiles'),
+            trace_memory=os.environ.get('SPORTAI_TRACE_MEMORY', '').lower() in ('1', 'true', 'yes'),
+        )
+
+    @contextmanager
+    def track(self, name: str):
+        """Time one render; exceptions are recorded and re-raised"""
+        profiler = None
+        if self.profile_sample_rate and random.random() < self.profile_sample_rate:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Another profiler already owns this thread
+                profiler = None
+        if self.trace_memory:
+            # The peak is process-wide, so concurrent renders inflate each other's numbers
+            tracemalloc.reset_peak()
+            traced_before = tracemalloc.get_traced_memory()[0]
+        wall_start, cpu_start = time.perf_counter(), time.thread_time()
+        error = None
+        try:
+            yield
+        except Exception as e:
+            # st.rerun()/st.stop() raise BaseException subclasses and are not errors
+            error = type(e).__name__
+            raise
+        finally:
+            wall = time.perf_counter() - wall_start
+            cpu = time.thread_time() - cpu_start
+            peak_kb = None
+            if self.trace_memory:
+                peak_kb = max(tracemalloc.get_traced_memory()[1] - traced_before, 0) // 1024
+            profile_path = None
+            if profiler is not None:
+                profiler.disable()
+                if wall >= self.slow_seconds:
+                    profile_path = self._dump(name, profiler)
+            self._record({'name': name, 'at': time.time(), 'wall': wall, 'cpu': cpu, 'peak_kb': peak_kb,
+                          'error': error, 'profile': profile_path})
+
+    def _dump(self, name: str, profiler: cProfile.Profile) -> Optional[str]:
+        try:
+            os.makedirs(self.profile_dir, exist_ok=True)
+            safe_name = re.sub(r'[^A-Za-z0-9_.-]', '_', name)
+            path = os.path.join(self.profile_dir, f"{safe_name}-{int(time.time() * 1000)}.prof")
+            profiler.dump_stats(path)
+            return path
+        except OSError:
+            return None
+
+    def _record(self, record: Dict[str, Any]):
+        with self._lock:
+            self.records.append(record)
+            totals = self.totals.setdefault(record['name'], {'count': 0, 'errors': 0, 'wall': 0.0, 'cpu': 0.0})
+            totals['count'] += 1
+            totals['errors'] += record['error'] is not None
+            totals['wall'] += record['wall']
+            totals['cpu'] += record['cpu']
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self.records)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """Per-name stats over the buffer, slowest p95 first"""
+        grouped: Dict[str, List[Dict[str, Any]]] = {}
+        for record in self.snapshot():
+            grouped.setdefault(record['name'], []).append(record)
+        rows = []
+        for name, records in grouped.items():
+            walls = sorted(r['wall'] for r in records)
+            peaks = [r['peak_kb'] for r in records if r['peak_kb'] is not None]
+            errors = sum(1 for r in records if r['error'])
+            rows.append({
+                'name': name,
+                'renders': len(records),
+                'error_rate': errors / len(records),
+                'p50_ms': _percentile(walls, 50) * 1000,
+                'p95_ms': _percentile(walls, 95) * 1000,
+                'max_ms': walls[-1] * 1000,
+                'mean_cpu_ms': sum(r['cpu'] for r in records) / len(records) * 1000,
+                'max_peak_kb': max(peaks) if peaks else None,
+                'profiles': sum(1 for r in records if r['profile']),
+            })
+        return sorted(rows, key=lambda row: row['p95_ms'], reverse=True)
+
+    def prometheus_text(self) -> str:
+        """Counters since start plus buffer quantiles, in Prometheus text format"""
+        lines = [
+            '# HELP sportai_render_total Tool renders since process start.',
+            '# TYPE sportai_render_total counter',
+        ]
+        with self._lock:
+            totals = {name: dict(values) for name, values in self.totals.items()}
+        for name, values in sorted(totals.items()):
+            lines.append(f'sportai_render_total{{tool="{_label(name)}"}} {values["count"]:.0f}')
+        lines += ['# HELP sportai_render_errors_total Tool renders that raised.',
+                  '# TYPE sportai_render_errors_total counter']
+        for name, values in sorted(totals.items()):
+            lines.append(f'sportai_render_errors_total{{tool="{_label(name)}"}} {values["errors"]:.0f}')
+        lines += ['# HELP sportai_render_seconds_total Wall seconds spent rendering.',
+                  '# TYPE sportai_render_seconds_total counter']
+        for name, values in sorted(totals.items()):
+            lines.append(f'sportai_render_seconds_total{{tool="{_label(name)}"}} {values["wall"]:.6f}')
+        lines += ['# HELP sportai_render_cpu_seconds_total CPU seconds spent rendering.',
+                  '# TYPE sportai_render_cpu_seconds_total counter']
+        for name, values in sorted(totals.items()):
+            lines.append(f'sportai_render_cpu_seconds_total{{tool="{_label(name)}"}} {values["cpu"]:.6f}')
+        lines += ['# HELP sportai_render_wall_seconds Recent render wall time quantiles.',
+                  '# TYPE sportai_render_wall_seconds summary']
+        for row in self.summary():
+            for quantile, key in (('0.5', 'p50_ms'), ('0.95', 'p95_ms')):
+                lines.append(f'sportai_render_wall_seconds{{tool="{_label(row["name"])}",quantile="{quantile}"}} '
+                             f'{row[key] / 1000:.6f}')
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, path: str):
+        """Atomically write prometheus_text() for a textfile collector"""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.prometheus_text())
+        os.replace(tmp, path)
+
+    def write_jsonl(self, path: str):
+        with open(path, 'w') as f:
+            for record in self.snapshot():
+                f.write(json.dumps(record) + '\n')
+
+    def serve(self, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve prometheus_text() on /metrics from a daemon thread"""
+        monitor = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?')[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = monitor.prometheus_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True, name='render-metrics').start()
+        return server
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
+
+
+monitor = RenderMonitor.from_env()
+
+_server_lock = threading.Lock()
+_server_started = False
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def start_metrics_server() -> Optional[ThreadingHTTPServer]:
+    """Start the /metrics endpoint once per process if SPORTAI_METRICS_PORT is set"""
+    global _server, _server_started
+    with _server_lock:
+        if not _server_started:
+            _server_started = True
+            port = os.environ.get('SPORTAI_METRICS_PORT')
+            if port:
+                try:
+                    _server = monitor.serve(int(port), os.environ.get('SPORTAI_METRICS_HOST', '127.0.0.1'))
+                except OSError:
+                    # Another worker on this host already owns the port
+                    _server = None
+        return _server
@@ -0,0 +1,257 @@
+"""Background document builds in a process pool, cached by input hash.
+
+    from report_jobs import jobs
+    job_id = jobs.submit('report_jobs:build_text_pdf', {'title': 'Board Packet', 'lines': [...]},
+                         inputs=['revenue.csv'], suffix='.pdf')
+    jobs.status(job_id)   # {'status': 'queued' | 'running' | 'done' | 'failed', 'artifact': ...}
+
+A builder is a top-level ``module:function`` taking ``(params, output_path)``.
+It runs in a worker process, so a heavy board packet never holds a Streamlit
+script thread. The job id is a hash of the builder, its params and the
+content of any input files. Submitting the same request again, from any
+session or worker process, returns the existing job or the finished
+artifact instead of building it twice. Status lives in SQLite next to the
+artifacts, so report_download_portal can poll a job and serve the file.
+"""
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
+
+from data_cache import file_hash
+
+JOBS_DB = 'report_jobs.db'
+ARTIFACT_DIR = 'report_artifacts'
+
+
+def job_key(builder: str, params: Dict[str, Any], inputs: Iterable[str] = ()) -> str:
+    h = hashlib.sha256(builder.encode('utf-8'))
+    h.update(json.dumps(params, sort_keys=True, default=str).encode('utf-8'))
+    for path in sorted(inputs):
+        h.update(path.encode('utf-8'))
+        h.update(file_hash(path).encode('ascii'))
+    return h.hexdigest()[:32]
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+    conn.execute('PRAGMA journal_mode=WAL')
+    return conn
+
+
+def _run_job(db_path: str, job_id: str, builder: str, params: Dict[str, Any], artifact: str):
+    """Worker-process entry point: build to a temp file, then publish it atomically"""
+    conn = _connect(db_path)
+    conn.execute("UPDATE jobs SET status = 'running', started_at = ? WHERE job_id = ?", (time.time(), job_id))
+    tmp = f"{artifact}.{os.getpid()}.tmp"
+    try:
+        module_name, func_name = builder.split(':')
+        build = getattr(importlib.import_module(module_name), func_name)
+        os.makedirs(os.path.dirname(artifact), exist_ok=True)
+        build(params, tmp)
+        os.replace(tmp, artifact)
+    except Exception as e:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        conn.execute("UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                     (f"{type(e).__name__}: {e}", time.time(), job_id))
+    else:
+        conn.execute("UPDATE jobs SET status = 'done', error = NULL, finished_at = ? WHERE job_id = ?",
+                     (time.time(), job_id))
+    finally:
+        conn.close()
+
+
+class ReportJobQueue:
+    """Deduplicating job queue over a lazily started process pool"""
+
+    def __init__(self, db_path: str = JOBS_DB, artifact_dir: str = ARTIFACT_DIR, max_workers: int = 2):
+        self.db_path = os.path.abspath(db_path)
+        self.artifact_dir = os.path.abspath(artifact_dir)
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+
+    @classmethod
+    def from_env(cls) -> 'ReportJobQueue':
+        return cls(
+            db_path=os.environ.get('SPORTAI_REPORT_JOBS_DB', JOBS_DB),
+            artifact_dir=os.environ.get('SPORTAI_REPORT_ARTIFACT_DIR', ARTIFACT_DIR),
+            max_workers=int(os.environ.get('SPORTAI_REPORT_WORKERS', '2')),
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Created on first use so worker processes importing builders from here never touch the file
+            conn = self._local.conn = _connect(self.db_path)
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS jobs ('
+                'job_id TEXT PRIMARY KEY, builder TEXT NOT NULL, params TEXT NOT NULL, title TEXT, '
+                'status TEXT NOT NULL, artifact TEXT NOT NULL, error TEXT, owner_pid INTEGER, '
+                'requests INTEGER NOT NULL DEFAULT 1, submitted_at REAL NOT NULL, started_at REAL, finished_at REAL)'
+            )
+        return conn
+
+    def _executor(self) -> ProcessPoolExecutor:
+        with self._pool_lock:
+            if self._pool is None:
+                # spawn: forking a process that is running Streamlit's threads is unsafe
+                self._pool = ProcessPoolExecutor(self.max_workers, mp_context=multiprocessing.get_context('spawn'))
+            return self._pool
+
+    def submit(self, builder: str, params: Dict[str, Any], inputs: Iterable[str] = (), suffix: str = '.pdf',
+               title: Optional[str] = None) -> str:
+        """Queue a build, or return the id of an identical queued, running or finished one"""
+        inputs = list(inputs)
+        job_id = job_key(builder, params, inputs)
+        artifact = os.path.join(self.artifact_dir, job_id[:2], f"{job_id}{suffix}")
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute('SELECT status, artifact, owner_pid FROM jobs WHERE job_id = ?', (job_id,)).fetchone()
+            reuse = row is not None and (
+                (row[0] == 'done' and os.path.exists(row[1]))
+                or (row[0] in ('queued', 'running') and _pid_alive(row[2]))
+            )
+            if reuse:
+                conn.execute('UPDATE jobs SET requests = requests + 1 WHERE job_id = ?', (job_id,))
+            else:
+                conn.execute(
+                    'INSERT INTO jobs (job_id, builder, params, title, status, artifact, owner_pid, submitted_at) '
+                    "VALUES (?, ?, ?, ?, 'queued', ?, ?, ?) ON CONFLICT(job_id) DO UPDATE SET "
+                    "status = 'queued', artifact = excluded.artifact, owner_pid = excluded.owner_pid, error = NULL, "
+                    'requests = requests + 1, submitted_at = excluded.submitted_at, started_at = NULL, '
+                    'finished_at = NULL',
+                    (job_id, builder, json.dumps(params, sort_keys=True, default=str), title or builder, artifact,
+                     os.getpid(), time.time()),
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        if not reuse:
+            future = self._executor().submit(_run_job, self.db_path, job_id, builder, params, artifact)
+            future.add_done_callback(lambda f, job_id=job_id: self._on_done(job_id, f))
+        return job_id
+
+    def _on_done(self, job_id: str, future):
+        # _run_job records its own outcome; this only catches a worker that died mid-build
+        error = future.exception()
+        if error is not None:
+            self._conn().execute(
+                "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ? "
+                "AND status IN ('queued', 'running')",
+                (f"{type(error).__name__}: {error}", time.time(), job_id),
+            )
+
+    def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rows = self._query('WHERE job_id = ?', (job_id,))
+        return rows[0] if rows else None
+
+    def recent(self, limit: int = 20) -> List[Dict[str, Any]]:
+        return self._query('ORDER BY submitted_at DESC LIMIT ?', (limit,))
+
+    def _query(self, clause: str, args: tuple) -> List[Dict[str, Any]]:
+        rows = self._conn().execute(
+            'SELECT job_id, title, status, artifact, error, requests, submitted_at, started_at, finished_at '
+            f'FROM jobs {clause}', args,
+        ).fetchall()
+        keys = ('job_id', 'title', 'status', 'artifact', 'error', 'requests', 'submitted_at', 'started_at',
+                'finished_at')
+        return [dict(zip(keys, row)) for row in rows]
+
+    def artifact(self, job_id: str) -> Optional[str]:
+        """Path of the finished file, or None if the job is not done"""
+        job = self.status(job_id)
+        if job and job['status'] == 'done' and os.path.exists(job['artifact']):
+            return job['artifact']
+        return None
+
+    def read_artifact(self, job_id: str) -> bytes:
+        """Contents of the finished file; meant to run only when someone downloads it"""
+        path = self.artifact(job_id)
+        if path is None:
+            raise FileNotFoundError(f"report job {job_id} has no artifact")
+        with open(path, 'rb') as f:
+            return f.read()
+
+    def wait(self, job_id: str, timeout: Optional[float] = None, poll: float = 0.1) -> Dict[str, Any]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            job = self.status(job_id)
+            if job is None or job['status'] in ('done', 'failed'):
+                return job
+            if deadline is not None and time.monotonic() >= deadline:
+                return job
+            time.sleep(poll)
+
+    def shutdown(self, wait: bool = True):
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=wait)
+                self._pool = None
+
+
+jobs = ReportJobQueue.from_env()
+
+
+def _pdf_escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def build_text_pdf(params: Dict[str, Any], output_path: str):
+    """Plain-text PDF builder with no third-party dependencies.
+
+    params: ``title`` and ``lines`` (list of strings); 60 lines per page.
+    """
+    title = str(params.get('title', 'SportAI Report'))
+    lines = [str(line) for line in params.get('lines', [])]
+    per_page = 60
+    pages = [lines[i:i + per_page] for i in range(0, len(lines), per_page)] or [[]]
+    objects = ['<< /Type /Catalog /Pages 2 0 R >>', None, '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>']
+    page_refs = []
+    for number, page in enumerate(pages, 1):
+        text = [f'BT /F1 14 Tf 50 800 Td ({_pdf_escape(title)}) Tj ET',
+                f'BT /F1 8 Tf 500 20 Td (Page {number} of {len(pages)}) Tj ET',
+                'BT /F1 10 Tf 50 775 Td 12 TL']
+        text += [f'({_pdf_escape(line)}) \'' for line in page]
+        text.append('ET')
+        stream = '\n'.join(text).encode('latin-1', 'replace')
+        objects.append(f'<< /Length {len(stream)} >>\nstream\n'.encode('latin-1') + stream + b'\nendstream')
+        objects.append(f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>')
+        page_refs.append(f'{len(objects)} 0 R')
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(page_refs)}] /Count {len(pages)} >>"
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for index, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        body = obj if isinstance(obj, bytes) else obj.encode('latin-1')
+        out += f'{index} 0 obj\n'.encode('ascii') + body + b'\nendobj\n'
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode('ascii')
+    out += ''.join(f'{offset:010d} 00000 n \n' for offset in offsets).encode('ascii')
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode('ascii')
+    with open(output_path, 'wb') as f:
+        f.write(out)
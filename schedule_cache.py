@@ -0,0 +1,278 @@
+"""Render cache for public schedule and calendar views.
+
+    from schedule_cache import get_schedule_cache
+    cache = get_schedule_cache()
+    etag, payload = cache.calendar('North Dome', '2026-05-01', days=3)
+    etag, payload = cache.calendar('North Dome', '2026-05-01', days=3, if_none_match=etag)   # payload None
+
+Each (facility, day) has a version counter and a precomputed payload:
+that day's bookings plus a surface x hour occupancy grid, kept both as a
+dict and as JSON bytes. A calendar over a date range is the list of its
+day payloads. Its ETag comes from the day versions, so checking whether a
+viewer's copy is current costs a few dict lookups and never touches the
+bookings. Day versions count only the events this process has seen, so
+once a day in the range has live changes the ETag also carries a
+per-process nonce; days no event has touched are built from the booking
+file alone and their ETags agree across workers.
+
+booking_data.csv is indexed by (facility, day) once per file version; a
+booking is listed under every day it covers, so one that runs past
+midnight also shows on the next day. Booking and cancellation events from
+the change feed bump only the days the booking covers, so the next view
+rebuilds those days and every other day is served as is. ``serve(port)``
+exposes the same payloads over HTTP with ETag / If-None-Match
+(SPORTAI_SCHEDULE_PORT), for a public page or CDN in front of the app.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from change_feed import feed
+
+Day = Tuple[str, date]
+
+
+def _as_date(value) -> date:
+    return value if isinstance(value, date) and not isinstance(value, pd.Timestamp) else pd.Timestamp(value).date()
+
+
+def _days_covered(start: pd.Timestamp, end: pd.Timestamp) -> List[date]:
+    """Days a booking touches; one ending exactly at midnight does not reach the next day"""
+    first = start.normalize()
+    last = max((end - pd.Timedelta(1)).normalize(), first)
+    return [d.date() for d in pd.date_range(first, last, freq='D')]
+
+
+class ScheduleCache:
+    """Per-day calendar payloads with version counters and ETags"""
+
+    def __init__(self, path: str = 'booking_data.csv', max_days: int = 4096):
+        self.path = path
+        self.max_days = max_days
+        self.generation = ''
+        self._frame = pd.DataFrame(columns=['facility', 'surface', 'start', 'end'])
+        self._rows: Dict[Day, np.ndarray] = {}
+        self._added: Dict[Day, List[Dict[str, Any]]] = {}
+        self._removed: Dict[Day, List[Tuple[str, str, str]]] = {}
+        self._versions: Dict[Day, int] = {}
+        self._payloads: "OrderedDict[Day, Tuple[int, Dict[str, Any], bytes]]" = OrderedDict()
+        self._lock = threading.RLock()
+        self.stats = {'hits': 0, 'builds': 0, 'not_modified': 0}
+        self._nonce = os.urandom(8).hex()
+
+    def _refresh(self):
+        """Re-index the booking file when its contents change"""
+        from data_cache import file_hash, load_csv
+
+        digest = file_hash(self.path) if os.path.exists(self.path) else 'empty'
+        if digest == self.generation:
+            return
+        frame = load_csv(self.path) if digest != 'empty' else pd.DataFrame(columns=['surface', 'start_time'])
+        start = pd.to_datetime(frame['start_time'], errors='coerce')
+        end = pd.to_datetime(frame['end_time'], errors='coerce') if 'end_time' in frame else start + pd.Timedelta(hours=1)
+        frame = pd.DataFrame({
+            'facility': frame['facility'].astype(str) if 'facility' in frame else 'main',
+            'surface': frame['surface'].astype(str),
+            'start': start,
+            'end': end.fillna(start + pd.Timedelta(hours=1)),
+        })[start.notna()].reset_index(drop=True)
+        rows = {}
+        if len(frame):
+            # One index entry per (booking, covered day); an end exactly at midnight stays on the earlier day
+            first = frame['start'].dt.normalize()
+            last = (frame['end'] - pd.Timedelta(1)).dt.normalize().where(frame['end'] > frame['start'], first)
+            spans = ((last - first) // pd.Timedelta(days=1)).clip(lower=0).to_numpy(dtype=np.int64) + 1
+            booking = np.repeat(np.arange(len(frame)), spans)
+            offset = np.arange(len(booking)) - np.repeat(np.cumsum(spans) - spans, spans)
+            covered = pd.DataFrame({
+                'facility': frame['facility'].to_numpy()[booking],
+                'day': (first.to_numpy()[booking] + offset.astype('timedelta64[D]')).astype('datetime64[D]'),
+            })
+            groups = covered.groupby(['facility', 'day']).indices
+            rows = {(facility, pd.Timestamp(day).date()): booking[idx] for (facility, day), idx in groups.items()}
+        with self._lock:
+            self._frame, self._rows = frame, rows
+            self._added, self._removed, self._versions = {}, {}, {}
+            self._payloads.clear()
+            self.generation = digest
+
+    def apply(self, event: Dict[str, Any]):
+        """Change feed subscriber: record a booking or cancellation and invalidate the days it covers"""
+        data = event['data']
+        if 'surface' not in data or 'start' not in data:
+            return
+        start = pd.Timestamp(data['start'])
+        end = pd.Timestamp(data['end']) if data.get('end') else start + pd.Timedelta(hours=1)
+        booking = {'surface': str(data['surface']), 'start': start.isoformat(), 'end': end.isoformat()}
+        facility = event['facility'] or 'main'
+        with self._lock:
+            for day in _days_covered(start, end):
+                key = (facility, day)
+                if event['kind'] == 'booking':
+                    self._added.setdefault(key, []).append(booking)
+                else:
+                    self._removed.setdefault(key, []).append((booking['surface'], booking['start'], booking['end']))
+                self._versions[key] = self._versions.get(key, 0) + 1
+                self._payloads.pop(key, None)
+
+    def _build_day(self, key: Day) -> Dict[str, Any]:
+        rows = self._frame.iloc[self._rows[key]] if key in self._rows else self._frame.iloc[:0]
+        bookings = [{'surface': s, 'start': b.isoformat(), 'end': e.isoformat()}
+                    for s, b, e in zip(rows['surface'], rows['start'], rows['end'])]
+        bookings += self._added.get(key, [])
+        for removed in self._removed.get(key, []):
+            match = next((b for b in bookings if (b['surface'], b['start'], b['end']) == removed), None)
+            if match is not None:
+                bookings.remove(match)
+        bookings.sort(key=lambda b: (b['start'], b['surface']))
+
+        # Occupancy per surface and hour of this day, clipped to 00:00-24:00 for bookings crossing midnight
+        midnight = pd.Timestamp(key[1])
+        hours: Dict[str, List[int]] = {}
+        for booking in bookings:
+            first = int((pd.Timestamp(booking['start']) - midnight) / pd.Timedelta(hours=1))
+            last = int(np.ceil((pd.Timestamp(booking['end']) - midnight) / pd.Timedelta(hours=1)))
+            grid = hours.setdefault(booking['surface'], [0] * 24)
+            for hour in range(max(first, 0), min(max(last, first + 1), 24)):
+                grid[hour] += 1
+        return {'facility': key[0], 'date': key[1].isoformat(), 'bookings': bookings,
+                'hours': dict(sorted(hours.items()))}
+
+    def day(self, facility: str, day) -> Tuple[int, Dict[str, Any], bytes]:
+        """(version, payload, JSON bytes) for one facility day, building it only if it changed"""
+        self._refresh()
+        key = (facility, _as_date(day))
+        with self._lock:
+            version = self._versions.get(key, 0)
+            entry = self._payloads.get(key)
+            if entry is not None and entry[0] == version:
+                self._payloads.move_to_end(key)
+                self.stats['hits'] += 1
+                return entry
+            payload = self._build_day(key)
+            entry = (version, payload, json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+            self._payloads[key] = entry
+            while len(self._payloads) > self.max_days:
+                self._payloads.popitem(last=False)
+            self.stats['builds'] += 1
+            return entry
+
+    def etag(self, facility: str, start, days: int = 1) -> str:
+        """Version tag for a date range; changes whenever any day in it changes"""
+        self._refresh()
+        first = _as_date(start)
+        with self._lock:
+            versions = [self._versions.get((facility, first + timedelta(days=i)), 0) for i in range(days)]
+            tag = f"{self.generation}|{facility}|{first}|{days}|{versions}"
+            if any(versions):
+                # Another worker's counters for these days describe different events
+                tag += f"|{self._nonce}"
+        return '"' + hashlib.sha1(tag.encode('utf-8')).hexdigest()[:20] + '"'
+
+    def calendar(self, facility: str, start, days: int = 7,
+                 if_none_match: Optional[str] = None) -> Tuple[str, Optional[Dict[str, Any]]]:
+        """(etag, payload); payload is None when if_none_match is still current"""
+        etag = self.etag(facility, start, days)
+        if if_none_match == etag:
+            self.stats['not_modified'] += 1
+            return etag, None
+        first = _as_date(start)
+        payloads = [self.day(facility, first + timedelta(days=i))[1] for i in range(days)]
+        return etag, {'facility': facility, 'start': first.isoformat(), 'days': payloads}
+
+    def calendar_json(self, facility: str, start, days: int = 7) -> Tuple[str, bytes]:
+        """(etag, JSON body) stitched from the cached per-day JSON"""
+        etag = self.etag(facility, start, days)
+        first = _as_date(start)
+        parts = [self.day(facility, first + timedelta(days=i))[2] for i in range(days)]
+        head = json.dumps({'facility': facility, 'start': first.isoformat()})[:-1].encode('utf-8')
+        return etag, head + b',"days":[' + b','.join(parts) + b']}'
+
+    def facilities(self) -> List[str]:
+        self._refresh()
+        with self._lock:
+            return sorted({key[0] for key in self._rows} | {key[0] for key in self._added})
+
+    def serve(self, port: int) -> ThreadingHTTPServer:
+        """Serve /schedule?facility=...&start=YYYY-MM-DD&days=N with ETag support from a daemon thread"""
+        cache = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                url = urlsplit(self.path)
+                if url.path != '/schedule':
+                    self.send_error(404)
+                    return
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    facility = query['facility']
+                    start = _as_date(query.get('start', date.today().isoformat()))
+                    days = min(max(int(query.get('days', 7)), 1), 62)
+                except (KeyError, ValueError):
+                    self.send_error(400, 'facility is required; start is YYYY-MM-DD; days is 1-62')
+                    return
+                etag = cache.etag(facility, start, days)
+                if self.headers.get('If-None-Match') == etag:
+                    cache.stats['not_modified'] += 1
+                    self.send_response(304)
+                    self.send_header('ETag', etag)
+                    self.end_headers()
+                    return
+                etag, body = cache.calendar_json(facility, start, days)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.send_header('ETag', etag)
+                self.send_header('Cache-Control', 'public, max-age=0, must-revalidate')
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(('0.0.0.0', port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True, name='schedule-cache').start()
+        return server
+
+
+_cache: Optional[ScheduleCache] = None
+_cache_lock = threading.Lock()
+_server_started = False
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def get_schedule_cache() -> ScheduleCache:
+    """Process-wide cache for SPORTAI_SCHEDULE_FILE, kept current by the change feed"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = ScheduleCache(os.environ.get('SPORTAI_SCHEDULE_FILE', 'booking_data.csv'))
+            feed.subscribe(_cache.apply, ('booking', 'cancellation'))
+        return _cache
+
+
+def start_schedule_server() -> Optional[ThreadingHTTPServer]:
+    """Start the /schedule endpoint once per process if SPORTAI_SCHEDULE_PORT is set"""
+    global _server, _server_started
+    with _cache_lock:
+        if _server_started:
+            return _server
+        _server_started = True
+    port = os.environ.get('SPORTAI_SCHEDULE_PORT')
+    if port:
+        try:
+            _server = get_schedule_cache().serve(int(port))
+        except OSError:
+            # Another worker on this host already owns the port
+            _server = None
+    return _server
@@ -0,0 +1,364 @@
+"""Shared state for running several app workers behind a load balancer.
+
+Login sessions, tool caches and computed AI results are stored in a backend
+that every worker process can reach, not in one worker's memory:
+
+    from shared_state import get_shared_state
+    state = get_shared_state()
+    token = state.create_session({'email': ..., 'role': ...})
+    forecast = state.cached('forecast', digest, lambda: expensive(), ttl=3600)
+
+    @state.memoize('sponsor_matches', ttl=600)
+    def match(assets_digest, sponsors_digest): ...
+
+The backend is chosen by SPORTAI_STATE_URL:
+  sqlite:///shared_state.db   (default) a WAL-mode SQLite file shared by the
+                              workers on one host
+  redis://host:6379/0         any Redis-compatible service, spoken to over
+                              RESP with no client library needed
+  rediss://host:6380/0        the same over TLS, verified against the
+                              system certificate store
+
+``python shared_state.py --local-redis 6380`` runs a small in-memory,
+Redis-compatible server for testing. Cached values are stored as JSON
+(DataFrames in pandas' table format), so a value read back from the store
+can never run code; values must be JSON types, numpy scalars or arrays,
+or DataFrames.
+"""
+import argparse
+import functools
+import hashlib
+import io
+import json
+import os
+import pickle
+import secrets
+import socket
+import socketserver
+import sqlite3
+import ssl
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from urllib.parse import urlsplit
+
+SESSION_TTL = float(os.environ.get('SPORTAI_SESSION_TTL', str(12 * 3600)))
+
+
+class StateBackend:
+    """Interface for shared key/value storage; backends implement get, set and delete."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        raise NotImplementedError
+
+    def delete(self, key: str):
+        raise NotImplementedError
+
+
+class SQLiteStateBackend(StateBackend):
+    """Key/value table in a local SQLite file; expired rows are purged lazily"""
+
+    def __init__(self, path: str = 'shared_state.db', purge_every: int = 1000):
+        self.path = path
+        self.purge_every = purge_every
+        self._writes = 0
+        self._local = threading.local()
+        self._conn().execute('CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, '
+                             'expires_at REAL) WITHOUT ROWID')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._conn().execute('SELECT value, expires_at FROM kv WHERE key = ?', (key,)).fetchone()
+        if row is None or (row[1] is not None and row[1] <= time.time()):
+            return None
+        return row[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        conn = self._conn()
+        conn.execute('INSERT INTO kv (key, value, expires_at) VALUES (?, ?, ?) ON CONFLICT(key) DO UPDATE SET '
+                     'value = excluded.value, expires_at = excluded.expires_at',
+                     (key, value, time.time() + ttl if ttl else None))
+        self._writes += 1
+        if self._writes % self.purge_every == 0:
+            conn.execute('DELETE FROM kv WHERE expires_at IS NOT NULL AND expires_at <= ?', (time.time(),))
+
+    def delete(self, key: str):
+        self._conn().execute('DELETE FROM kv WHERE key = ?', (key,))
+
+
+class RedisStateBackend(StateBackend):
+    """Minimal RESP client (GET/SET/DEL) with one connection per thread"""
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 6379, db: int = 0, password: Optional[str] = None,
+                 timeout: float = 5.0, tls: bool = False, ssl_context: Optional[ssl.SSLContext] = None):
+        self.address = (host, port)
+        self.db = db
+        self.password = password
+        self.timeout = timeout
+        self.ssl_context = ssl_context or (ssl.create_default_context() if tls else None)
+        self._local = threading.local()
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisStateBackend':
+        parts = urlsplit(url)
+        db = int(parts.path.strip('/') or 0)
+        return cls(parts.hostname or '127.0.0.1', parts.port or 6379, db, parts.password,
+                   tls=parts.scheme == 'rediss')
+
+    def _connection(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            sock = socket.create_connection(self.address, timeout=self.timeout)
+            if self.ssl_context is not None:
+                # Verifies the certificate and hostname before AUTH sends the password
+                sock = self.ssl_context.wrap_socket(sock, server_hostname=self.address[0])
+            conn = self._local.conn = (sock, sock.makefile('rb'))
+            if self.password:
+                self._roundtrip(conn, 'AUTH', self.password)
+            if self.db:
+                self._roundtrip(conn, 'SELECT', str(self.db))
+        return conn
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        out = [f'*{len(args)}\r\n'.encode('ascii')]
+        for arg in args:
+            data = arg if isinstance(arg, bytes) else str(arg).encode('utf-8')
+            out.append(b'$%d\r\n%s\r\n' % (len(data), data))
+        return b''.join(out)
+
+    def _roundtrip(self, conn, *args):
+        sock, reader = conn
+        sock.sendall(self._encode(*args))
+        return _read_reply(reader)
+
+    def command(self, *args):
+        try:
+            return self._roundtrip(self._connection(), *args)
+        except (OSError, ConnectionError):
+            # Reconnect once: the server may have closed an idle connection
+            self._local.conn = None
+            return self._roundtrip(self._connection(), *args)
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self.command('GET', key)
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None):
+        if ttl:
+            self.command('SET', key, value, 'PX', int(ttl * 1000))
+        else:
+            self.command('SET', key, value)
+
+    def delete(self, key: str):
+        self.command('DEL', key)
+
+
+def _read_reply(reader):
+    line = reader.readline()
+    if not line:
+        raise ConnectionError('connection closed')
+    kind, rest = line[:1], line[1:-2]
+    if kind == b'+':
+        return rest.decode('utf-8')
+    if kind == b'-':
+        raise RuntimeError(rest.decode('utf-8'))
+    if kind == b':':
+        return int(rest)
+    if kind == b'$':
+        size = int(rest)
+        if size < 0:
+            return None
+        data = reader.read(size + 2)
+        return data[:-2]
+    if kind == b'*':
+        count = int(rest)
+        return None if count < 0 else [_read_reply(reader) for _ in range(count)]
+    raise RuntimeError(f"Unexpected reply {line!r}")
+
+
+def _json_default(value):
+    import numpy as np
+    import pandas as pd
+
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': json.loads(value.to_json(orient='table', date_format='iso'))}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError(f"{type(value).__name__} values cannot be stored in shared state")
+
+
+def _json_object(obj: Dict[str, Any]):
+    if '__frame__' in obj:
+        import pandas as pd
+        return pd.read_json(io.StringIO(json.dumps(obj['__frame__'])), orient='table')
+    return obj
+
+
+def encode_value(value: Any) -> bytes:
+    return json.dumps(value, default=_json_default).encode('utf-8')
+
+
+def decode_value(data: bytes) -> Any:
+    return json.loads(data, object_hook=_json_object)
+
+
+def backend_from_url(url: str) -> StateBackend:
+    scheme = urlsplit(url).scheme
+    if scheme in ('redis', 'rediss'):
+        return RedisStateBackend.from_url(url)
+    if scheme == 'sqlite':
+        return SQLiteStateBackend(url[len('sqlite:///'):] or 'shared_state.db')
+    raise ValueError(f"Unsupported SPORTAI_STATE_URL scheme '{scheme}'")
+
+
+class SharedState:
+    """Sessions and caches on top of a StateBackend"""
+
+    def __init__(self, backend: StateBackend, prefix: str = 'sportai'):
+        self.backend = backend
+        self.prefix = prefix
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    def create_session(self, user: Dict[str, Any], ttl: float = SESSION_TTL) -> str:
+        """Store a login and return the token that identifies it on any worker"""
+        token = secrets.token_urlsafe(32)
+        self.backend.set(self._key('session', token), json.dumps(user).encode('utf-8'), ttl)
+        return token
+
+    def get_session(self, token: Optional[str]) -> Optional[Dict[str, Any]]:
+        if not token:
+            return None
+        data = self.backend.get(self._key('session', token))
+        return json.loads(data) if data else None
+
+    def end_session(self, token: Optional[str]):
+        if token:
+            self.backend.delete(self._key('session', token))
+
+    def cached(self, namespace: str, key: str, compute: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        """Value stored under (namespace, key), computed and shared on a miss"""
+        full_key = self._key(namespace, key)
+        data = self.backend.get(full_key)
+        if data is not None:
+            return decode_value(data)
+        value = compute()
+        self.backend.set(full_key, encode_value(value), ttl)
+        return value
+
+    def memoize(self, namespace: str, ttl: Optional[float] = None):
+        """Decorator sharing a function's results across workers, keyed by its arguments"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                # Pickle only hashes the arguments here; nothing read from the store is unpickled
+                digest = hashlib.sha256(pickle.dumps((args, sorted(kwargs.items())))).hexdigest()
+                return self.cached(namespace, digest, lambda: func(*args, **kwargs), ttl)
+            return wrapper
+        return decorator
+
+    def invalidate(self, namespace: str, key: str):
+        self.backend.delete(self._key(namespace, key))
+
+
+_shared: Optional[SharedState] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_state() -> SharedState:
+    """Process-wide SharedState for SPORTAI_STATE_URL"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = SharedState(backend_from_url(os.environ.get('SPORTAI_STATE_URL', 'sqlite:///shared_state.db')))
+        return _shared
+
+
+class LocalRedisServer(socketserver.ThreadingTCPServer):
+    """In-memory stand-in for a Redis-compatible service (PING, GET, SET [EX|PX], DEL, SELECT, AUTH)"""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port: int = 0):
+        self.data: Dict[bytes, tuple] = {}
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), _RedisHandler)
+
+    @property
+    def url(self) -> str:
+        return f"redis://127.0.0.1:{self.server_address[1]}/0"
+
+    def start(self) -> 'LocalRedisServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+
+class _RedisHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                args = _read_reply(self.rfile)
+            except (ConnectionError, OSError, ValueError):
+                return
+            if not isinstance(args, list) or not args:
+                return
+            self.wfile.write(self.execute([a if isinstance(a, bytes) else str(a).encode() for a in args]))
+
+    def execute(self, args: List[bytes]) -> bytes:
+        command = args[0].upper()
+        server = self.server
+        if command == b'PING':
+            return b'+PONG\r\n'
+        if command in (b'SELECT', b'AUTH'):
+            return b'+OK\r\n'
+        if command == b'GET' and len(args) == 2:
+            with server.lock:
+                entry = server.data.get(args[1])
+                if entry and entry[1] is not None and entry[1] <= time.monotonic():
+                    del server.data[args[1]]
+                    entry = None
+            if entry is None:
+                return b'$-1\r\n'
+            return b'$%d\r\n%s\r\n' % (len(entry[0]), entry[0])
+        if command == b'SET' and len(args) >= 3:
+            expires = None
+            if len(args) == 5 and args[3].upper() in (b'EX', b'PX'):
+                expires = time.monotonic() + int(args[4]) / (1 if args[3].upper() == b'EX' else 1000)
+            with server.lock:
+                server.data[args[1]] = (args[2], expires)
+            return b'+OK\r\n'
+        if command == b'DEL':
+            with server.lock:
+                removed = sum(server.data.pop(key, None) is not None for key in args[1:])
+            return b':%d\r\n' % removed
+        return b'-ERR unsupported command\r\n'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Shared state utilities.')
+    parser.add_argument('--local-redis', type=int, metavar='PORT', help='run an in-memory Redis-compatible server')
+    args = parser.parse_args(argv)
+    if args.local_redis is not None:
+        server = LocalRedisServer(args.local_redis)
+        print(f"Local Redis-compatible server on {server.url} (set SPORTAI_STATE_URL to this)")
+        server.serve_forever()
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
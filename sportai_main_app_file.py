@@ -1,8 +1,9 @@
 import os
 import sys
+import logging
 import streamlit as st
-import json
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, List, Tuple
 
 # Add current directory to Python path
 BASE_DIR = os.path.dirname(__file__)
@@ -11,424 +12,77 @@ if BASE_DIR not in sys.path:
 
 # Import AI modules (with error handling)
 try:
+    from data_cache import file_hash, load_csv, load_json
     from ai_modules.demand_forecasting import DemandForecaster
     from ai_modules.scheduling_optimizer import optimize_schedule
     from ai_modules.sponsorship_matcher import match_sponsors
-    from ai_modules.dynamic_contract_generator import generate_contract
-    from ai_modules.membership_churn import ChurnPredictor
+    from ai_modules.dynamic_contract_generator import generate_contract, generate_contracts_batch
+    from ai_modules.membership_churn import ChurnPredictor, load_churn_scores
     from ai_modules.marketing_optimizer import optimize_campaign
     AI_MODULES_AVAILABLE = True
 except ImportError as e:
     AI_MODULES_AVAILABLE = False
 
-# Import all other modules with error handling
-def safe_import(module_name):
-    """Safely import a module and return it, or None if import fails"""
-    try:
-        return __import__(module_name)
-    except ImportError:
-        return None
+# Tool modules are registered by name and only imported when first used
+from tool_registry import registry, import_report, MODULE_KEYWORDS, QUICK_ACCESS_TOOLS, TOOL_MENU
+from tool_search import ToolSearchIndex
+from render_metrics import monitor, start_metrics_server
+from notification_dispatcher import get_outbox, start_dispatcher, subscribe_booking_notices
+from report_jobs import jobs as report_jobs
+from schedule_cache import start_schedule_server
+from shared_state import SESSION_TTL, get_shared_state
+from user_store import SQLiteUserStore, UserStore, DEFAULT_USERS, verify_pw
 
-# Core modules mapping
-modules = {
-    'auth': safe_import('auth'),
-    'header_loader': safe_import('header_loader'),
-    
-    # AI Tools
-    'ai_event_forecast': safe_import('ai_event_forecast'),
-    'ai_matchmaker_tool': safe_import('ai_matchmaker_tool'),
-    'ai_revenue_maximizer': safe_import('ai_revenue_maximizer'),
-    'ai_scheduler_tool': safe_import('ai_scheduler_tool'),
-    'ai_scheduling_suggestions': safe_import('ai_scheduling_suggestions'),
-    'ai_sponsor_opportunity_finder': safe_import('ai_sponsor_opportunity_finder'),
-    'ai_strategy_dashboard': safe_import('ai_strategy_dashboard'),
-    'ai_suggestion_digest': safe_import('ai_suggestion_digest'),
-    'ai_voice_command': safe_import('ai_voice_command'),
-    'ai_facility_chat': safe_import('ai_facility_chat'),
-    'ai_voice_responder': safe_import('ai_voice_responder'),
-    
-    # Core Management
-    'central_dashboard': safe_import('central_dashboard'),
-    'event_control_panel': safe_import('event_control_panel'),
-    'event_creator_ai': safe_import('event_creator_ai'),
-    'facility_master_tracker': safe_import('facility_master_tracker'),
-    'membership_dashboard': safe_import('membership_dashboard'),
-    
-    # Facility Management
-    'facility_access_tracker': safe_import('facility_access_tracker'),
-    'facility_capacity_alerts': safe_import('facility_capacity_alerts'),
-    'facility_contract_monitor': safe_import('facility_contract_monitor'),
-    'facility_layout_map': safe_import('facility_layout_map'),
-    'facility_membership_monitor': safe_import('facility_membership_monitor'),
-    'complex_usage_optimizer': safe_import('complex_usage_optimizer'),
-    'dome_usage_tool': safe_import('dome_usage_tool'),
-    'surface_usage_by_type': safe_import('surface_usage_by_type'),
-    'surface_demand_heatmap': safe_import('surface_demand_heatmap'),
-    'adaptive_use_planner': safe_import('adaptive_use_planner'),
-    
-    # Membership & CRM
-    'membership_credit_tracker': safe_import('membership_credit_tracker'),
-    'membership_crm_tracker': safe_import('membership_crm_tracker'),
-    'membership_goal_tracker': safe_import('membership_goal_tracker'),
-    'membership_insights_ai': safe_import('membership_insights_ai'),
-    'membership_loyalty_rewards': safe_import('membership_loyalty_rewards'),
-    'membership_marketing_ai': safe_import('membership_marketing_ai'),
-    'member_portal': safe_import('member_portal'),
-    'member_selector': safe_import('member_selector'),
-    
-    # Sponsorship & Revenue
-    'sponsor_dashboard': safe_import('sponsor_dashboard'),
-    'sponsorship_ai_calculator': safe_import('sponsorship_ai_calculator'),
-    'sponsorship_availability': safe_import('sponsorship_availability'),
-    'sponsorship_contract_generator': safe_import('sponsorship_contract_generator'),
-    'sponsorship_inventory_manager': safe_import('sponsorship_inventory_manager'),
-    'sponsorship_roi_tracker': safe_import('sponsorship_roi_tracker'),
-    'sponsorship_tracker': safe_import('sponsorship_tracker'),
-    'sponsor_portal': safe_import('sponsor_portal'),
-    'revenue_heatmap': safe_import('revenue_heatmap'),
-    'revenue_projection_simulator': safe_import('revenue_projection_simulator'),
-    'sponsorship_revenue_builder': safe_import('sponsorship_revenue_builder'),
-    'ai_sponsor_pricing_trends': safe_import('ai_sponsor_pricing_trends'),
-    'sponsor_pitch_portal': safe_import('sponsor_pitch_portal'),
-    'sponsor_pitchbook_builder': safe_import('sponsor_pitchbook_builder'),
-    'sponsor_pdf_packet': safe_import('sponsor_pdf_packet'),
-    'sponsor_link_sender': safe_import('sponsor_link_sender'),
-    'sponsor_map_viewer': safe_import('sponsor_map_viewer'),
-    
-    # Events & Sports
-    'tournament_scheduler': safe_import('tournament_scheduler'),
-    'esports_manager': safe_import('esports_manager'),
-    'adaptive_sports_center': safe_import('adaptive_sports_center'),
-    'league_coordinator': safe_import('league_coordinator'),
-    'team_club_manager': safe_import('team_club_manager'),
-    'sport_library': safe_import('sport_library'),
-    'event_profit_analyzer': safe_import('event_profit_analyzer'),
-    'event_admin': safe_import('event_admin'),
-    'international_team_portal': safe_import('international_team_portal'),
-    'park_activity_dashboard': safe_import('park_activity_dashboard'),
-    
-    # Financial & Reporting
-    'board_pdf_exporter': safe_import('board_pdf_exporter'),
-    'finance_feed_connector': safe_import('finance_feed_connector'),
-    'financial_feed_sync': safe_import('financial_feed_sync'),
-    'revenue_proforma_auto': safe_import('revenue_proforma_auto'),
-    'weekly_report_generator': safe_import('weekly_report_generator'),
-    'report_download_portal': safe_import('report_download_portal'),
-    'board_packet_pdf_generator': safe_import('board_packet_pdf_generator'),
-    'board_report_scheduler': safe_import('board_report_scheduler'),
-    'pdf_export_tool': safe_import('pdf_export_tool'),
-    
-    # Grants & Fundraising
-    'grant_renewal_manager': safe_import('grant_renewal_manager'),
-    'grant_alert_center': safe_import('grant_alert_center'),
-    'grant_writer_ai': safe_import('grant_writer_ai'),
-    'grant_match_ai': safe_import('grant_match_ai'),
-    'grant_status_manager': safe_import('grant_status_manager'),
-    'pdf_grant_exporter': safe_import('pdf_grant_exporter'),
-    'investor_kit_generator': safe_import('investor_kit_generator'),
-    'investor_pitch_portal': safe_import('investor_pitch_portal'),
-    'funding_narrative_sync': safe_import('funding_narrative_sync'),
-    
-    # Donations
-    'donation_landing_page': safe_import('donation_landing_page'),
-    'donation_checkout': safe_import('donation_checkout'),
-    'donation_campaign_viewer': safe_import('donation_campaign_viewer'),
-    'donation_goal_tracker': safe_import('donation_goal_tracker'),
-    'donor_profile_creator': safe_import('donor_profile_creator'),
-    'crm_export_generator': safe_import('crm_export_generator'),
-    'crm_grant_donor_sync': safe_import('crm_grant_donor_sync'),
-    
-    # Communications & Alerts
-    'email_notifications': safe_import('email_notifications'),
-    'sms_alert_center': safe_import('sms_alert_center'),
-    'slack_alert_center': safe_import('slack_alert_center'),
-    'member_alerts_auto': safe_import('member_alerts_auto'),
-    'usage_alerts_auto': safe_import('usage_alerts_auto'),
-    'contract_alerts_auto': safe_import('contract_alerts_auto'),
-    'credential_expiry_alerts': safe_import('credential_expiry_alerts'),
-    'daily_task_scheduler': safe_import('daily_task_scheduler'),
-    
-    # Integrations & Tools
-    'google_sheets_sync': safe_import('google_sheets_sync'),
-    'gsheets_sync': safe_import('gsheets_sync'),
-    'webhook_automation': safe_import('webhook_automation'),
-    'pandadoc_contract': safe_import('pandadoc_contract'),
-    'auto_contract_generator': safe_import('auto_contract_generator'),
-    'hubspot_deal_logger': safe_import('hubspot_deal_logger'),
-    'mailchimp_lead_collector': safe_import('mailchimp_lead_collector'),
-    
-    # Marketing & Media
-    'marketing_flipbook_generator': safe_import('marketing_flipbook_generator'),
-    'marketing_packet_builder': safe_import('marketing_packet_builder'),
-    'flipbook_embedder': safe_import('flipbook_embedder'),
-    'flipbook_pitch_creator': safe_import('flipbook_pitch_creator'),
-    'screen_rotation_scheduler': safe_import('screen_rotation_scheduler'),
-    'media_display_rotator': safe_import('media_display_rotator'),
-    
-    # Governance & Admin
-    'governance_admin': safe_import('governance_admin'),
-    'governance_diagram': safe_import('governance_diagram'),
-    'governance_tool': safe_import('governance_tool'),
-    'admin_override_console': safe_import('admin_override_console'),
-    'admin_sidebar_badges': safe_import('admin_sidebar_badges'),
-    'platform_guidebook_writer': safe_import('platform_guidebook_writer'),
-    
-    # Utilities
-    'dynamic_pricing_tool': safe_import('dynamic_pricing_tool'),
-    'visual_calendar_layout': safe_import('visual_calendar_layout'),
-    'mobile_friendly_ui': safe_import('mobile_friendly_ui'),
-    'real_time_dashboard': safe_import('real_time_dashboard'),
-    'setup_assistant_ai': safe_import('setup_assistant_ai'),
-    'portal_router': safe_import('portal_router'),
-    'upsell_offer_engine': safe_import('upsell_offer_engine'),
-    'public_schedule': safe_import('public_schedule'),
-    'expiring_link_manager': safe_import('expiring_link_manager'),
-    
-    # Specialty Programs
-    'scholarship_fund_manager': safe_import('scholarship_fund_manager'),
-    'scholarship_tracker': safe_import('scholarship_tracker'),
-    'mentorship_center': safe_import('mentorship_center'),
-    'volunteer_hub': safe_import('volunteer_hub'),
-    'student_committee': safe_import('student_committee'),
-    'referee_manager': safe_import('referee_manager'),
-    'nil_tracker': safe_import('nil_tracker'),
-    'trail_access_planner': safe_import('trail_access_planner'),
-    
-    # Contract & Performance
-    'contract_insights_ai': safe_import('contract_insights_ai'),
-    'contract_usage_tracker': safe_import('contract_usage_tracker'),
-    'performance_goal_ai': safe_import('performance_goal_ai'),
-    'facility_membership_comparator_ai': safe_import('facility_membership_comparator_ai'),
-    'membership_ticketing_integration': safe_import('membership_ticketing_integration'),
-    'sponsorship_inventory_limiter': safe_import('sponsorship_inventory_limiter'),
-}
+# Cookie holding the shared session token; it never goes in the URL
+SESSION_COOKIE = 'sportai_session'
+
+# Optional background warm-up of every tool module after the first page is served
+PRELOAD_TOOLS = os.environ.get('SPORTAI_PRELOAD', '').lower() in ('1', 'true', 'yes')
+PRELOAD_WORKERS = int(os.environ.get('SPORTAI_PRELOAD_WORKERS', '4'))
 
-# Filter out None values (failed imports)
-available_modules = {k: v for k, v in modules.items() if v is not None}
 
 class SportAIApp:
     def __init__(self):
         self.users = self.load_users()
-        self.tools = self.build_tools_menu()
+        self.tools, self.categories = self.build_tools_menu()
+        self.quick_tools = [tool for tool in QUICK_ACCESS_TOOLS if tool in self.tools]
+        self.search_index = self.build_search_index()
 
-    def load_users(self) -> Dict[str, Any]:
-        """Load user data securely and create default users if needed."""
-        file_path = 'users.json'
-        default_users = {
-            "admin@sportai.com": {"password": hash_pw("admin123"), "role": "admin"},
-            "manager@sportai.com": {"password": hash_pw("manager123"), "role": "manager"},
-            "user@sportai.com": {"password": hash_pw("user123"), "role": "user"},
-        }
+    def load_users(self) -> UserStore:
+        """Open the user store, seeding it from users.json or the default users on first run."""
         try:
-            if not os.path.exists(file_path):
-                with open(file_path, "w") as f:
-                    json.dump(default_users, f, indent=2)
-                return default_users
-            else:
-                with open(file_path, "r") as f:
-                    users = json.load(f)
-                # If old (plaintext) users.json, upgrade
-                updated = False
-                for k, v in users.items():
-                    if len(v['password']) != 64:  # not hex sha256
-                        v['password'] = hash_pw(v['password'])
-                        updated = True
-                if updated:
-                    with open(file_path, "w") as f:
-                        json.dump(users, f, indent=2)
-                return users
+            return SQLiteUserStore(os.environ.get('SPORTAI_USER_DB', 'users.db'))
         except Exception as e:
             st.error(f"User loading failed: {e}")
             logging.error(f"load_users error: {e}")
-            return default_users
+            return dict(DEFAULT_USERS)
 
-    def build_tools_menu(self) -> Dict[str, Any]:
-        """Only show tools whose modules loaded successfully."""
-        # (Reuse your tool_categories dict as before)
-        tool_categories = {
-            # ... (omitted for brevity, same as your original)
-        }
+    def build_tools_menu(self) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+        """Build the tools menu and its category index in one pass over TOOL_MENU"""
         tools = {}
-        for tool_name, module_key in tool_categories.items():
-            if module_key in available_modules:
-                tools[tool_name] = available_modules[module_key]
-        return tools
-
-    def login(self):
-        st.sidebar.header('🔐 Login')
-        email = st.sidebar.text_input('Email', key='login_email')
-        password = st.sidebar.text_input('Password', type='password', key='login_password')
-        if st.sidebar.button('Login'):
-            user = self.users.get(email)
-            if user and verify_pw(password, user['password']):
-                st.session_state.user = {'email': email, 'role': user['role']}
-                st.sidebar.success('✅ Login successful!')
-                st.rerun()
-            else:
-                st.sidebar.error('❌ Invalid credentials.')
-        with st.sidebar.expander("📝 Demo Accounts"):
-            st.write("**Admin:** admin@sportai.com / admin123")
-            st.write("**Manager:** manager@sportai.com / manager123")
-            st.write("**User:** user@sportai.com / user123")
-
-    def logout(self):
-        if st.sidebar.button('🚪 Logout'):
-            st.session_state.user = None
-            st.rerun()
-            }
-            try:
-                with open('users.json', 'w') as f:
-                    json.dump(default_users, f, indent=2)
-                return default_users
-            except Exception:
-                return default_users
-        except Exception as e:
-            st.error(f"Error loading users: {e}")
-            return {}
-    
-    def build_tools_menu(self) -> Dict[str, Any]:
-        """Build the tools menu from available modules, organized by categories"""
-        tools = {}
-        
-        # Define tool categories with their corresponding modules
-        tool_categories = {
-            # AI Tools
-            "🤖 AI Event Forecast": 'ai_event_forecast',
-            "🤖 AI Matchmaker": 'ai_matchmaker_tool',
-            "🤖 AI Revenue Maximizer": 'ai_revenue_maximizer',
-            "🤖 AI Scheduler": 'ai_scheduler_tool',
-            "🤖 AI Scheduling Suggestions": 'ai_scheduling_suggestions',
-            "🤖 AI Sponsor Finder": 'ai_sponsor_opportunity_finder',
-            "🤖 AI Strategy Dashboard": 'ai_strategy_dashboard',
-            "🤖 AI Suggestion Digest": 'ai_suggestion_digest',
-            "🤖 AI Voice Command": 'ai_voice_command',
-            "🤖 AI Facility Chat": 'ai_facility_chat',
-            "🤖 AI Voice Assistant": 'ai_voice_responder',
-            "🤖 AI Sponsor Pricing": 'ai_sponsor_pricing_trends',
-            "🤖 AI Grant Writer": 'grant_writer_ai',
-            "🤖 AI Grant Match": 'grant_match_ai',
-            
-            # Core Management
-            "📊 Central Dashboard": 'central_dashboard',
-            "🎯 Event Control Panel": 'event_control_panel',
-            "🎨 Event Creator AI": 'event_creator_ai',
-            "🏟️ Facility Master Tracker": 'facility_master_tracker',
-            "👥 Membership Dashboard": 'membership_dashboard',
-            "💰 Sponsor Dashboard": 'sponsor_dashboard',
-            "⚡ Real-Time Dashboard": 'real_time_dashboard',
-            "🛠️ Setup Assistant AI": 'setup_assistant_ai',
-            
-            # Facility Management
-            "🚪 Facility Access Tracker": 'facility_access_tracker',
-            "⚠️ Facility Capacity Alerts": 'facility_capacity_alerts',
-            "📋 Facility Contract Monitor": 'facility_contract_monitor',
-            "🗺️ Facility Layout Map": 'facility_layout_map',
-            "👥 Facility Membership Monitor": 'facility_membership_monitor',
-            "🔧 Complex Usage Optimizer": 'complex_usage_optimizer',
-            "🏛️ Dome Usage Tool": 'dome_usage_tool',
-            "📊 Surface Usage by Type": 'surface_usage_by_type',
-            "🔥 Surface Demand Heatmap": 'surface_demand_heatmap',
-            "📈 Adaptive Use Planner": 'adaptive_use_planner',
-            
-            # Membership & CRM
-            "💳 Membership Credit Tracker": 'membership_credit_tracker',
-            "👥 Membership CRM Tracker": 'membership_crm_tracker',
-            "🎯 Membership Goal Tracker": 'membership_goal_tracker',
-            "📊 Membership Insights AI": 'membership_insights_ai',
-            "🏆 Membership Loyalty Rewards": 'membership_loyalty_rewards',
-            "📢 Membership Marketing AI": 'membership_marketing_ai',
-            "🔗 Membership Ticketing Integration": 'membership_ticketing_integration',
-            "🚪 Member Portal": 'member_portal',
-            "🎯 Member Selector": 'member_selector',
-            
-            # Sponsorship & Revenue
-            "🤝 Sponsorship AI Calculator": 'sponsorship_ai_calculator',
-            "📅 Sponsorship Availability": 'sponsorship_availability',
-            "📄 Sponsorship Contract Generator": 'sponsorship_contract_generator',
-            "📦 Sponsorship Inventory Manager": 'sponsorship_inventory_manager',
-            "📈 Sponsorship ROI Tracker": 'sponsorship_roi_tracker',
-            "📊 Sponsorship Tracker": 'sponsorship_tracker',
-            "🚪 Sponsor Portal": 'sponsor_portal',
-            "💰 Sponsorship Revenue Builder": 'sponsorship_revenue_builder',
-            "🎯 Sponsor Pitch Portal": 'sponsor_pitch_portal',
-            "📖 Sponsor Pitchbook Builder": 'sponsor_pitchbook_builder',
-            "📄 Sponsor PDF Packet": 'sponsor_pdf_packet',
-            "🔗 Sponsor Link Sender": 'sponsor_link_sender',
-            "🗺️ Sponsor Map Viewer": 'sponsor_map_viewer',
-            
-            # Financial Tools
-            "🔥 Revenue Heatmap": 'revenue_heatmap',
-            "📈 Revenue Projection Simulator": 'revenue_projection_simulator',
-            "📊 Revenue Proforma Auto": 'revenue_proforma_auto',
-            "💰 Dynamic Pricing Tool": 'dynamic_pricing_tool',
-            "💼 Finance Feed Connector": 'finance_feed_connector',
-            "🔄 Financial Feed Sync": 'financial_feed_sync',
-            
-            # Sports & Events
-            "🏆 Tournament Scheduler": 'tournament_scheduler',
-            "🎮 Esports Manager": 'esports_manager',
-            "♿ Adaptive Sports Center": 'adaptive_sports_center',
-            "🏟️ League Coordinator": 'league_coordinator',
-            "👥 Team Club Manager": 'team_club_manager',
-            "📚 Sport Library": 'sport_library',
-            "💰 Event Profit Analyzer": 'event_profit_analyzer',
-            "🎯 Event Admin": 'event_admin',
-            "🌍 International Team Portal": 'international_team_portal',
-            "🏞️ Park Activity Dashboard": 'park_activity_dashboard',
-            
-            # Reporting & Documents
-            "📋 Board PDF Exporter": 'board_pdf_exporter',
-            "📊 Board Packet Generator": 'board_packet_pdf_generator',
-            "📅 Board Report Scheduler": 'board_report_scheduler',
-            "📄 Weekly Report Generator": 'weekly_report_generator',
-            "📥 Report Download Portal": 'report_download_portal',
-            "📄 PDF Export Tool": 'pdf_export_tool',
-            
-            # Communications
-            "📧 Email Notifications": 'email_notifications',
-            "📱 SMS Alert Center": 'sms_alert_center',
-            "💬 Slack Alert Center": 'slack_alert_center',
-            "⚠️ Member Alerts Auto": 'member_alerts_auto',
-            "📊 Usage Alerts Auto": 'usage_alerts_auto',
-            "📋 Contract Alerts Auto": 'contract_alerts_auto',
-            "🔐 Credential Expiry Alerts": 'credential_expiry_alerts',
-            "📅 Daily Task Scheduler": 'daily_task_scheduler',
-            
-            # Marketing & Media
-            "📦 Marketing Packet Builder": 'marketing_packet_builder',
-            "📖 Marketing Flipbook Generator": 'marketing_flipbook_generator',
-            "📚 Flipbook Embedder": 'flipbook_embedder',
-            "🎨 Flipbook Pitch Creator": 'flipbook_pitch_creator',
-            "🔄 Screen Rotation Scheduler": 'screen_rotation_scheduler',
-            "📺 Media Display Rotator": 'media_display_rotator',
-            
-            # Integrations
-            "📊 Google Sheets Sync": 'google_sheets_sync',
-            "🔄 GSheets Sync": 'gsheets_sync',
-            "🔗 Webhook Automation": 'webhook_automation',
-            "📄 PandaDoc Contract": 'pandadoc_contract',
-            "🤖 Auto Contract Generator": 'auto_contract_generator',
-            "🔄 HubSpot Deal Logger": 'hubspot_deal_logger',
-            "📧 Mailchimp Lead Collector": 'mailchimp_lead_collector',
-            
-            # Utilities
-            "📱 Mobile Friendly UI": 'mobile_friendly_ui',
-            "📅 Visual Calendar Layout": 'visual_calendar_layout',
-            "🔧 Admin Override Console": 'admin_override_console',
-            "🏷️ Admin Sidebar Badges": 'admin_sidebar_badges',
-            "📚 Platform Guidebook": 'platform_guidebook_writer',
-            "🔗 Portal Router": 'portal_router',
-            "💎 Upsell Offer Engine": 'upsell_offer_engine',
-            "📅 Public Schedule": 'public_schedule',
-            "⏰ Expiring Link Manager": 'expiring_link_manager',
-        }
+        categories = {}
         
-        # Add tools that have available modules
-        for tool_name, module_key in tool_categories.items():
-            if module_key in available_modules:
-                tools[tool_name] = available_modules[module_key]
+        # Add tools whose modules can be found; importing waits until selected
+        for category, category_tools in TOOL_MENU.items():
+            for tool_name, module_key in category_tools.items():
+                if registry.is_available(module_key):
+                    tools[tool_name] = module_key
+                    categories.setdefault(category, []).append(tool_name)
         
-        return tools
+        return tools, categories
+    
+    def build_search_index(self) -> ToolSearchIndex:
+        """Index the tools menu once so sidebar searches are lookups, not scans"""
+        return ToolSearchIndex(
+            {
+                'name': tool_name,
+                'module': self.tools[tool_name],
+                'category': category,
+                'keywords': MODULE_KEYWORDS.get(self.tools[tool_name], []),
+            }
+            for category, tool_names in self.categories.items()
+            for tool_name in tool_names
+        )
     
     def login(self):
         """Handle user login interface"""
@@ -438,8 +92,11 @@ class SportAIApp:
         
         if st.sidebar.button('Login'):
             user = self.users.get(email)
-            if user and user['password'] == password:
+            if user and verify_pw(password, user['password']):
                 st.session_state.user = {'email': email, 'role': user['role']}
+                # The cookie lets any worker behind the load balancer resume this login after a reload
+                st.session_state.session_token = get_shared_state().create_session(st.session_state.user)
+                st.session_state.session_cookie = 'set'
                 st.sidebar.success('✅ Login successful!')
                 st.rerun()
             else:
@@ -454,8 +111,33 @@ class SportAIApp:
     def logout(self):
         """Handle user logout"""
         if st.sidebar.button('🚪 Logout'):
+            get_shared_state().end_session(st.session_state.pop('session_token', None))
+            st.session_state.session_cookie = 'clear'
             st.session_state.user = None
             st.rerun()
+
+    def sync_session_cookie(self):
+        """Write or clear the session cookie in the browser after a login or logout rerun.
+
+        Streamlit gives the app no way to set response headers, so the cookie is written from the page
+        and cannot be HttpOnly: script on the page can read it. It is SameSite=Strict, Secure over
+        HTTPS, and only names a server-side session that expires after SESSION_TTL and is deleted on
+        logout. For HttpOnly, have the proxy in front of the workers set the cookie instead.
+        """
+        action = st.session_state.pop('session_cookie', None)
+        if action is None:
+            return
+        if action == 'set':
+            value, max_age = st.session_state.get('session_token', ''), int(SESSION_TTL)
+        else:
+            value, max_age = '', 0
+        # The token is generated server-side (URL-safe base64), so it is safe to embed in the script
+        st.html(
+            "<script>const secure = location.protocol === 'https:' ? '; Secure' : '';"
+            f"document.cookie = '{SESSION_COOKIE}={value}; Path=/; Max-Age={max_age}; SameSite=Strict' + secure;"
+            "</script>",
+            unsafe_allow_javascript=True,
+        )
     
     def render_ai_sidebar(self):
         """Render the AI optimization sidebar with core AI functions"""
@@ -468,45 +150,119 @@ class SportAIApp:
         
         if st.sidebar.button('📈 Forecast Demand'):
             try:
-                forecaster = DemandForecaster()
-                st.success("✅ Demand forecasting initiated!")
-                st.info("💡 Next: Load booking_data.csv and call DemandForecaster.predict()")
+                if not os.path.exists('booking_data.csv'):
+                    st.info("💡 Next: Add booking_data.csv (facility, surface, start_time) to forecast demand")
+                else:
+                    # Shared across workers: only the first worker to see this file fits the model
+                    forecast = get_shared_state().cached(
+                        'demand_forecast', file_hash('booking_data.csv'),
+                        lambda: DemandForecaster().fit('booking_data.csv').predict(horizon_weeks=1), ttl=24 * 3600)
+                    by_surface = forecast.groupby(['facility', 'surface'])['expected_bookings']
+                    summary = by_surface.sum().round(1).rename('next_week_bookings').to_frame()
+                    summary['peak_hour_of_week'] = forecast.loc[by_surface.idxmax(), 'hour_of_week'].values
+                    st.success(f"✅ Demand forecast ready for {len(summary)} surfaces")
+                    st.dataframe(summary, use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error in demand forecasting: {e}")
         
         if st.sidebar.button('📅 Optimize Schedule'):
             try:
-                st.success("✅ Schedule optimization initiated!")
-                st.info("💡 Next: Load schedule_requests.csv and resources.json")
+                if not (os.path.exists('schedule_requests.csv') and os.path.exists('resources.json')):
+                    st.info("💡 Next: Add schedule_requests.csv and resources.json to optimize the schedule")
+                else:
+                    # Solve once per pair of input files; later clicks reuse the session's schedule
+                    key = file_hash('schedule_requests.csv') + file_hash('resources.json')
+                    if st.session_state.get('schedule_key') != key:
+                        st.session_state.schedule = optimize_schedule(
+                            load_csv('schedule_requests.csv', dtype=str, keep_default_na=False).to_dict('records'),
+                            load_json('resources.json'),
+                        )
+                        st.session_state.schedule_key = key
+                    schedule = st.session_state.schedule
+                    unscheduled = schedule.unscheduled()
+                    st.success(f"✅ Scheduled {len(schedule.assignments)} of {len(schedule.requests)} requests")
+                    st.dataframe(
+                        [{"Request": request_id, "Resource": resource_id}
+                         for request_id, resource_id in schedule.assignments.items()],
+                        use_container_width=True,
+                    )
+                    if unscheduled:
+                        st.warning(f"⚠️ {len(unscheduled)} requests conflict with every matching resource: "
+                                   + ", ".join(unscheduled[:20]) + (" ..." if len(unscheduled) > 20 else ""))
             except Exception as e:
                 st.error(f"❌ Error in schedule optimization: {e}")
+
+        schedule = st.session_state.get('schedule')
+        if schedule is not None and schedule.assignments:
+            with st.sidebar.expander("❌ Cancel a Booking"):
+                request_id = st.selectbox("Request", sorted(schedule.assignments), key='schedule_cancel_request')
+                if st.button("Cancel Booking", key='schedule_cancel'):
+                    # Only waiting requests that overlap the freed time are retried
+                    placed = schedule.cancel(request_id)
+                    st.success(f"✅ Cancelled {request_id}" + (f"; placed {', '.join(placed)} from the waitlist"
+                                                                if placed else ""))
         
         if st.sidebar.button('🤝 Match Sponsors'):
             try:
-                st.success("✅ Sponsor matching initiated!")
-                st.info("💡 Next: Load assets.csv and sponsors.csv")
+                if not (os.path.exists('assets.csv') and os.path.exists('sponsors.csv')):
+                    st.info("💡 Next: Add assets.csv and sponsors.csv to match sponsors")
+                else:
+                    matches = get_shared_state().cached(
+                        'sponsor_matches', file_hash('assets.csv') + file_hash('sponsors.csv'),
+                        lambda: match_sponsors(load_csv('assets.csv'), load_csv('sponsors.csv')), ttl=24 * 3600)
+                    st.success(f"✅ Matched {len(matches['assignments'])} assets to sponsors")
+                    st.dataframe(matches['assignments'], use_container_width=True)
+                    with st.expander("Top candidates per asset"):
+                        st.dataframe(matches['candidates'], use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error in sponsor matching: {e}")
         
         if st.sidebar.button('📄 Generate Contract'):
             try:
-                st.success("✅ Dynamic contract generation initiated!")
-                st.info("💡 Next: Call generate_contract(template_id, data, api_key)")
+                if not os.path.exists('contract_requests.csv'):
+                    st.info("💡 Next: Add contract_requests.csv (template_id plus template fields) "
+                            "and templates under contract_templates/")
+                else:
+                    requests_df = load_csv('contract_requests.csv', dtype=str).fillna('')
+                    api_key = os.environ.get('SPORTAI_SIGNING_API_KEY')
+                    requests_digest = file_hash('contract_requests.csv')
+                    for template_id, group in requests_df.groupby('template_id'):
+                        # Pressing the button again resumes an unfinished batch for the same input file
+                        previous = st.session_state.get(f"contract_batch_{template_id}")
+                        resume = previous['batch_id'] if previous and previous['digest'] == requests_digest else None
+                        batch = generate_contracts_batch(template_id, group.to_dict('records'), api_key=api_key,
+                                                         batch_id=resume)
+                        if batch['complete']:
+                            st.session_state.pop(f"contract_batch_{template_id}", None)
+                        else:
+                            st.session_state[f"contract_batch_{template_id}"] = {'batch_id': batch['batch_id'],
+                                                                                 'digest': requests_digest}
+                        counts = ", ".join(f"{n} {state}" for state, n in sorted(batch['counts'].items()))
+                        st.success(f"✅ {template_id}: {counts} (batch {batch['batch_id']})")
             except Exception as e:
                 st.error(f"❌ Error in contract generation: {e}")
         
         if st.sidebar.button('⚠️ Predict Churn'):
             try:
-                predictor = ChurnPredictor()
-                st.success("✅ Churn prediction initiated!")
-                st.info("💡 Next: Load member_features.csv")
+                if not os.path.exists('member_features.csv'):
+                    st.info("💡 Next: Add member_features.csv (member_id plus activity columns) to score churn")
+                else:
+                    stats = ChurnPredictor().score_file('member_features.csv')
+                    st.success(f"✅ Churn scores up to date: {stats['rescored']} of {stats['rows']} members rescored")
+                    st.dataframe(load_churn_scores(min_score=0.7).head(50), use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error in churn prediction: {e}")
         
+        campaign_budget = st.sidebar.number_input('Campaign budget ($)', min_value=0.0, value=500.0, step=50.0)
         if st.sidebar.button('📢 Optimize Campaign'):
             try:
-                st.success("✅ Campaign optimization initiated!")
-                st.info("💡 Next: Load invites.csv")
+                if not os.path.exists('invites.csv'):
+                    st.info("💡 Next: Add invites.csv (recipient_id plus optional segment, response_prob, member_id)")
+                else:
+                    campaign = optimize_campaign(load_csv('invites.csv'), campaign_budget)
+                    st.success(f"✅ Campaign planned: ${campaign['spend']:,.2f} of ${campaign_budget:,.2f}, "
+                               f"{len(campaign['plan'])} recipients reached")
+                    st.dataframe(campaign['summary'], use_container_width=True)
             except Exception as e:
                 st.error(f"❌ Error in campaign optimization: {e}")
     
@@ -519,6 +275,18 @@ class SportAIApp:
             initial_sidebar_state='expanded'
         )
         
+        # Session tokens are never accepted from the URL; drop any left in an old link
+        st.query_params.pop('sid', None)
+        # A new session (page reload, or another worker) resumes a shared login from the cookie
+        token = st.context.cookies.get(SESSION_COOKIE)
+        if not st.session_state.get('user') and token and st.session_state.get('session_cookie') != 'clear':
+            st.session_state.user = get_shared_state().get_session(token)
+            if st.session_state.user:
+                st.session_state.session_token = token
+            else:
+                st.session_state.session_cookie = 'clear'
+        self.sync_session_cookie()
+        
         # Check if user is logged in
         if 'user' not in st.session_state or not st.session_state.user:
             st.title('🏟️ SportAI Suite')
@@ -546,9 +314,11 @@ class SportAIApp:
             with col2:
                 st.metric("AI Modules", "✅ Ready" if AI_MODULES_AVAILABLE else "❌ Not Available")
             with col3:
-                st.metric("Loaded Modules", len(available_modules))
+                st.metric("Loaded Modules", len(registry.loaded()))
             
             self.login()
+            if PRELOAD_TOOLS:
+                registry.warm_up(PRELOAD_WORKERS)
             return
         
         # User is logged in
@@ -576,10 +346,9 @@ class SportAIApp:
         # Create searchable tool selection
         search_term = st.sidebar.text_input("🔍 Search Tools", placeholder="Type to filter tools...")
         
-        # Filter tools based on search
+        # Filter tools based on search, best matches first
         if search_term:
-            filtered_tools = {k: v for k, v in self.tools.items() 
-                            if search_term.lower() in k.lower()}
+            filtered_tools = {k: self.tools[k] for k in self.search_index.search(search_term)}
         else:
             filtered_tools = self.tools
         
@@ -595,38 +364,36 @@ class SportAIApp:
         
         # Quick access buttons for popular tools
         st.sidebar.markdown("### 🚀 Quick Access")
-        quick_tools = [
-            "📊 Central Dashboard",
-            "🤖 AI Strategy Dashboard", 
-            "🏟️ Facility Master Tracker",
-            "👥 Membership Dashboard",
-            "💰 Sponsor Dashboard"
-        ]
-        
-        for tool in quick_tools:
-            if tool in self.tools:
-                tool_display_name = tool.split(" ", 1)[1]  # Remove emoji for button
-                if st.sidebar.button(tool_display_name, key=f"quick_{tool}"):
-                    st.session_state.tool_selection = tool
-                    st.rerun()
+        for tool in self.quick_tools:
+            tool_display_name = tool.split(" ", 1)[1]  # Remove emoji for button
+            if st.sidebar.button(tool_display_name, key=f"quick_{tool}"):
+                st.session_state.tool_selection = tool
+                st.rerun()
         
         # Render AI sidebar
         self.render_ai_sidebar()
         
+        # Sessions that skip the login page still start the warm-up
+        if PRELOAD_TOOLS:
+            registry.warm_up(PRELOAD_WORKERS)
+        
         # Run selected tool
         if selection and selection in self.tools:
-            tool_module = self.tools[selection]
+            tool_module = registry.load(self.tools[selection])
             if tool_module and hasattr(tool_module, 'run'):
                 try:
                     # Load header if available
-                    if available_modules.get('header_loader'):
-                        available_modules['header_loader'].run()
+                    header_loader = registry.load('header_loader')
+                    if header_loader:
+                        with monitor.track('header_loader'):
+                            header_loader.run()
                     
                     # Show current tool info
                     st.info(f"🔧 Running: {selection}")
                     
                     # Run the selected tool
-                    tool_module.run()
+                    with monitor.track(self.tools[selection]):
+                        tool_module.run()
                     
                 except Exception as e:
                     st.error(f"❌ Error running {selection}: {e}")
@@ -642,6 +409,9 @@ class SportAIApp:
                         with st.expander("🔍 Debug Information"):
                             st.code(f"Module: {tool_module}")
                             st.code(f"Error: {str(e)}")
+            elif tool_module is None:
+                st.error(f"❌ Tool '{selection}' could not be imported.")
+                st.write("Check the module's dependencies; admins can see details under Module Import Status.")
             else:
                 st.error(f"❌ Tool '{selection}' is not properly configured.")
                 st.write("The selected tool does not have a valid `run()` method.")
@@ -655,7 +425,7 @@ class SportAIApp:
             col1, col2, col3, col4 = st.columns(4)
             
             with col1:
-                st.metric("Available Tools", len(self.tools), delta=f"+{len(available_modules)} modules")
+                st.metric("Available Tools", len(self.tools), delta=f"+{len(registry.loaded())} modules loaded")
             
             with col2:
                 status = "✅ Ready" if AI_MODULES_AVAILABLE else "❌ Not Available"
@@ -670,34 +440,22 @@ class SportAIApp:
             # Tool categories overview
             st.markdown("## 🛠️ Available Tool Categories")
             
-            # Group tools by category based on emoji prefixes
-            categories = {
-                "🤖 AI Tools": [k for k in self.tools.keys() if k.startswith("🤖")],
-                "📊 Management": [k for k in self.tools.keys() if k.startswith(("📊", "🎯", "🏟️", "👥", "💰", "⚡", "🛠️"))],
-                "🏆 Sports & Events": [k for k in self.tools.keys() if k.startswith(("🏆", "🎮", "♿", "🌍", "🏞️"))],
-                "💰 Financial": [k for k in self.tools.keys() if k.startswith(("🔥", "📈", "💼", "🔄"))],
-                "📋 Reporting": [k for k in self.tools.keys() if k.startswith(("📋", "📄", "📅", "📥"))],
-                "📢 Communications": [k for k in self.tools.keys() if k.startswith(("📧", "📱", "💬", "⚠️"))],
-                "🔄 Integrations": [k for k in self.tools.keys() if k.startswith(("🔗", "🤖")) and not k.startswith("🤖 AI")],
-                "🛠️ Utilities": [k for k in self.tools.keys() if k.startswith(("📱", "🔧", "🏷️", "📚", "💎", "⏰"))]
-            }
-            
             # Display categories in a grid
             category_cols = st.columns(2)
-            for i, (category, tools) in enumerate(categories.items()):
-                if tools:  # Only show categories with tools
-                    with category_cols[i % 2]:
-                        st.markdown(f"### {category}")
-                        st.markdown(f"**{len(tools)} tools available**")
-                        
-                        # Show first 3 tools as examples
-                        for tool in tools[:3]:
-                            st.markdown(f"• {tool}")
-                        
-                        if len(tools) > 3:
-                            st.markdown(f"• ... and {len(tools) - 3} more")
-                        
-                        st.markdown("---")
+            # Categories were grouped once when the menu was built; empty ones are never stored
+            for i, (category, tools) in enumerate(self.categories.items()):
+                with category_cols[i % 2]:
+                    st.markdown(f"### {category}")
+                    st.markdown(f"**{len(tools)} tools available**")
+                    
+                    # Show first 3 tools as examples
+                    for tool in tools[:3]:
+                        st.markdown(f"• {tool}")
+                    
+                    if len(tools) > 3:
+                        st.markdown(f"• ... and {len(tools) - 3} more")
+                    
+                    st.markdown("---")
             
             # Quick actions section
             st.markdown("## 🚀 Quick Actions")
@@ -725,19 +483,99 @@ class SportAIApp:
             # Show module import status for admins
             if user['role'] == 'admin':
                 with st.expander("🔍 Module Import Status (Admin Only)"):
+                    loaded_modules = registry.loaded()
                     st.markdown("### Successfully Loaded Modules:")
-                    for module_name in sorted(available_modules.keys()):
+                    for module_name in sorted(loaded_modules):
                         st.markdown(f"✅ {module_name}")
                     
                     st.markdown("### Failed Imports:")
-                    failed_modules = [k for k, v in modules.items() if v is None]
+                    failed_modules = registry.failed()
                     if failed_modules:
                         for module_name in sorted(failed_modules):
                             st.markdown(f"❌ {module_name}")
                     else:
-                        st.markdown("✅ All modules loaded successfully!")
+                        st.markdown("✅ No failed imports so far")
+                    
+                    if PRELOAD_TOOLS:
+                        readiness = registry.readiness()
+                        st.markdown("**Warm-up:** " + ", ".join(f"{count} {state}" for state, count in sorted(readiness.items())))
+                    
+                    st.markdown("### Import Cost:")
+                    sort_by = st.radio("Sort by", ["seconds", "rss_kb"], horizontal=True, key="import_report_sort")
+                    report = import_report(sort_by)
+                    if report:
+                        st.dataframe(
+                            [{"Module": row['module'],
+                              "Import ms": round(row['seconds'] * 1000, 1),
+                              "RSS growth KB": row['rss_kb'],
+                              "Error": row['error'] or ""} for row in report],
+                            use_container_width=True,
+                        )
+                        st.caption("Run `python tool_registry.py` to print this report for every module without Streamlit.")
                     
-                    st.markdown(f"**Total Available:** {len(available_modules)}/{len(modules)} modules")
+                    st.markdown(f"**Total Loaded:** {len(loaded_modules)}/{len(registry.available())} available modules "
+                                f"({len(registry.keys())} registered, imported on first use)")
+            
+            # Show render timings for admins
+            if user['role'] == 'admin':
+                with st.expander("⏱️ Tool Render Metrics (Admin Only)"):
+                    render_summary = monitor.summary()
+                    if render_summary:
+                        st.dataframe(
+                            [{"Tool": row['name'],
+                              "Renders": row['renders'],
+                              "Error %": round(row['error_rate'] * 100, 1),
+                              "p50 ms": round(row['p50_ms'], 1),
+                              "p95 ms": round(row['p95_ms'], 1),
+                              "Max ms": round(row['max_ms'], 1),
+                              "CPU ms": round(row['mean_cpu_ms'], 1),
+                              "Peak KB": row['max_peak_kb'],
+                              "Profiles": row['profiles']} for row in render_summary],
+                            use_container_width=True,
+                        )
+                        st.caption(f"Renders slower than {monitor.slow_seconds}s are profiled to "
+                                   f"`{monitor.profile_dir}/` when sampled.")
+                        st.download_button("Download Prometheus metrics", monitor.prometheus_text(),
+                                           file_name="sportai_render_metrics.prom", mime="text/plain")
+                    else:
+                        st.markdown("No tool renders recorded in this worker yet.")
+                
+                with st.expander("📬 Notification Queue (Admin Only)"):
+                    queue_counts = get_outbox().counts()
+                    if queue_counts:
+                        st.dataframe(
+                            [{"Channel": channel,
+                              "Pending": counts.get('pending', 0),
+                              "Sent": counts.get('sent', 0),
+                              "Failed": counts.get('failed', 0)} for channel, counts in sorted(queue_counts.items())],
+                            use_container_width=True,
+                        )
+                    else:
+                        st.markdown("No notifications queued yet.")
+                    if start_dispatcher() is None:
+                        st.caption("No outbound channel configured (SPORTAI_SMTP_HOST, SPORTAI_SMS_URL, "
+                                   "SPORTAI_SLACK_WEBHOOK_URL); messages stay queued.")
+                
+                with st.expander("📄 Report Jobs (Admin Only)"):
+                    recent_jobs = report_jobs.recent(limit=20)
+                    if recent_jobs:
+                        for job in recent_jobs:
+                            job_cols = st.columns([3, 1, 1, 2])
+                            job_cols[0].markdown(f"**{job['title']}**")
+                            job_cols[1].markdown(job['status'])
+                            job_cols[2].markdown(f"{job['requests']}×")
+                            if job['status'] == 'done' and job['artifact']:
+                                # The file is read only when the button is clicked, not on every rerun
+                                job_cols[3].download_button("Download",
+                                                            partial(report_jobs.read_artifact, job['job_id']),
+                                                            file_name=os.path.basename(job['artifact']),
+                                                            key=f"report_job_{job['job_id']}")
+                            elif job['error']:
+                                job_cols[3].markdown(f"❌ {job['error']}")
+                        if any(job['status'] in ('queued', 'running') for job in recent_jobs):
+                            st.button("🔄 Refresh job status", key="refresh_report_jobs")
+                    else:
+                        st.markdown("No document builds submitted yet.")
             
             # Show helpful tips
             st.markdown("## 💡 Tips & Getting Started")
@@ -779,7 +617,43 @@ class SportAIApp:
             </div>
             """, unsafe_allow_html=True)
 
+def app_signature() -> tuple:
+    """Fingerprint of the registered module files the app shell is built from.
+
+    Only those files count: the app writes databases and caches next to
+    them, and those writes must not rebuild the shell.
+    """
+    keys = set(registry.keys())
+    signature = []
+    try:
+        entries = sorted(os.scandir(BASE_DIR or '.'), key=lambda entry: entry.name)
+    except OSError:
+        return ()
+    for entry in entries:
+        name = entry.name[:-3] if entry.name.endswith('.py') else entry.name
+        if name not in keys:
+            continue
+        try:
+            path = entry.path if entry.is_file() else os.path.join(entry.path, '__init__.py')
+            stat = os.stat(path)
+        except OSError:
+            continue
+        signature.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(signature)
+
+
+@st.cache_resource(max_entries=1, show_spinner=False)
+def get_app(signature: tuple) -> SportAIApp:
+    """Build the app shell once per process; rebuilt only when the signature changes"""
+    registry.refresh()
+    return SportAIApp()
+
+
 # Run the application
 if __name__ == "__main__":
-    app = SportAIApp()
+    start_metrics_server()
+    start_dispatcher()
+    subscribe_booking_notices()
+    start_schedule_server()
+    app = get_app(app_signature())
     app.run()
@@ -0,0 +1,349 @@
+"""Incremental, diff-based sync for spreadsheet and finance feed connectors.
+
+    from sync_engine import engine
+    engine().push('sheets/ledger', ledger_df, key='txn_id')   # sends only changed rows
+    changes = engine().pull('finance/transactions')          # fetches only rows since the cursor
+
+Per source, the engine keeps state in SQLite (``sync_state.db``):
+- Push: a content hash for every row it has pushed. A push hashes the
+  frame in one vectorized pass, compares it with the stored hashes and
+  sends only new, changed and deleted rows, in batches.
+- Pull: a cursor. A pull asks the remote for changes since the cursor.
+State advances only after the remote acknowledges a batch or page, so an
+interrupted sync resumes where it stopped.
+
+google_sheets_sync and gsheets_sync share this one engine, and so do the
+finance feed connectors. Each process talks to SPORTAI_SYNC_URL through
+one pooled keep-alive client.
+
+Remote protocol (what FakeSyncServer implements):
+  POST /sources/<source>/batch    {"key": k, "upsert": [row, ...], "delete": [key, ...]} -> {"cursor": n}
+  GET  /sources/<source>/changes?since=<cursor>&limit=<n>
+       -> {"rows": [...], "deleted": [...], "cursor": n, "more": bool}
+
+``python sync_engine.py --fake-server 8766`` runs the fake server locally.
+"""
+import argparse
+import http.client
+import json
+import os
+import sqlite3
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+import numpy as np
+import pandas as pd
+
+STATE_DB = 'sync_state.db'
+
+
+def row_hashes(frame: pd.DataFrame) -> np.ndarray:
+    """64-bit content hash of every row (column order matters), as int64 for SQLite"""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy().view(np.int64)
+
+
+def _records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """JSON-ready rows, with NaN/NaT as None"""
+    return frame.astype(object).where(frame.notna(), None).to_dict('records')
+
+
+class SyncState:
+    """Per-source row hashes and cursors"""
+
+    def __init__(self, path: str = STATE_DB):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS row_hashes (source TEXT NOT NULL, row_key TEXT NOT NULL, '
+                     'hash INTEGER NOT NULL, PRIMARY KEY (source, row_key)) WITHOUT ROWID')
+        conn.execute('CREATE TABLE IF NOT EXISTS cursors (source TEXT PRIMARY KEY, cursor TEXT, '
+                     'updated_at REAL NOT NULL)')
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def hashes(self, source: str) -> pd.Series:
+        """Stored hash per row key"""
+        rows = self._conn().execute('SELECT row_key, hash FROM row_hashes WHERE source = ?', (source,)).fetchall()
+        if not rows:
+            return pd.Series([], index=pd.Index([], dtype=object), dtype=np.int64)
+        keys, values = zip(*rows)
+        return pd.Series(np.fromiter(values, np.int64, len(values)), index=pd.Index(keys, dtype=object))
+
+    def apply(self, source: str, upserts: Dict[str, int], deletes: List[str]):
+        """Record an acknowledged batch of pushed rows"""
+        with self._conn() as conn:
+            conn.execute('BEGIN')
+            conn.executemany('INSERT INTO row_hashes (source, row_key, hash) VALUES (?, ?, ?) '
+                             'ON CONFLICT(source, row_key) DO UPDATE SET hash = excluded.hash',
+                             [(source, k, int(h)) for k, h in upserts.items()])
+            conn.executemany('DELETE FROM row_hashes WHERE source = ? AND row_key = ?',
+                             [(source, k) for k in deletes])
+
+    def set_cursor(self, source: str, cursor: str):
+        self._conn().execute('INSERT INTO cursors (source, cursor, updated_at) VALUES (?, ?, ?) '
+                             'ON CONFLICT(source) DO UPDATE SET cursor = excluded.cursor, '
+                             'updated_at = excluded.updated_at', (source, cursor, time.time()))
+
+    def cursor(self, source: str) -> Optional[str]:
+        row = self._conn().execute('SELECT cursor FROM cursors WHERE source = ?', (source,)).fetchone()
+        return row[0] if row else None
+
+    def reset(self, source: str):
+        """Forget a source, forcing the next sync to be a full one"""
+        with self._conn() as conn:
+            conn.execute('DELETE FROM row_hashes WHERE source = ?', (source,))
+            conn.execute('DELETE FROM cursors WHERE source = ?', (source,))
+
+
+class SyncClient:
+    """Keep-alive JSON client, one connection per thread, retrying 429/5xx with backoff"""
+
+    def __init__(self, base_url: str, api_key: Optional[str] = None, retries: int = 3, timeout: float = 60.0):
+        parts = urlsplit(base_url)
+        self.scheme, self.netloc = parts.scheme, parts.netloc
+        self.base_path = parts.path.rstrip('/')
+        self.api_key = api_key
+        self.retries = retries
+        self.timeout = timeout
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self._local = threading.local()
+
+    def _connection(self) -> http.client.HTTPConnection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            cls = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+            conn = self._local.conn = cls(self.netloc, timeout=self.timeout)
+        return conn
+
+    def request(self, method: str, path: str, payload: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        body = json.dumps(payload, default=str).encode('utf-8') if payload is not None else None
+        headers = {'Content-Type': 'application/json'}
+        if self.api_key:
+            headers['Authorization'] = f"Bearer {self.api_key}"
+        for attempt in range(self.retries + 1):
+            conn = self._connection()
+            try:
+                conn.request(method, self.base_path + path, body=body, headers=headers)
+                response = conn.getresponse()
+                data = response.read()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                self._local.conn = None
+                if attempt == self.retries:
+                    raise
+            else:
+                self.bytes_sent += len(body or b'')
+                self.bytes_received += len(data)
+                if response.status < 300:
+                    return json.loads(data or b'{}')
+                if response.status != 429 and response.status < 500:
+                    raise RuntimeError(f"Sync service returned {response.status}: {data[:200]!r}")
+                if attempt == self.retries:
+                    raise RuntimeError(f"Sync service returned {response.status} after {attempt + 1} attempts")
+            time.sleep(min(2 ** attempt * 0.25, 8))
+
+
+class SyncEngine:
+    """Pushes and pulls only the rows that changed since the last sync"""
+
+    def __init__(self, client: SyncClient, state: SyncState):
+        self.client = client
+        self.state = state
+
+    def diff(self, source: str, frame: pd.DataFrame, key: str):
+        """(changed/new rows, their hashes by key, deleted keys) against the stored hashes"""
+        keys = frame[key].astype(str).to_numpy(dtype=object)
+        if len(set(keys)) != len(keys):
+            raise ValueError(f"Key column '{key}' has duplicate values")
+        current = pd.Series(row_hashes(frame), index=pd.Index(keys, dtype=object))
+        stored = self.state.hashes(source)
+        # fill_value keeps int64; a NaN fill would cast the hashes to float and lose bits
+        previous = stored.reindex(current.index, fill_value=0).to_numpy()
+        changed = ~current.index.isin(stored.index) | (previous != current.to_numpy())
+        deleted = stored.index.difference(current.index).tolist()
+        return frame[changed], current[changed].to_dict(), deleted
+
+    def push(self, source: str, frame: pd.DataFrame, key: str, batch_size: int = 1000) -> Dict[str, Any]:
+        """Send new, changed and deleted rows of frame to the remote source in batches"""
+        changed, hashes, deleted = self.diff(source, frame, key)
+        path = f"/sources/{quote(source, safe='')}/batch"
+        sent_before = self.client.bytes_sent
+        batches = 0
+        keys = changed[key].astype(str).tolist()
+        for start in range(0, max(len(changed), len(deleted)), batch_size):
+            rows = changed.iloc[start:start + batch_size]
+            batch_keys = keys[start:start + batch_size]
+            batch_deleted = deleted[start:start + batch_size]
+            self.client.request('POST', path, {'key': key, 'upsert': _records(rows), 'delete': batch_deleted})
+            batches += 1
+            self.state.apply(source, {k: hashes[k] for k in batch_keys}, batch_deleted)
+        return {'source': source, 'rows': len(frame), 'upserted': len(changed), 'deleted': len(deleted),
+                'batches': batches, 'bytes_sent': self.client.bytes_sent - sent_before}
+
+    def pull(self, source: str, page_size: int = 1000) -> Dict[str, Any]:
+        """Fetch rows changed remotely since the stored cursor.
+
+        Rows this engine pushed come back too; pull and push sources are
+        normally different feeds.
+        """
+        path = f"/sources/{quote(source, safe='')}/changes"
+        received_before = self.client.bytes_received
+        frames, deleted, pages = [], [], 0
+        while True:
+            since = self.state.cursor(source) or '0'
+            page = self.client.request('GET', f"{path}?since={quote(since)}&limit={page_size}")
+            pages += 1
+            if page.get('rows'):
+                frames.append(pd.DataFrame(page['rows']))
+            deleted += page.get('deleted', [])
+            self.state.set_cursor(source, str(page['cursor']))
+            if not page.get('more'):
+                break
+        rows = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+        return {'source': source, 'rows': rows, 'deleted': deleted, 'pages': pages,
+                'cursor': self.state.cursor(source), 'bytes_received': self.client.bytes_received - received_before}
+
+
+_engines: Dict[tuple, SyncEngine] = {}
+_engines_lock = threading.Lock()
+
+
+def engine(base_url: Optional[str] = None, api_key: Optional[str] = None, state_path: Optional[str] = None
+           ) -> SyncEngine:
+    """The process-wide engine (and pooled client) for SPORTAI_SYNC_URL"""
+    base_url = base_url or os.environ.get('SPORTAI_SYNC_URL')
+    if not base_url:
+        raise RuntimeError('No sync service configured; set SPORTAI_SYNC_URL')
+    api_key = api_key or os.environ.get('SPORTAI_SYNC_API_KEY')
+    state_path = state_path or os.environ.get('SPORTAI_SYNC_STATE_DB', STATE_DB)
+    key = (base_url, api_key, state_path)
+    with _engines_lock:
+        found = _engines.get(key)
+        if found is None:
+            found = _engines[key] = SyncEngine(SyncClient(base_url, api_key), SyncState(state_path))
+        return found
+
+
+class FakeSyncServer(ThreadingHTTPServer):
+    """In-memory stand-in for a sheets/finance API that versions every row change"""
+
+    daemon_threads = True
+
+    def __init__(self, port: int = 0):
+        self.sources: Dict[str, Dict[str, Any]] = {}
+        self.bytes_received = 0
+        self.lock = threading.Lock()
+        super().__init__(('127.0.0.1', port), _FakeSyncHandler)
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self) -> 'FakeSyncServer':
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def source(self, name: str) -> Dict[str, Any]:
+        return self.sources.setdefault(name, {'version': 0, 'rows': {}, 'deleted': {}})
+
+    def write(self, name: str, key: str, upsert: List[Dict[str, Any]], delete: List[str]) -> int:
+        """Apply a batch as one new version (also used to simulate edits made in the sheet)"""
+        with self.lock:
+            source = self.source(name)
+            source['version'] += 1
+            version = source['version']
+            for row in upsert:
+                row_key = str(row[key])
+                source['rows'][row_key] = (version, row)
+                source['deleted'].pop(row_key, None)
+            for row_key in delete:
+                if source['rows'].pop(row_key, None) is not None:
+                    source['deleted'][row_key] = version
+            return version
+
+    def changes(self, name: str, since: int, limit: int) -> Dict[str, Any]:
+        with self.lock:
+            source = self.source(name)
+            changed = sorted((v, k, row) for k, (v, row) in source['rows'].items() if v > since)
+            deleted = sorted((v, k) for k, v in source['deleted'].items() if v > since)
+        # Pages end on version boundaries so a cursor never splits a batch
+        events = sorted([(v, 0, k, row) for v, k, row in changed] + [(v, 1, k, None) for v, k in deleted],
+                        key=lambda e: (e[0], e[1], e[2]))
+        page = events[:limit]
+        more = len(events) > limit
+        if more:
+            last = page[-1][0]
+            page = [e for e in page if e[0] < last] or [e for e in events if e[0] == last]
+            more = len(page) < len(events)
+        cursor = page[-1][0] if page else since
+        return {'rows': [e[3] for e in page if e[1] == 0], 'deleted': [e[2] for e in page if e[1] == 1],
+                'cursor': cursor, 'more': more}
+
+
+class _FakeSyncHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self, code: int, payload: Dict[str, Any]):
+        body = json.dumps(payload, default=str).encode('utf-8')
+        self.send_response(code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _source(self, suffix: str) -> Optional[str]:
+        parts = urlsplit(self.path).path.split('/')
+        if len(parts) == 4 and parts[1] == 'sources' and parts[3] == suffix:
+            return unquote(parts[2])
+        return None
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        name = self._source('batch')
+        if name is None:
+            self._reply(404, {'error': 'not found'})
+            return
+        with self.server.lock:
+            self.server.bytes_received += len(body)
+        payload = json.loads(body or b'{}')
+        version = self.server.write(name, payload['key'], payload.get('upsert', []), payload.get('delete', []))
+        self._reply(200, {'cursor': version})
+
+    def do_GET(self):
+        name = self._source('changes')
+        if name is None:
+            self._reply(404, {'error': 'not found'})
+            return
+        query = parse_qs(urlsplit(self.path).query)
+        since = int(query.get('since', ['0'])[0])
+        limit = int(query.get('limit', ['1000'])[0])
+        self._reply(200, self.server.changes(name, since, limit))
+
+    def log_message(self, format, *args):
+        pass
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Incremental sync utilities.')
+    parser.add_argument('--fake-server', type=int, metavar='PORT', help='run a local fake sheets/finance API')
+    args = parser.parse_args(argv)
+    if args.fake_server is not None:
+        server = FakeSyncServer(args.fake_server)
+        print(f"Fake sync service on {server.url} (set SPORTAI_SYNC_URL to this)")
+        server.serve_forever()
+    else:
+        parser.print_help()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,9 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Keep the shared dataset cache's columnar copies out of the working tree
+os.environ.setdefault('SPORTAI_DATA_CACHE_DIR', tempfile.mkdtemp(prefix='sportai-cache-'))
+# Same for the rollups the process-wide live totals write to
+os.environ.setdefault('SPORTAI_ROLLUP_DB', os.path.join(tempfile.mkdtemp(prefix='sportai-rollups-'), 'rollups.db'))
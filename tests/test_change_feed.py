@@ -0,0 +1,71 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from change_feed import ChangeFeed, LiveTotals
+from usage_rollups import UsageRollups
+
+
+def test_subscribers_get_only_their_kinds_until_they_unsubscribe():
+    feed = ChangeFeed()
+    bookings, everything = [], []
+    stop = feed.subscribe(bookings.append, ['booking'])
+    feed.subscribe(everything.append)
+    feed.publish('booking', 'North Dome', surface='turf')
+    feed.publish('checkin', 'North Dome', member_id='M1')
+    stop()
+    feed.publish('booking', 'North Dome', surface='court')
+    assert [e['data']['surface'] for e in bookings] == ['turf']
+    assert [e['seq'] for e in everything] == [1, 2, 3]
+
+
+def test_since_returns_new_events_and_reports_gaps():
+    feed = ChangeFeed(capacity=3)
+    for i in range(5):
+        feed.publish('checkin', 'North Dome', member_id=f"M{i}")
+    events, latest, gap = feed.since(3)
+    assert [e['seq'] for e in events] == [4, 5] and latest == 5 and not gap
+    events, _, gap = feed.since(0, kinds=['checkin'])
+    assert [e['seq'] for e in events] == [3, 4, 5] and gap
+    assert feed.since(5) == ([], 5, False)
+
+
+def _booking(feed, booking_id, amount, facility='North Dome'):
+    start = datetime.now().replace(hour=12, minute=0, second=0, microsecond=0)
+    feed.publish('booking', facility, booking_id=booking_id, surface='turf',
+                 start=start.isoformat(), end=(start + timedelta(hours=1)).isoformat(), amount=amount)
+
+
+def test_totals_are_seeded_from_the_rollups_after_a_restart(tmp_path):
+    path = str(tmp_path / 'rollups.db')
+    feed = ChangeFeed()
+    totals = LiveTotals(UsageRollups(path))
+    feed.subscribe(totals.apply)
+    _booking(feed, 'B1', 80)
+    _booking(feed, 'B2', 40, facility='Ice Center')
+    feed.publish('checkin', 'North Dome', member_id='M1')
+    assert totals.snapshot() == {'bookings': 2, 'cancellations': 0, 'checkins': 1, 'revenue': 120}
+
+    # A new worker (or a restart) has seen none of those events
+    restarted_feed = ChangeFeed()
+    restarted = LiveTotals(UsageRollups(path))
+    restarted_feed.subscribe(restarted.apply)
+    assert restarted.snapshot()['bookings'] == 2
+    assert restarted.snapshot('North Dome')['revenue'] == pytest.approx(80)
+    assert restarted.facilities() == ['Ice Center', 'North Dome']
+
+    restarted_feed.publish('cancellation', 'North Dome', booking_id='B1')
+    restarted_feed.publish('revenue', 'Ice Center', txn_id='T1', amount=15)
+    after = restarted.snapshot()
+    assert (after['bookings'], after['cancellations'], after['revenue']) == (1, 1, pytest.approx(55))
+    # The first worker picks up the other worker's changes through the rollups
+    assert totals.snapshot()['bookings'] == 1
+
+
+def test_events_without_an_id_are_counted_in_process(tmp_path):
+    feed = ChangeFeed()
+    totals = LiveTotals(UsageRollups(str(tmp_path / 'rollups.db')))
+    feed.subscribe(totals.apply)
+    feed.publish('booking', 'Main Complex', source='test', amount=25)
+    assert totals.snapshot('Main Complex')['bookings'] == 1
+    assert totals.snapshot('Main Complex')['revenue'] == 25
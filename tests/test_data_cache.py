@@ -0,0 +1,53 @@
+import os
+
+import pandas as pd
+import pytest
+
+import data_cache
+from data_cache import ARROW_AVAILABLE, DatasetCache, file_hash
+
+
+def test_file_hash_is_memoised_until_the_file_changes(tmp_path, monkeypatch):
+    path = tmp_path / 'bookings.csv'
+    path.write_text('surface,start_time\nA,2026-05-01 10:00\n')
+    first = file_hash(str(path))
+
+    def fail(*args, **kwargs):
+        raise AssertionError('unchanged file was hashed again')
+    monkeypatch.setattr(data_cache, 'open', fail, raising=False)
+    assert file_hash(str(path)) == first
+    monkeypatch.undo()
+
+    path.write_text('surface,start_time\nB,2026-05-01 11:00\n')
+    assert file_hash(str(path)) != first
+
+
+@pytest.mark.skipif(not ARROW_AVAILABLE, reason='pyarrow not installed')
+def test_edited_csv_replaces_its_columnar_copy(tmp_path):
+    cache = DatasetCache(cache_dir=str(tmp_path / 'cache'))
+    path = tmp_path / 'assets.csv'
+    path.write_text('asset,price\nBanner,100\n')
+    cache.load_csv(str(path))
+    other = tmp_path / 'sponsors.csv'
+    other.write_text('sponsor,budget\nAcme,500\n')
+    cache.load_csv(str(other))
+    assert len(os.listdir(cache.cache_dir)) == 2
+
+    path.write_text('asset,price\nBanner,120\nScoreboard,300\n')
+    os.utime(path, ns=(1, 1))
+    assert len(cache.load_csv(str(path))) == 2
+    assert len(os.listdir(cache.cache_dir)) == 2
+    assert len(cache.load_csv(str(other))) == 1
+
+
+@pytest.mark.skipif(not ARROW_AVAILABLE, reason='pyarrow not installed')
+def test_columnar_copy_keeps_the_index(tmp_path):
+    path = tmp_path / 'members.csv'
+    path.write_text('member_id,name,visits\nM7,Ada,3\nM2,Grace,5\n')
+    cache_dir = str(tmp_path / 'cache')
+    DatasetCache(cache_dir=cache_dir).load_csv(str(path), index_col='member_id')
+    # A second worker starts cold and reads the columnar copy
+    worker = DatasetCache(cache_dir=cache_dir)
+    frame = worker.load_csv(str(path), index_col='member_id')
+    pd.testing.assert_frame_equal(frame, pd.read_csv(path, index_col='member_id'))
+    pd.testing.assert_frame_equal(worker.load_csv(str(path)), pd.read_csv(path))
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_modules.demand_forecasting import HOURS_PER_WEEK, DemandForecaster, hourly_counts
+
+MONDAY = pd.Timestamp('2026-03-02')
+
+
+def _profile():
+    """Bookings per hour-of-week in the base week: evenings only, double at weekends"""
+    profile = np.zeros(HOURS_PER_WEEK, dtype=int)
+    for day in range(7):
+        profile[day * 24 + 17:day * 24 + 21] = 2 if day >= 5 else 1
+    return profile
+
+
+def test_weeks_start_on_monday(tmp_path):
+    path = tmp_path / 'bookings.csv'
+    pd.DataFrame({'surface': ['turf', 'turf'],
+                  'start_time': ['2026-03-01 23:00', '2026-03-02 00:00']}).to_csv(path, index=False)
+    counts = hourly_counts(str(path)).sort_values('hour_of_week')
+    assert counts['week'].nunique() == 2
+    assert counts['hour_of_week'].tolist() == [0, 6 * 24 + 23]
+
+
+def test_recovers_linear_trend_and_weekly_profile_from_partial_edge_weeks(tmp_path):
+    assert MONDAY.dayofweek == 0
+    profile = _profile()
+    # Week w has (w + 2) x the base profile; the export starts on a Wednesday and ends on a Friday
+    first, last = MONDAY + pd.Timedelta(days=2), MONDAY + pd.Timedelta(weeks=9, days=5)
+    n_weeks = 10
+    starts = [MONDAY + pd.Timedelta(weeks=w, hours=int(h))
+              for w in range(n_weeks) for h in np.flatnonzero(profile) for _ in range(profile[h] * (w + 2))]
+    starts = [s for s in starts if first <= s < last]
+    path = tmp_path / 'bookings.csv'
+    pd.DataFrame({'facility': 'North', 'surface': 'turf', 'start_time': starts}).to_csv(path, index=False)
+
+    forecaster = DemandForecaster().fit(str(path))
+    assert forecaster.model['n_weeks'] == n_weeks
+    assert forecaster.model['slope'][0] == pytest.approx(profile.sum(), rel=1e-3)
+
+    forecast = forecaster.predict(horizon_weeks=2)
+    for ahead in (1, 2):
+        week = forecast[forecast['weeks_ahead'] == ahead].sort_values('hour_of_week')
+        expected = profile * (n_weeks + ahead - 1 + 2)
+        np.testing.assert_allclose(week['expected_bookings'].to_numpy(), expected, rtol=1e-3, atol=0.05)
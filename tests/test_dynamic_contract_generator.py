@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from ai_modules import dynamic_contract_generator as contracts
+
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv('SPORTAI_SIGNING_URL', raising=False)
+    os.makedirs('contract_templates')
+    with open('contract_templates/sponsor.txt', 'w') as f:
+        f.write('Agreement with $sponsor_name')
+    return tmp_path
+
+
+def run_batch(items, **kwargs):
+    return contracts.generate_contracts_batch('sponsor', items, output_dir='contracts',
+                                              status_path='contract_batches.db', **kwargs)
+
+
+def test_contract_keys_cannot_escape_the_batch_directory(workdir):
+    items = [{'contract_key': '../../x', 'sponsor_name': 'A'},
+             {'contract_key': '/etc/passwd', 'sponsor_name': 'B'},
+             {'contract_key': 'S-001', 'sponsor_name': 'C'}]
+    batch = run_batch(items)
+    assert batch['counts'] == {'rendered': 3}
+    batch_dir = os.path.realpath(os.path.join('contracts', batch['batch_id']))
+    for row in batch['items'].values():
+        assert os.path.dirname(os.path.realpath(row['output_path'])) == batch_dir
+    assert not (workdir.parent / 'x.txt').exists()
+    assert os.path.exists(os.path.join(batch_dir, 'S-001.txt'))
+
+
+def test_distinct_unsafe_keys_get_distinct_files(workdir):
+    batch = run_batch([{'contract_key': 'a/b', 'sponsor_name': 'A'}, {'contract_key': 'a?b', 'sponsor_name': 'B'}])
+    paths = {row['output_path'] for row in batch['items'].values()}
+    assert len(paths) == 2
+
+
+def test_template_ids_are_plain_names(workdir):
+    with pytest.raises(ValueError):
+        contracts.get_template('../secrets')
+
+
+def test_resuming_skips_finished_items_and_completes(workdir):
+    items = [{'contract_key': f"S{i}", 'sponsor_name': str(i)} for i in range(5)]
+    first = run_batch(items)
+    assert first['complete']
+    again = run_batch(items, batch_id=first['batch_id'])
+    assert again['skipped'] == 5
+    fresh = run_batch(items)
+    assert fresh['skipped'] == 0 and fresh['batch_id'] != first['batch_id']
+
+
+def test_batch_reads_templates_from_the_given_directory(workdir):
+    other = workdir / 'brand_templates'
+    other.mkdir()
+    (other / 'sponsor.txt').write_text('Partnership with $sponsor_name')
+    batch = run_batch([{'contract_key': 'S1', 'sponsor_name': 'Acme'}], template_dir=str(other))
+    assert batch['counts'] == {'rendered': 1}
+    with open(batch['items']['S1']['output_path'], encoding='utf-8') as f:
+        assert f.read() == 'Partnership with Acme'
+    assert contracts.generate_contract('sponsor', {'sponsor_name': 'Acme'},
+                                       template_dir=str(other))['contract'] == 'Partnership with Acme'
@@ -0,0 +1,59 @@
+import pytest
+
+from ai_modules.fixture_engine import build_fixtures
+
+
+def _state():
+    teams = [f"T{i}" for i in range(12)]
+    referees = [{'id': f"R{i}", 'level': i % 2} for i in range(4)]
+    return build_fixtures(teams, ['A', 'B', 'C'], days=2, slots_per_day=6, pool_size=4, rest_slots=1,
+                          max_per_day=2, referees=referees, levels={'T0': 1, 'T1': 1})
+
+
+def _accounted(state):
+    waiting = set(state.unplaced)
+    return all((g['slot'] is None) == (g['game_id'] in waiting) for g in state.games.values())
+
+
+def test_built_fixtures_are_valid():
+    state = _state()
+    assert state.check() == []
+    assert _accounted(state)
+
+
+def test_withdraw_keeps_fixtures_valid():
+    state = _state()
+    result = state.withdraw('T3')
+    assert result['removed']
+    assert not any('T3' in (g['home'], g['away']) for g in state.games.values())
+    assert state.check() == []
+
+
+def test_close_field_past_the_last_slot_is_clamped():
+    state = _state()
+    games = len(state.games)
+    result = state.close_field('A', 4, state.n_slots + 5)
+    assert len(state.games) == games
+    assert _accounted(state)
+    assert state.check() == []
+    assert not any(f == 0 and s >= 4 for s, f in state.cells)
+    assert set(result['unplaced']) <= set(state.unplaced)
+
+
+def test_close_then_reopen_restores_capacity():
+    state = _state()
+    state.close_field('B', -3, None)
+    assert state.check() == []
+    state.reopen_field('B')
+    assert state.check() == []
+    assert (state.free_count == (state.busy == 0).sum(axis=1)).all()
+
+
+def test_inverted_range_changes_nothing():
+    state = _state()
+    before = state.to_frame()
+    with pytest.raises(ValueError):
+        state.close_field('A', 8, 2)
+    assert state.to_frame().equals(before)
+    with pytest.raises(KeyError):
+        state.close_field('Z', 0, 2)
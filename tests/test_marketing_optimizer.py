@@ -0,0 +1,79 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ai_modules.marketing_optimizer import CHANNELS, allocate_budget, optimize_campaign
+from ai_modules.membership_churn import ChurnPredictor
+
+
+def plan_value(values, chosen):
+    rows = np.flatnonzero(chosen >= 0)
+    return values[rows, chosen[rows]].sum()
+
+
+def cheapest_channel_value(values, costs, budget):
+    """Value of giving every row the cheapest channel, as many rows as the budget allows"""
+    channel = int(np.argmin(costs))
+    affordable = min(len(values), int(budget / costs[channel] + 1e-9))
+    return np.sort(values[:, channel])[::-1][:affordable].sum()
+
+
+@pytest.mark.parametrize('budget', [500, 100, 50, 10, 1])
+def test_uniform_invites_use_the_budget(budget):
+    invites = pd.DataFrame({'recipient_id': range(200_000)})
+    result = optimize_campaign(invites, budget)
+    slack_for_everyone = 200_000 * CHANNELS['slack']['cost']
+    assert result['spend'] <= budget + 1e-6
+    # Leftover is less than the dearest single upgrade
+    assert result['spend'] >= min(budget, slack_for_everyone) - max(c['cost'] for c in CHANNELS.values())
+    assert result['unreached'] < 200_000
+
+
+@pytest.mark.parametrize('budget', [0.5, 2.0, 7.5, 30.0])
+def test_never_worse_than_cheapest_channel(budget):
+    rng = np.random.default_rng(int(budget * 10))
+    values = rng.random((5000, 3)) * np.array([1.0, 1.8, 0.7])
+    values[rng.random(values.shape) < 0.1] = -np.inf
+    costs = np.array([0.002, 0.02, 0.0005])
+    chosen, _ = allocate_budget(values, costs, budget)
+    assert costs[chosen[chosen >= 0]].sum() <= budget + 1e-9
+    finite = np.where(np.isfinite(values), values, 0.0)
+    assert plan_value(values, chosen) >= cheapest_channel_value(finite, costs, budget) - 1e-9
+
+
+def test_numeric_member_ids_join_stored_churn_scores(tmp_path):
+    db = str(tmp_path / 'churn.db')
+    features = tmp_path / 'member_features.csv'
+    pd.DataFrame({'member_id': [101, 102, 103], 'missed_payments': [0, 5, 0]}).to_csv(features, index=False)
+    ChurnPredictor(db_path=db).score_file(str(features))
+
+    invites_path = tmp_path / 'invites.csv'
+    pd.DataFrame({'recipient_id': ['a', 'b', 'c', 'd'], 'member_id': [101, 102, 103, 999]}).to_csv(
+        invites_path, index=False)
+    invites = pd.read_csv(invites_path)
+    assert invites['member_id'].dtype.kind == 'i'
+
+    result = optimize_campaign(invites, budget=1.0, churn_db=db)
+    plan = result['plan'].set_index('recipient_id')
+    # The member with missed payments is at higher risk, so worth more
+    assert plan.loc['b', 'expected_response'] > plan.loc['a', 'expected_response']
+    assert len(plan) == 4
+
+
+def test_float_member_ids_from_gaps_join_stored_churn_scores(tmp_path):
+    db = str(tmp_path / 'churn.db')
+    features = tmp_path / 'member_features.csv'
+    pd.DataFrame({'member_id': [101, 102], 'missed_payments': [0, 5]}).to_csv(features, index=False)
+    ChurnPredictor(db_path=db).score_file(str(features))
+
+    invites_path = tmp_path / 'invites.csv'
+    pd.DataFrame({'recipient_id': ['a', 'b', 'c', 'd'], 'member_id': [101, 102, None, 999]}).to_csv(
+        invites_path, index=False)
+    invites = pd.read_csv(invites_path)
+    assert invites['member_id'].dtype.kind == 'f'
+
+    plan = optimize_campaign(invites, budget=1.0, churn_db=db)['plan'].set_index('recipient_id')
+    assert plan.loc['b', 'expected_response'] > plan.loc['a', 'expected_response']
+    # Scored members differ from the one with no id and the one with no stored score
+    assert plan.loc['a', 'expected_response'] != plan.loc['d', 'expected_response']
+    assert plan.loc['c', 'expected_response'] == plan.loc['d', 'expected_response']
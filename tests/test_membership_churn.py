@@ -0,0 +1,50 @@
+import pandas as pd
+
+from ai_modules.membership_churn import ChurnPredictor, load_churn_scores
+
+
+def write_features(path, n=50):
+    pd.DataFrame({
+        'member_id': [f"M{i}" for i in range(n)],
+        'days_since_last_visit': range(n),
+        'visits_last_30d': [i % 7 for i in range(n)],
+    }).to_csv(path, index=False)
+
+
+def test_unchanged_features_are_not_rescored(tmp_path):
+    features, db = tmp_path / 'member_features.csv', str(tmp_path / 'churn.db')
+    write_features(features)
+    assert ChurnPredictor(db_path=db).score_file(str(features))['rescored'] == 50
+    assert ChurnPredictor(db_path=db).score_file(str(features))['rescored'] == 0
+
+
+def test_model_change_rescores_everyone(tmp_path):
+    features, db = tmp_path / 'member_features.csv', str(tmp_path / 'churn.db')
+    write_features(features)
+    ChurnPredictor(db_path=db).score_file(str(features))
+    before = load_churn_scores(db_path=db).set_index('member_id')['score']
+
+    stats = ChurnPredictor(db_path=db, bias=2.0).score_file(str(features))
+    after = load_churn_scores(db_path=db).set_index('member_id')['score']
+    assert stats['rescored'] == 50
+    assert (after.loc[before.index] > before).all()
+
+
+def test_load_scores_for_more_ids_than_sqlite_variables(tmp_path):
+    features, db = tmp_path / 'member_features.csv', str(tmp_path / 'churn.db')
+    write_features(features, n=40_000)
+    ChurnPredictor(db_path=db).score_file(str(features))
+    wanted = [f"M{i}" for i in range(40_000)] + ['missing']
+    scores = load_churn_scores(member_ids=wanted, db_path=db)
+    assert len(scores) == 40_000
+    assert sorted(load_churn_scores(member_ids=['M3', 'M5'], db_path=db)['member_id']) == ['M3', 'M5']
+
+
+def test_members_missing_from_the_file_are_removed(tmp_path):
+    features, db = tmp_path / 'member_features.csv', str(tmp_path / 'churn.db')
+    write_features(features, n=50)
+    ChurnPredictor(db_path=db, chunksize=7).score_file(str(features))
+    write_features(features, n=30)
+    stats = ChurnPredictor(db_path=db, chunksize=7).score_file(str(features))
+    assert stats == {'rows': 30, 'rescored': 0, 'removed': 20}
+    assert sorted(load_churn_scores(db_path=db)['member_id']) == sorted(f"M{i}" for i in range(30))
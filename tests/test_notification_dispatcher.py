@@ -0,0 +1,134 @@
+import sqlite3
+import time
+
+import pytest
+
+import notification_dispatcher
+from change_feed import ChangeFeed
+from notification_dispatcher import (Dispatcher, EmailSender, MockHTTPSink, MockSMTPSink, Outbox, WebhookSender)
+
+
+@pytest.fixture
+def outbox(tmp_path):
+    return Outbox(str(tmp_path / 'notifications.db'))
+
+
+@pytest.fixture
+def smtp_sink():
+    sink = MockSMTPSink().start()
+    yield sink
+    sink.shutdown()
+    sink.server_close()
+
+
+def queue_emails(outbox, count):
+    for i in range(count):
+        outbox.put('email', f"member{i}@example.com", f"Hello {i}", subject='Alert')
+
+
+def test_dropped_connection_retries_only_undelivered_emails(outbox, smtp_sink):
+    smtp_sink.drop_after = 3
+    queue_emails(outbox, 5)
+    dispatcher = Dispatcher(outbox, {}, backoff=0)
+    sender = EmailSender('127.0.0.1', smtp_sink.port)
+
+    batch = outbox.claim('email', 10)
+    failed = sender.send_batch(batch)
+    assert sorted(failed) == [m['id'] for m in batch[3:]]
+    dispatcher._acknowledge(batch, failed)
+    assert outbox.counts()['email'] == {'sent': 3, 'pending': 2}
+
+    smtp_sink.drop_after = 0
+    retry = outbox.claim('email', 10)
+    assert [m['id'] for m in retry] == [m['id'] for m in batch[3:]]
+    dispatcher._acknowledge(retry, sender.send_batch(retry))
+    assert outbox.counts()['email'] == {'sent': 5}
+    delivered = [m['to'][0] for m in smtp_sink.messages]
+    assert sorted(delivered) == sorted(f"member{i}@example.com" for i in range(5))
+
+
+def test_refused_recipient_fails_alone(outbox, smtp_sink):
+    smtp_sink.reject = {'member1@example.com'}
+    queue_emails(outbox, 3)
+    dispatcher = Dispatcher(outbox, {}, backoff=60)
+    batch = outbox.claim('email', 10)
+    failed = EmailSender('127.0.0.1', smtp_sink.port).send_batch(batch)
+    assert list(failed) == [batch[1]['id']]
+    dispatcher._acknowledge(batch, failed)
+    assert outbox.counts()['email'] == {'sent': 2, 'pending': 1}
+    assert len(smtp_sink.messages) == 2
+
+
+def test_dispatcher_drains_webhook_channel_and_coalesces(outbox):
+    sink = MockHTTPSink().start()
+    try:
+        for _ in range(3):
+            outbox.put('sms', '+15550100', 'Field 3 closed', dedupe_key='field-3')
+        outbox.put('sms', '+15550101', 'Welcome')
+        dispatcher = Dispatcher(outbox, {'sms': {'sender': WebhookSender(sink.url), 'batch_size': 10,
+                                                 'rate': 100}}, idle_poll=0.05).start()
+        deadline = time.time() + 5
+        while outbox.counts().get('sms', {}).get('sent', 0) < 2 and time.time() < deadline:
+            time.sleep(0.02)
+        dispatcher.stop()
+        assert outbox.counts()['sms'] == {'sent': 2}
+        assert sum(len(post['messages']) for post in sink.received) == 2
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+
+def test_failed_webhook_is_retried_with_backoff(outbox):
+    sink = MockHTTPSink(status=500).start()
+    try:
+        outbox.put('slack', '#ops', 'Dome pressure low')
+        dispatcher = Dispatcher(outbox, {}, backoff=60)
+        batch = outbox.claim('slack', 10)
+        with pytest.raises(RuntimeError):
+            WebhookSender(sink.url, join_text=True).send_batch(batch)
+        dispatcher._acknowledge(batch, {batch[0]['id']: 'RuntimeError: HTTP 500'})
+        assert outbox.counts()['slack'] == {'pending': 1}
+        assert outbox.claim('slack', 10) == []
+    finally:
+        sink.shutdown()
+        sink.server_close()
+
+
+def test_sent_messages_past_retention_are_purged(outbox):
+    queue_emails(outbox, 3)
+    batch = outbox.claim('email', 10)
+    outbox.mark_sent([m['id'] for m in batch[:2]])
+    outbox._conn().execute('UPDATE outbox SET sent_at = ? WHERE id = ?', (time.time() - 40 * 86400, batch[0]['id']))
+    assert outbox.purge_sent(older_than_days=30) == 1
+    assert outbox.counts()['email'] == {'sent': 1, 'pending': 1}
+
+
+def test_outbox_from_before_sent_at_is_migrated(tmp_path):
+    path = str(tmp_path / 'old.db')
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE outbox (id INTEGER PRIMARY KEY AUTOINCREMENT, channel TEXT NOT NULL, '
+                 'recipient TEXT NOT NULL, subject TEXT NOT NULL DEFAULT "", body TEXT NOT NULL, dedupe_key TEXT, '
+                 'status TEXT NOT NULL DEFAULT "pending", attempts INTEGER NOT NULL DEFAULT 0, '
+                 'next_attempt_at REAL NOT NULL, created_at REAL NOT NULL, last_error TEXT)')
+    conn.execute("INSERT INTO outbox (channel, recipient, body, status, next_attempt_at, created_at) "
+                 "VALUES ('email', 'a@example.com', 'old', 'sent', 0, 0)")
+    conn.commit()
+    conn.close()
+    assert Outbox(path).purge_sent(older_than_days=30) == 1
+
+
+def test_booking_events_with_an_email_queue_a_notice(outbox, monkeypatch):
+    monkeypatch.setattr(notification_dispatcher, '_outbox', outbox)
+    monkeypatch.setattr(notification_dispatcher, '_dispatcher', None)
+    feed = ChangeFeed()
+    feed.subscribe(notification_dispatcher.booking_notice, tuple(notification_dispatcher.BOOKING_NOTICES))
+    feed.publish('booking', 'North Dome', booking_id='B1', start='2026-05-02 18:00', email='pat@example.com')
+    feed.publish('booking', 'North Dome', booking_id='B1', start='2026-05-02 18:00', email='pat@example.com')
+    feed.publish('cancellation', 'North Dome', booking_id='B1', email='pat@example.com')
+    feed.publish('booking', 'North Dome', booking_id='B2', start='2026-05-02 19:00')
+    feed.publish('checkin', 'North Dome', booking_id='B1', email='pat@example.com')
+
+    messages = outbox.claim('email', 10)
+    assert [m['subject'] for m in messages] == ['Booking confirmed', 'Booking cancelled']
+    assert messages[0]['recipient'] == 'pat@example.com'
+    assert 'B1 at North Dome' in messages[0]['body'] and '2026-05-02 18:00' in messages[0]['body']
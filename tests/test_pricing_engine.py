@@ -0,0 +1,49 @@
+import numpy as np
+import pandas as pd
+
+from pricing_engine import PricingEngine
+
+
+def _engine():
+    # 2026-05-04 is a Monday, so hour_of_week equals the hour of the day on the first day
+    forecast = pd.DataFrame({'facility': 'North Dome', 'surface': 'turf', 'weeks_ahead': 1,
+                             'hour_of_week': np.arange(168), 'expected_bookings': 0.5})
+    bookings = pd.DataFrame({'facility': ['North Dome'], 'surface': ['turf'],
+                             'start_time': ['2026-05-04 18:00'], 'end_time': ['2026-05-04 20:00']})
+    return PricingEngine(base_rates={'turf': 100.0}, horizon_days=2).build(forecast, bookings, start='2026-05-04')
+
+
+def test_booked_slots_are_priced_higher():
+    engine = _engine()
+    quiet = engine.price('North Dome', 'turf', '2026-05-04 17:00')
+    assert engine.price('North Dome', 'turf', '2026-05-04 18:30') > quiet
+    assert engine.price('North Dome', 'turf', '2026-05-04 20:00') == quiet
+    assert engine.price('North Dome', 'turf', '2026-05-07 10:00') is None
+
+
+def test_booking_reprices_only_its_slots_and_cancellation_restores_them():
+    engine = _engine()
+    before = engine.prices.copy()
+    assert engine.apply_booking('North Dome', 'turf', '2026-05-05 09:00', '2026-05-05 11:00') == 2
+    changed = np.argwhere(engine.prices != before)[:, 2]
+    assert changed.tolist() == [33, 34]
+    engine.apply_booking('North Dome', 'turf', '2026-05-05 09:00', '2026-05-05 11:00', count=-1)
+    assert np.array_equal(engine.prices, before)
+
+
+def test_simulation_is_reproducible_with_a_seed():
+    engine = _engine()
+    first = engine.simulate_revenue(200, seed=1)
+    assert first['mean'] == engine.simulate_revenue(200, seed=1)['mean']
+    assert first['p5'] <= first['p50'] <= first['p95']
+    assert first['mean'] >= first['booked_revenue']
+
+
+def test_blank_or_invalid_end_time_fills_one_hour():
+    forecast = pd.DataFrame(columns=['facility', 'surface', 'weeks_ahead', 'hour_of_week', 'expected_bookings'])
+    bookings = pd.DataFrame({'facility': 'North Dome', 'surface': 'turf',
+                             'start_time': ['2026-05-04 12:00', '2026-05-04 15:00', '2026-05-04 18:00'],
+                             'end_time': [None, 'not a time', '2026-05-04 20:00']})
+    engine = PricingEngine(horizon_days=2).build(forecast, bookings, start='2026-05-04')
+    assert np.nonzero(engine.booked[0, 0])[0].tolist() == [12, 15, 18, 19]
+    assert engine.apply_booking('North Dome', 'turf', '2026-05-05 09:00', float('nan')) == 1
@@ -0,0 +1,76 @@
+import urllib.request
+
+import pytest
+
+from render_metrics import RenderMonitor
+
+
+@pytest.fixture
+def monitor(tmp_path):
+    return RenderMonitor(capacity=100, profile_sample_rate=0.0, profile_dir=str(tmp_path))
+
+
+class Boom(Exception):
+    pass
+
+
+def test_track_records_successful_renders(monitor):
+    with monitor.track('Schedule'):
+        pass
+    [record] = monitor.snapshot()
+    assert record['name'] == 'Schedule'
+    assert record['error'] is None
+    assert record['wall'] >= 0 and record['cpu'] >= 0
+    assert record['peak_kb'] is None and record['profile'] is None
+
+
+def test_track_records_and_reraises_errors(monitor):
+    with pytest.raises(Boom):
+        with monitor.track('Schedule'):
+            raise Boom('render failed')
+    assert monitor.snapshot()[-1]['error'] == 'Boom'
+    assert monitor.totals['Schedule']['errors'] == 1
+
+
+def test_track_does_not_count_reruns_as_errors(monitor):
+    with pytest.raises(KeyboardInterrupt):
+        with monitor.track('Schedule'):
+            raise KeyboardInterrupt
+    assert monitor.snapshot()[-1]['error'] is None
+
+
+def test_summary_groups_by_name_slowest_first(monitor):
+    for name, wall, error in [('Fast', 0.01, None), ('Fast', 0.02, 'Boom'), ('Slow', 0.5, None)]:
+        monitor._record({'name': name, 'at': 0, 'wall': wall, 'cpu': wall / 2, 'peak_kb': None,
+                         'error': error, 'profile': None})
+    slow, fast = monitor.summary()
+    assert slow['name'] == 'Slow' and slow['p95_ms'] == pytest.approx(500)
+    assert fast['renders'] == 2 and fast['error_rate'] == 0.5
+    assert fast['max_ms'] == pytest.approx(20)
+    assert fast['mean_cpu_ms'] == pytest.approx(7.5)
+
+
+def test_prometheus_text_has_counters_and_quantiles(monitor):
+    with monitor.track('Say "hi"'):
+        pass
+    with pytest.raises(Boom):
+        with monitor.track('Say "hi"'):
+            raise Boom
+    text = monitor.prometheus_text()
+    assert '# TYPE sportai_render_total counter' in text
+    assert 'sportai_render_total{tool="Say \\"hi\\""} 2' in text
+    assert 'sportai_render_errors_total{tool="Say \\"hi\\""} 1' in text
+    assert 'sportai_render_wall_seconds{tool="Say \\"hi\\"",quantile="0.95"}' in text
+    assert text.endswith('\n')
+
+
+def test_metrics_server_binds_loopback_by_default(monitor):
+    server = monitor.serve(0)
+    try:
+        host, port = server.server_address
+        assert host == '127.0.0.1'
+        with urllib.request.urlopen(f'http://127.0.0.1:{port}/metrics') as response:
+            assert b'sportai_render_total' in response.read()
+    finally:
+        server.shutdown()
+        server.server_close()
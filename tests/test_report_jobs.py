@@ -0,0 +1,44 @@
+import pandas as pd
+import pytest
+
+from report_jobs import ReportJobQueue
+from usage_rollups import UsageRollups
+
+
+@pytest.fixture
+def queue(tmp_path):
+    queue = ReportJobQueue(db_path=str(tmp_path / 'jobs.db'), artifact_dir=str(tmp_path / 'artifacts'), max_workers=1)
+    yield queue
+    queue.shutdown()
+
+
+def test_identical_submissions_share_one_build(queue):
+    params = {'title': 'Board Packet', 'lines': ['Revenue up']}
+    job_id = queue.submit('report_jobs:build_text_pdf', params, title='Board Packet')
+    assert queue.wait(job_id, timeout=60)['status'] == 'done'
+    assert queue.submit('report_jobs:build_text_pdf', params) == job_id
+    assert queue.status(job_id)['requests'] == 2
+    assert queue.read_artifact(job_id).startswith(b'%PDF')
+
+
+def test_unfinished_job_has_nothing_to_download(queue):
+    job_id = queue.submit('report_jobs:no_such_builder', {})
+    assert queue.wait(job_id, timeout=60)['status'] == 'failed'
+    assert queue.artifact(job_id) is None
+    with pytest.raises(FileNotFoundError):
+        queue.read_artifact(job_id)
+
+
+def test_weekly_usage_report_builds_in_a_worker(queue, tmp_path):
+    rollups = UsageRollups(str(tmp_path / 'rollups.db'))
+    rollups.ingest_bookings(pd.DataFrame({
+        'booking_id': ['B1', 'B2'], 'facility': ['North', 'North'], 'surface': ['turf', 'turf'],
+        'start': pd.to_datetime(['2026-05-04 18:00', '2026-05-12 18:00']),
+        'end': pd.to_datetime(['2026-05-04 19:30', '2026-05-12 19:00']), 'revenue': [120.0, 80.0]}))
+    params = {'db': rollups.path, 'version': rollups.version(), 'facility': 'North', 'weeks': 4,
+              'end': '2026-05-25'}
+    job_id = queue.submit('usage_rollups:build_weekly_report', params, title='Weekly Usage Report')
+    assert queue.wait(job_id, timeout=60)['status'] == 'done'
+    pdf = queue.read_artifact(job_id)
+    assert pdf.startswith(b'%PDF')
+    assert b'2026-05-04' in pdf and b'$      200.00' in pdf
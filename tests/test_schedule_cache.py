@@ -0,0 +1,47 @@
+from schedule_cache import ScheduleCache
+
+
+def _cache(tmp_path):
+    path = tmp_path / 'booking_data.csv'
+    path.write_text('facility,surface,start_time,end_time\n'
+                    'North Dome,Field 1,2026-05-01 22:00,2026-05-02 02:00\n'
+                    'North Dome,Field 2,2026-05-02 23:00,2026-05-03 00:00\n')
+    return ScheduleCache(str(path))
+
+
+def test_booking_past_midnight_shows_on_both_days(tmp_path):
+    cache = _cache(tmp_path)
+    _, payload = cache.calendar('North Dome', '2026-05-01', days=3)
+    first, second, third = payload['days']
+    assert first['hours']['Field 1'][22:] == [1, 1]
+    assert second['hours']['Field 1'][:3] == [1, 1, 0]
+    # Ending exactly at midnight does not reach the next day
+    assert [b['surface'] for b in third['bookings']] == []
+
+
+def test_event_invalidates_every_day_it_covers(tmp_path):
+    cache = _cache(tmp_path)
+    day1, day2, day3 = (cache.etag('North Dome', f'2026-05-0{i}') for i in (1, 2, 3))
+    cache.apply({'kind': 'booking', 'facility': 'North Dome',
+                 'data': {'surface': 'Field 3', 'start': '2026-05-01 23:00', 'end': '2026-05-02 01:00'}})
+    assert cache.etag('North Dome', '2026-05-01') != day1
+    assert cache.etag('North Dome', '2026-05-02') != day2
+    assert cache.etag('North Dome', '2026-05-03') == day3
+    assert cache.day('North Dome', '2026-05-02')[1]['hours']['Field 3'][0] == 1
+
+    cache.apply({'kind': 'cancellation', 'facility': 'North Dome',
+                 'data': {'surface': 'Field 3', 'start': '2026-05-01 23:00', 'end': '2026-05-02 01:00'}})
+    assert 'Field 3' not in cache.day('North Dome', '2026-05-01')[1]['hours']
+    assert 'Field 3' not in cache.day('North Dome', '2026-05-02')[1]['hours']
+
+
+def test_workers_share_etags_only_for_days_without_live_changes(tmp_path):
+    first, second = _cache(tmp_path), _cache(tmp_path)
+    assert first.etag('North Dome', '2026-05-01', 3) == second.etag('North Dome', '2026-05-01', 3)
+    event = {'kind': 'booking', 'facility': 'North Dome',
+             'data': {'surface': 'Field 3', 'start': '2026-05-02 09:00'}}
+    first.apply(event)
+    second.apply(dict(event, data=dict(event['data'], surface='Field 4')))
+    # Same version counters, different bookings: the tags must not match
+    assert first.etag('North Dome', '2026-05-01', 3) != second.etag('North Dome', '2026-05-01', 3)
+    assert first.etag('North Dome', '2026-05-03') == second.etag('North Dome', '2026-05-03')
@@ -0,0 +1,87 @@
+import random
+
+from ai_modules.scheduling_optimizer import ResourceCalendar, ScheduleState, optimize_schedule
+
+RESOURCES = [{'id': 'turf-1', 'surface': 'turf'}, {'id': 'turf-2', 'surface': 'turf'},
+             {'id': 'court-1', 'surface': 'court'}]
+
+
+def _request(request_id, surface, start, length, priority=0):
+    return {'request_id': request_id, 'surface': surface, 'start': start, 'end': start + length,
+            'priority': priority}
+
+
+def _overlaps(a_start, a_end, b_start, b_end):
+    return a_start < b_end and b_start < a_end
+
+
+def _check(state):
+    """Compare the incremental state against brute force over every request"""
+    booked = {resource_id: [] for resource_id in state.calendars}
+    for request_id, resource_id in state.assignments.items():
+        surface, start, end, _ = state.requests[request_id]
+        assert resource_id in [c.resource_id for c in state.by_surface[surface]]
+        assert all(not _overlaps(start, end, s, e) for s, e in booked[resource_id])
+        booked[resource_id].append((start, end))
+    for resource_id, intervals in booked.items():
+        calendar = state.calendars[resource_id]
+        assert list(zip(calendar.starts, calendar.ends)) == sorted(intervals)
+    waiting = set().union(*state.waiting.values()) if state.waiting else set()
+    assert waiting == set(state.unscheduled())
+    # Nothing waits while a resource of its surface is free for it
+    for request_id in state.unscheduled():
+        surface, start, end, _ = state.requests[request_id]
+        for calendar in state.by_surface.get(surface, ()):
+            assert any(_overlaps(start, end, s, e) for s, e in booked[calendar.resource_id])
+
+
+def test_is_free_matches_brute_force():
+    rng = random.Random(1)
+    calendar, intervals = ResourceCalendar('turf-1'), []
+    for i in range(200):
+        start = rng.randrange(0, 2000)
+        end = start + rng.randrange(1, 90)
+        free = all(not _overlaps(start, end, s, e) for s, e in intervals)
+        assert calendar.is_free(start, end) == free
+        if free:
+            calendar.book(start, end, f'R{i}')
+            intervals.append((start, end))
+
+
+def test_waitlisted_request_is_promoted_on_cancel():
+    state = ScheduleState(RESOURCES[2:])
+    assert state.add(_request('A', 'court', 600, 60)) == 'court-1'
+    assert state.add(_request('B', 'court', 630, 60)) is None
+    assert state.add(_request('C', 'court', 900, 60)) == 'court-1'
+    assert state.unscheduled() == ['B']
+    assert state.cancel('A') == ['B']
+    assert state.assignments == {'B': 'court-1', 'C': 'court-1'}
+    assert not state.waiting
+    _check(state)
+
+
+def test_adds_in_priority_order_match_a_full_solve():
+    rng = random.Random(2)
+    requests = [_request(f'R{i}', rng.choice(['turf', 'court']), rng.randrange(0, 24 * 60, 30),
+                         rng.choice([60, 90, 120]), rng.randrange(3)) for i in range(150)]
+    solved = optimize_schedule(requests, RESOURCES)
+    incremental = ScheduleState(RESOURCES)
+    for request in sorted(requests, key=lambda r: (-r['priority'], r['start'], r['request_id'])):
+        incremental.add(request)
+    assert incremental.assignments == solved.assignments
+    assert incremental.unscheduled() == solved.unscheduled()
+    _check(incremental)
+
+
+def test_random_adds_and_cancels_keep_the_schedule_consistent():
+    rng = random.Random(3)
+    state = optimize_schedule([_request(f'R{i}', rng.choice(['turf', 'court']), rng.randrange(0, 24 * 60, 15),
+                                        rng.choice([45, 60, 90])) for i in range(60)], RESOURCES)
+    _check(state)
+    for step in range(300):
+        if state.requests and rng.random() < 0.5:
+            state.cancel(rng.choice(sorted(state.requests)))
+        else:
+            state.add(_request(f'N{step}', rng.choice(['turf', 'court']), rng.randrange(0, 24 * 60, 15),
+                               rng.choice([45, 60, 90])))
+        _check(state)
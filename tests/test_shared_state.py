@@ -0,0 +1,82 @@
+import json
+import ssl
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from shared_state import LocalRedisServer, SharedState, SQLiteStateBackend, backend_from_url
+
+
+@pytest.fixture(params=['sqlite', 'redis'])
+def state(request, tmp_path):
+    if request.param == 'sqlite':
+        yield SharedState(SQLiteStateBackend(str(tmp_path / 'state.db')))
+    else:
+        server = LocalRedisServer().start()
+        try:
+            yield SharedState(backend_from_url(server.url))
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+def test_session_lifecycle(state):
+    token = state.create_session({'email': 'admin@sportai.com', 'role': 'admin'})
+    assert state.get_session(token) == {'email': 'admin@sportai.com', 'role': 'admin'}
+    state.end_session(token)
+    assert state.get_session(token) is None
+    assert state.get_session(None) is None
+
+
+def test_sessions_expire(state):
+    token = state.create_session({'email': 'user@sportai.com', 'role': 'user'}, ttl=0.05)
+    time.sleep(0.1)
+    assert state.get_session(token) is None
+
+
+def test_cached_computes_once(state):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {'rows': [1, 2, 3]}
+
+    assert state.cached('forecast', 'digest', compute) == {'rows': [1, 2, 3]}
+    assert state.cached('forecast', 'digest', compute) == {'rows': [1, 2, 3]}
+    assert len(calls) == 1
+    state.invalidate('forecast', 'digest')
+    state.cached('forecast', 'digest', compute)
+    assert len(calls) == 2
+
+
+def test_cached_dataframes_round_trip_as_json(state):
+    frame = pd.DataFrame({'facility': ['North', 'South'], 'hour_of_week': [0, 167], 'expected': [1.5, 2.0]})
+    state.cached('forecast', 'frame', lambda: {'plan': frame, 'total': np.float32(3.5)})
+    value = state.cached('forecast', 'frame', lambda: pytest.fail('should be cached'))
+    pd.testing.assert_frame_equal(value['plan'], frame)
+    assert value['total'] == 3.5
+    raw = state.backend.get(state._key('forecast', 'frame'))
+    assert json.loads(raw)['plan']['__frame__']
+
+
+def test_values_that_are_not_json_are_refused(state):
+    with pytest.raises(TypeError):
+        state.cached('forecast', 'object', lambda: object())
+
+
+def test_rediss_urls_use_tls():
+    assert backend_from_url('rediss://cache.example.com:6380/1').ssl_context is not None
+    assert backend_from_url('redis://cache.example.com:6379/1').ssl_context is None
+
+
+def test_tls_backend_refuses_a_plaintext_server():
+    server = LocalRedisServer().start()
+    try:
+        backend = backend_from_url(server.url.replace('redis://', 'rediss://'))
+        with pytest.raises((ssl.SSLError, OSError)):
+            backend.get('key')
+    finally:
+        server.shutdown()
+        server.server_close()
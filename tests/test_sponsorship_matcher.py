@@ -0,0 +1,40 @@
+import pandas as pd
+
+from ai_modules.sponsorship_matcher import match_sponsors
+
+
+def _assigned(result):
+    return dict(zip(result['assignments']['asset_id'], result['assignments']['sponsor_id']))
+
+
+def test_one_sponsor_per_category_per_zone_but_the_owner_may_repeat():
+    assets = pd.DataFrame({'asset_id': ['A1', 'A2', 'A3'], 'price': [100, 100, 100],
+                           'zone': ['North', 'North', 'South'], 'audience': ['youth'] * 3})
+    sponsors = pd.DataFrame({'sponsor_id': ['Cola', 'Fizz'], 'budget': [1000, 1000],
+                             'category': ['beverage', 'beverage'], 'audience': ['youth', 'youth']})
+    assigned = _assigned(match_sponsors(assets, sponsors))
+    assert assigned['A1'] == assigned['A2']
+    assert len(assigned) == 3
+
+
+def test_rival_in_the_same_category_is_kept_out_of_the_zone():
+    assets = pd.DataFrame({'asset_id': ['A1', 'A2'], 'price': [100, 100], 'zone': ['North', 'North']})
+    sponsors = pd.DataFrame({'sponsor_id': ['Cola', 'Fizz', 'Bank'], 'budget': [100, 100, 1000],
+                             'category': ['beverage', 'beverage', 'finance']})
+    assigned = _assigned(match_sponsors(assets, sponsors))
+    # Each beverage sponsor can afford only one asset, so the second asset cannot go to a rival
+    assert sorted(assigned.values()) in (['Bank', 'Cola'], ['Bank', 'Fizz'])
+
+
+def test_budgets_and_exclusions_are_respected():
+    assets = pd.DataFrame({'asset_id': ['A1', 'A2', 'A3'], 'price': [300, 300, 50],
+                           'excluded_categories': ['', '', 'alcohol']})
+    sponsors = pd.DataFrame({'sponsor_id': ['Brew', 'Gym'], 'budget': [500, 60],
+                             'category': ['alcohol', 'fitness']})
+    result = match_sponsors(assets, sponsors)
+    assigned = _assigned(result)
+    spend = result['assignments'].groupby('sponsor_id')['price'].sum()
+    assert (spend <= sponsors.set_index('sponsor_id')['budget'].reindex(spend.index)).all()
+    assert assigned.get('A3') != 'Brew'
+    assert list(assigned.values()).count('Brew') == 1
+    assert not ((result['candidates']['asset_id'] == 'A3') & (result['candidates']['sponsor_id'] == 'Brew')).any()
@@ -0,0 +1,43 @@
+import pandas as pd
+import pytest
+
+from sync_engine import FakeSyncServer, SyncClient, SyncEngine, SyncState
+
+
+@pytest.fixture
+def server():
+    server = FakeSyncServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def engine(server, tmp_path):
+    return SyncEngine(SyncClient(server.url, retries=0), SyncState(str(tmp_path / 'sync.db')))
+
+
+def test_push_sends_only_changed_and_deleted_rows(server, engine):
+    ledger = pd.DataFrame({'txn_id': [1, 2, 3], 'amount': [10.0, 20.0, 30.0]})
+    assert engine.push('sheets/ledger', ledger, key='txn_id', batch_size=2)['upserted'] == 3
+    assert engine.push('sheets/ledger', ledger, key='txn_id')['batches'] == 0
+
+    edited = pd.DataFrame({'txn_id': [1, 2, 4], 'amount': [10.0, 25.0, 40.0]})
+    result = engine.push('sheets/ledger', edited, key='txn_id')
+    assert (result['upserted'], result['deleted']) == (2, 1)
+    rows = server.sources['sheets/ledger']['rows']
+    assert sorted(rows) == ['1', '2', '4']
+    assert rows['2'][1]['amount'] == 25.0
+
+
+def test_pull_resumes_from_the_cursor(server, engine):
+    for i in range(5):
+        server.write('finance/transactions', 'id', [{'id': i, 'amount': i}], [])
+    first = engine.pull('finance/transactions', page_size=2)
+    assert sorted(first['rows']['id']) == [0, 1, 2, 3, 4]
+    assert first['pages'] > 1
+
+    server.write('finance/transactions', 'id', [{'id': 9, 'amount': 9}], ['0'])
+    second = engine.pull('finance/transactions')
+    assert second['rows']['id'].tolist() == [9]
+    assert second['deleted'] == ['0']
@@ -0,0 +1,36 @@
+import time
+
+from tool_registry import CORE_MODULES, TOOL_MENU, ToolRegistry, UNLISTED_MODULES, registry
+
+
+def test_registry_groups_come_from_the_menu():
+    for category, tools in TOOL_MENU.items():
+        for module in tools.values():
+            assert registry.groups[module] == category
+    unlisted = {m for modules in UNLISTED_MODULES.values() for m in modules}
+    assert set(registry.keys()) == (set(CORE_MODULES) | unlisted
+                                    | {m for tools in TOOL_MENU.values() for m in tools.values()})
+
+
+def test_each_module_is_listed_once():
+    modules = [m for tools in TOOL_MENU.values() for m in tools.values()]
+    modules += [m for group in UNLISTED_MODULES.values() for m in group]
+    assert len(modules) == len(set(modules))
+
+
+def test_load_does_not_wait_for_the_warm_up_queue(tmp_path, monkeypatch):
+    slow = [f"slow_tool_{i}" for i in range(4)]
+    for name in slow:
+        (tmp_path / f"{name}.py").write_text('import time\ntime.sleep(0.5)\n')
+    (tmp_path / 'quick_tool.py').write_text('VALUE = 1\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    tools = ToolRegistry({'Tools': slow + ['quick_tool']})
+    assert tools.warm_up(max_workers=1)
+    assert tools.status('quick_tool') == 'queued'
+
+    started = time.perf_counter()
+    assert tools.load('quick_tool').VALUE == 1
+    assert time.perf_counter() - started < 0.4
+    assert tools.status('quick_tool') == 'loaded'
+    # A module whose warm-up import is already running is waited for, not imported twice
+    assert tools.load('slow_tool_0') is tools.load('slow_tool_0')
@@ -0,0 +1,64 @@
+import pytest
+
+from tool_search import ToolSearchIndex, tokenize
+
+ENTRIES = [
+    {'name': '📅 Schedule Builder', 'module': 'schedule_builder', 'category': 'Operations',
+     'keywords': ['calendar', 'booking']},
+    {'name': '💰 Revenue Dashboard', 'module': 'revenue_dashboard', 'category': 'Finance',
+     'keywords': ['income', 'schedule']},
+    {'name': '🤝 Sponsor Matcher', 'module': 'sponsorship_matcher', 'category': 'Sponsorship',
+     'keywords': ['partners']},
+]
+
+
+@pytest.fixture
+def index():
+    return ToolSearchIndex(ENTRIES, cache_size=2)
+
+
+def test_tokenize_drops_emoji_and_punctuation():
+    assert tokenize('📅 Schedule-Builder v2!') == ['schedule', 'builder', 'v2']
+
+
+def test_exact_word_outranks_keyword_and_prefix(index):
+    # 'schedule' is a name word for the builder but only a keyword for the dashboard
+    assert index.search('schedule') == ['📅 Schedule Builder', '💰 Revenue Dashboard']
+    assert index.search('Finance') == ['💰 Revenue Dashboard']
+
+
+def test_prefix_matches(index):
+    assert index.search('spon') == ['🤝 Sponsor Matcher']
+    assert index.search('dash') == ['💰 Revenue Dashboard']
+
+
+def test_every_query_word_must_match(index):
+    assert index.search('revenue income') == ['💰 Revenue Dashboard']
+    assert index.search('revenue partners') == []
+    assert index.search('   ') == []
+
+
+def test_typos_fall_back_to_fuzzy_matching(index):
+    assert index.search('sponsr') == ['🤝 Sponsor Matcher']
+    assert index.search('calender') == ['📅 Schedule Builder']
+    assert index.search('zzzz') == []
+
+
+def test_query_cache_hits_and_evicts_least_recently_used(index, monkeypatch):
+    calls = []
+    original = index._match
+    monkeypatch.setattr(index, '_match', lambda word: calls.append(word) or original(word))
+
+    first = index.search('Revenue')
+    first.append('mutated')
+    assert index.search('revenue') == ['💰 Revenue Dashboard']
+    assert calls == ['revenue']
+
+    index.search('spon')
+    index.search('revenue')
+    index.search('dash')  # evicts 'spon', the least recently used
+    calls.clear()
+    index.search('revenue')
+    assert calls == []
+    index.search('spon')
+    assert calls == ['spon']
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from usage_rollups import GRAINS, METRICS, UsageRollups
+
+
+def _bookings(n=300, seed=0):
+    rng = np.random.default_rng(seed)
+    start = (pd.Timestamp('2026-03-02') + pd.to_timedelta(rng.integers(0, 28 * 48, n) * 30, 'min'))
+    return pd.DataFrame({
+        'booking_id': [f"B{i}" for i in range(n)],
+        'facility': rng.choice(['North Dome', 'Ice Center'], n),
+        'surface': rng.choice(['turf', 'court', 'ice'], n),
+        'start': start,
+        'end': start + pd.to_timedelta(rng.choice([30, 60, 150], n), 'min'),
+        'revenue': rng.choice([40.0, 80.0, 120.0], n),
+    })
+
+
+def _assert_same(incremental, rebuilt):
+    for facility in (None, 'North Dome', 'Ice Center'):
+        for metric in METRICS:
+            np.testing.assert_allclose(incremental.heatmap(metric, facility).to_numpy(),
+                                       rebuilt.heatmap(metric, facility).to_numpy(), atol=1e-9)
+    for grain in GRAINS:
+        for metric in METRICS:
+            a = incremental.series(metric, grain)
+            b = rebuilt.series(metric, grain)
+            pd.testing.assert_series_equal(a[a.abs() > 1e-9], b[b.abs() > 1e-9], check_exact=False)
+
+
+def test_incremental_refresh_matches_a_full_rebuild(tmp_path):
+    bookings = _bookings()
+    incremental = UsageRollups(str(tmp_path / 'incremental.db'))
+    # Overlapping weekly extracts: every booking arrives at least once, some twice
+    for first in range(0, len(bookings), 80):
+        assert incremental.ingest_bookings(bookings.iloc[max(first - 20, 0):first + 80]) <= 80
+
+    final = bookings.copy()
+    edited = final.index[::7]
+    final.loc[edited, 'end'] = final.loc[edited, 'end'] + pd.Timedelta(minutes=45)
+    final.loc[edited, 'revenue'] += 15
+    final.loc[final.index[3::11], 'surface'] = 'court'
+    assert incremental.ingest_bookings(final) == (final != bookings).any(axis=1).sum()
+    cancelled = final['booking_id'].iloc[5::13]
+    assert incremental.cancel_bookings(cancelled) == len(cancelled)
+    assert incremental.cancel_bookings(cancelled) == 0
+
+    rebuilt = UsageRollups(str(tmp_path / 'rebuilt.db'))
+    rebuilt.ingest_bookings(final[~final['booking_id'].isin(cancelled)])
+    _assert_same(incremental, rebuilt)
+
+
+def test_cancelled_status_subtracts_and_reinstating_adds_back(tmp_path):
+    bookings = _bookings(20)
+    rollups = UsageRollups(str(tmp_path / 'rollups.db'))
+    rollups.ingest_bookings(bookings)
+    day = bookings['start'].iloc[0].normalize()
+    same_day = bookings[bookings['start'].dt.normalize() == day]
+    before = sum(t['bookings'] for t in rollups.day_totals(day).values())
+    assert before == len(same_day)
+
+    status = bookings.assign(status='confirmed')
+    status.loc[same_day.index[0], 'status'] = 'Cancelled'
+    assert rollups.ingest_bookings(status) == 1
+    assert sum(t['bookings'] for t in rollups.day_totals(day).values()) == pytest.approx(before - 1)
+    assert rollups.ingest_bookings(bookings) == 1
+    assert sum(t['bookings'] for t in rollups.day_totals(day).values()) == pytest.approx(before)
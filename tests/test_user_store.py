@@ -0,0 +1,25 @@
+import pytest
+
+from user_store import SQLiteUserStore, UserStore, hash_pw, verify_pw
+
+
+def test_user_store_is_abstract():
+    with pytest.raises(TypeError):
+        UserStore()
+
+    class ReadOnly(UserStore):
+        def get(self, email):
+            return None
+
+    with pytest.raises(TypeError):
+        ReadOnly()
+
+
+def test_sqlite_store_hashes_passwords_on_put(tmp_path):
+    store = SQLiteUserStore(str(tmp_path / 'users.db'), legacy_json='')
+    assert isinstance(store, UserStore)
+    store.put('coach@sportai.com', {'password': 'whistle', 'role': 'manager'})
+    record = store.get('coach@sportai.com')
+    assert record == {'password': hash_pw('whistle'), 'role': 'manager'}
+    assert verify_pw('whistle', record['password'])
+    assert store.get('nobody@sportai.com') is None
@@ -0,0 +1,442 @@
+"""Lazy registry of SportAI tool modules.
+
+The tool menu (TOOL_MENU) is the single declaration of module names and
+their categories, so the app can build its menu without importing
+anything. Modules that have no menu entry are listed in UNLISTED_MODULES
+so they are still registered and profiled. The real import happens the
+first time a tool is requested and the result is cached for the life of
+the process.
+"""
+import argparse
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+
+# Modules the app shell loads itself; every other module is a tool
+CORE_MODULES: List[str] = [
+    'auth',
+    'header_loader',
+]
+
+# Tool menu: category -> {display name: module key}. Each tool is listed once,
+# so dashboard grouping and counts come straight from this declaration.
+TOOL_MENU: Dict[str, Dict[str, str]] = {
+    "🤖 AI Tools": {
+        "🤖 AI Event Forecast": 'ai_event_forecast',
+        "🤖 AI Matchmaker": 'ai_matchmaker_tool',
+        "🤖 AI Revenue Maximizer": 'ai_revenue_maximizer',
+        "🤖 AI Scheduler": 'ai_scheduler_tool',
+        "🤖 AI Scheduling Suggestions": 'ai_scheduling_suggestions',
+        "🤖 AI Sponsor Finder": 'ai_sponsor_opportunity_finder',
+        "🤖 AI Strategy Dashboard": 'ai_strategy_dashboard',
+        "🤖 AI Suggestion Digest": 'ai_suggestion_digest',
+        "🤖 AI Voice Command": 'ai_voice_command',
+        "🤖 AI Facility Chat": 'ai_facility_chat',
+        "🤖 AI Voice Assistant": 'ai_voice_responder',
+        "🤖 AI Sponsor Pricing": 'ai_sponsor_pricing_trends',
+        "🤖 AI Grant Writer": 'grant_writer_ai',
+        "🤖 AI Grant Match": 'grant_match_ai',
+    },
+    "📊 Core Management": {
+        "📊 Central Dashboard": 'central_dashboard',
+        "🎯 Event Control Panel": 'event_control_panel',
+        "🎨 Event Creator AI": 'event_creator_ai',
+        "🏟️ Facility Master Tracker": 'facility_master_tracker',
+        "👥 Membership Dashboard": 'membership_dashboard',
+        "💰 Sponsor Dashboard": 'sponsor_dashboard',
+        "⚡ Real-Time Dashboard": 'real_time_dashboard',
+        "🛠️ Setup Assistant AI": 'setup_assistant_ai',
+    },
+    "🏟️ Facility Management": {
+        "🚪 Facility Access Tracker": 'facility_access_tracker',
+        "⚠️ Facility Capacity Alerts": 'facility_capacity_alerts',
+        "📋 Facility Contract Monitor": 'facility_contract_monitor',
+        "🗺️ Facility Layout Map": 'facility_layout_map',
+        "👥 Facility Membership Monitor": 'facility_membership_monitor',
+        "🔧 Complex Usage Optimizer": 'complex_usage_optimizer',
+        "🏛️ Dome Usage Tool": 'dome_usage_tool',
+        "📊 Surface Usage by Type": 'surface_usage_by_type',
+        "🔥 Surface Demand Heatmap": 'surface_demand_heatmap',
+        "📈 Adaptive Use Planner": 'adaptive_use_planner',
+    },
+    "👥 Membership & CRM": {
+        "💳 Membership Credit Tracker": 'membership_credit_tracker',
+        "👥 Membership CRM Tracker": 'membership_crm_tracker',
+        "🎯 Membership Goal Tracker": 'membership_goal_tracker',
+        "📊 Membership Insights AI": 'membership_insights_ai',
+        "🏆 Membership Loyalty Rewards": 'membership_loyalty_rewards',
+        "📢 Membership Marketing AI": 'membership_marketing_ai',
+        "🔗 Membership Ticketing Integration": 'membership_ticketing_integration',
+        "🚪 Member Portal": 'member_portal',
+        "🎯 Member Selector": 'member_selector',
+    },
+    "🤝 Sponsorship & Revenue": {
+        "🤝 Sponsorship AI Calculator": 'sponsorship_ai_calculator',
+        "📅 Sponsorship Availability": 'sponsorship_availability',
+        "📄 Sponsorship Contract Generator": 'sponsorship_contract_generator',
+        "📦 Sponsorship Inventory Manager": 'sponsorship_inventory_manager',
+        "📈 Sponsorship ROI Tracker": 'sponsorship_roi_tracker',
+        "📊 Sponsorship Tracker": 'sponsorship_tracker',
+        "🚪 Sponsor Portal": 'sponsor_portal',
+        "💰 Sponsorship Revenue Builder": 'sponsorship_revenue_builder',
+        "🎯 Sponsor Pitch Portal": 'sponsor_pitch_portal',
+        "📖 Sponsor Pitchbook Builder": 'sponsor_pitchbook_builder',
+        "📄 Sponsor PDF Packet": 'sponsor_pdf_packet',
+        "🔗 Sponsor Link Sender": 'sponsor_link_sender',
+        "🗺️ Sponsor Map Viewer": 'sponsor_map_viewer',
+    },
+    "💰 Financial Tools": {
+        "🔥 Revenue Heatmap": 'revenue_heatmap',
+        "📈 Revenue Projection Simulator": 'revenue_projection_simulator',
+        "📊 Revenue Proforma Auto": 'revenue_proforma_auto',
+        "💰 Dynamic Pricing Tool": 'dynamic_pricing_tool',
+        "💼 Finance Feed Connector": 'finance_feed_connector',
+        "🔄 Financial Feed Sync": 'financial_feed_sync',
+    },
+    "🏆 Sports & Events": {
+        "🏆 Tournament Scheduler": 'tournament_scheduler',
+        "🎮 Esports Manager": 'esports_manager',
+        "♿ Adaptive Sports Center": 'adaptive_sports_center',
+        "🏟️ League Coordinator": 'league_coordinator',
+        "👥 Team Club Manager": 'team_club_manager',
+        "📚 Sport Library": 'sport_library',
+        "💰 Event Profit Analyzer": 'event_profit_analyzer',
+        "🎯 Event Admin": 'event_admin',
+        "🌍 International Team Portal": 'international_team_portal',
+        "🏞️ Park Activity Dashboard": 'park_activity_dashboard',
+    },
+    "📋 Reporting & Documents": {
+        "📋 Board PDF Exporter": 'board_pdf_exporter',
+        "📊 Board Packet Generator": 'board_packet_pdf_generator',
+        "📅 Board Report Scheduler": 'board_report_scheduler',
+        "📄 Weekly Report Generator": 'weekly_report_generator',
+        "📥 Report Download Portal": 'report_download_portal',
+        "📄 PDF Export Tool": 'pdf_export_tool',
+    },
+    "📢 Communications": {
+        "📧 Email Notifications": 'email_notifications',
+        "📱 SMS Alert Center": 'sms_alert_center',
+        "💬 Slack Alert Center": 'slack_alert_center',
+        "⚠️ Member Alerts Auto": 'member_alerts_auto',
+        "📊 Usage Alerts Auto": 'usage_alerts_auto',
+        "📋 Contract Alerts Auto": 'contract_alerts_auto',
+        "🔐 Credential Expiry Alerts": 'credential_expiry_alerts',
+        "📅 Daily Task Scheduler": 'daily_task_scheduler',
+    },
+    "📺 Marketing & Media": {
+        "📦 Marketing Packet Builder": 'marketing_packet_builder',
+        "📖 Marketing Flipbook Generator": 'marketing_flipbook_generator',
+        "📚 Flipbook Embedder": 'flipbook_embedder',
+        "🎨 Flipbook Pitch Creator": 'flipbook_pitch_creator',
+        "🔄 Screen Rotation Scheduler": 'screen_rotation_scheduler',
+        "📺 Media Display Rotator": 'media_display_rotator',
+    },
+    "🔄 Integrations": {
+        "📊 Google Sheets Sync": 'google_sheets_sync',
+        "🔄 GSheets Sync": 'gsheets_sync',
+        "🔗 Webhook Automation": 'webhook_automation',
+        "📄 PandaDoc Contract": 'pandadoc_contract',
+        "🤖 Auto Contract Generator": 'auto_contract_generator',
+        "🔄 HubSpot Deal Logger": 'hubspot_deal_logger',
+        "📧 Mailchimp Lead Collector": 'mailchimp_lead_collector',
+    },
+    "🛠️ Utilities": {
+        "📱 Mobile Friendly UI": 'mobile_friendly_ui',
+        "📅 Visual Calendar Layout": 'visual_calendar_layout',
+        "🔧 Admin Override Console": 'admin_override_console',
+        "🏷️ Admin Sidebar Badges": 'admin_sidebar_badges',
+        "📚 Platform Guidebook": 'platform_guidebook_writer',
+        "🔗 Portal Router": 'portal_router',
+        "💎 Upsell Offer Engine": 'upsell_offer_engine',
+        "📅 Public Schedule": 'public_schedule',
+        "⏰ Expiring Link Manager": 'expiring_link_manager',
+    },
+}
+
+
+# Tool modules without a menu entry yet: reached from other tools and
+# portals, and still imported and profiled like every menu tool.
+UNLISTED_MODULES: Dict[str, List[str]] = {
+    "Grants & Fundraising": [
+        'grant_renewal_manager', 'grant_alert_center', 'grant_status_manager', 'pdf_grant_exporter',
+        'investor_kit_generator', 'investor_pitch_portal', 'funding_narrative_sync',
+    ],
+    "Donations": [
+        'donation_landing_page', 'donation_checkout', 'donation_campaign_viewer', 'donation_goal_tracker',
+        'donor_profile_creator', 'crm_export_generator', 'crm_grant_donor_sync',
+    ],
+    "Governance & Admin": [
+        'governance_admin', 'governance_diagram', 'governance_tool',
+    ],
+    "Specialty Programs": [
+        'scholarship_fund_manager', 'scholarship_tracker', 'mentorship_center', 'volunteer_hub',
+        'student_committee', 'referee_manager', 'nil_tracker', 'trail_access_planner',
+    ],
+    "Contract & Performance": [
+        'contract_insights_ai', 'contract_usage_tracker', 'performance_goal_ai',
+        'facility_membership_comparator_ai', 'sponsorship_inventory_limiter',
+    ],
+}
+
+
+def module_groups() -> Dict[str, List[str]]:
+    """Module keys per group: the core modules, each TOOL_MENU category, then the unlisted modules"""
+    groups = {'Core': list(CORE_MODULES)}
+    for category, tools in TOOL_MENU.items():
+        groups[category] = list(tools.values())
+    for group, modules in UNLISTED_MODULES.items():
+        groups[group] = list(modules)
+    return groups
+
+
+# Shortcuts shown under Quick Access in the sidebar
+QUICK_ACCESS_TOOLS: List[str] = [
+    "📊 Central Dashboard",
+    "🤖 AI Strategy Dashboard",
+    "🏟️ Facility Master Tracker",
+    "👥 Membership Dashboard",
+    "💰 Sponsor Dashboard",
+]
+
+
+# Extra search terms for tools whose names don't say what people look for
+MODULE_KEYWORDS: Dict[str, List[str]] = {
+    'ai_event_forecast': ['prediction', 'attendance'],
+    'ai_matchmaker_tool': ['pairing', 'teams'],
+    'ai_revenue_maximizer': ['pricing', 'yield'],
+    'ai_voice_command': ['speech'],
+    'ai_facility_chat': ['chatbot', 'assistant'],
+    'central_dashboard': ['overview', 'home'],
+    'facility_access_tracker': ['checkin', 'entry'],
+    'facility_layout_map': ['floorplan', 'fields'],
+    'dome_usage_tool': ['bubble', 'indoor'],
+    'surface_demand_heatmap': ['turf', 'courts', 'fields'],
+    'membership_credit_tracker': ['billing', 'balance'],
+    'membership_loyalty_rewards': ['points', 'perks'],
+    'member_portal': ['login', 'self service'],
+    'sponsorship_inventory_manager': ['signage', 'naming', 'assets'],
+    'revenue_heatmap': ['sales', 'income'],
+    'dynamic_pricing_tool': ['rates', 'prices'],
+    'tournament_scheduler': ['bracket', 'fixtures'],
+    'league_coordinator': ['season', 'standings'],
+    'referee_manager': ['officials', 'umpires'],
+    'board_pdf_exporter': ['report', 'pdf'],
+    'weekly_report_generator': ['summary'],
+    'finance_feed_connector': ['accounting', 'ledger'],
+    'financial_feed_sync': ['accounting', 'ledger'],
+    'email_notifications': ['mail', 'alerts'],
+    'sms_alert_center': ['text', 'messages'],
+    'slack_alert_center': ['chat', 'messages'],
+    'credential_expiry_alerts': ['certifications', 'licenses'],
+    'google_sheets_sync': ['spreadsheet', 'google'],
+    'gsheets_sync': ['spreadsheet', 'google'],
+    'pandadoc_contract': ['esign', 'signature'],
+    'hubspot_deal_logger': ['crm', 'sales'],
+    'mailchimp_lead_collector': ['newsletter', 'leads'],
+    'visual_calendar_layout': ['calendar', 'bookings'],
+    'public_schedule': ['calendar', 'bookings'],
+    'expiring_link_manager': ['share', 'url'],
+}
+
+
+# Per-module import cost, filled in by safe_import
+import_stats: Dict[str, Dict[str, Any]] = {}
+
+
+def _rss_kb() -> Optional[int]:
+    """Current resident set size in KB, or None where it can't be read"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak // 1024 if sys.platform == 'darwin' else peak
+    except (ImportError, OSError):
+        return None
+
+
+def safe_import(module_name):
+    """Safely import a module and return it, or None if import fails.
+
+    Wall time, RSS growth and any exception are recorded in import_stats.
+    Any exception is caught, not just ImportError, so a module that blows up
+    at import time shows up in the report instead of taking the app down.
+    """
+    rss_before = _rss_kb()
+    started = time.perf_counter()
+    module, error = None, None
+    try:
+        module = importlib.import_module(module_name)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    rss_after = _rss_kb()
+    import_stats[module_name] = {
+        'module': module_name,
+        'seconds': time.perf_counter() - started,
+        'rss_kb': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        'error': error,
+    }
+    return module
+
+
+def import_report(sort_by: str = 'seconds') -> List[Dict[str, Any]]:
+    """Recorded imports, most expensive first"""
+    return sorted(import_stats.values(), key=lambda row: row[sort_by] or 0, reverse=True)
+
+
+def format_report(rows: List[Dict[str, Any]]) -> str:
+    """Render import_report() rows as a plain-text table"""
+    lines = [f"{'module':<36} {'ms':>9} {'rss KB':>9}  error"]
+    for row in rows:
+        rss = '' if row['rss_kb'] is None else row['rss_kb']
+        lines.append(f"{row['module']:<36} {row['seconds'] * 1000:>9.1f} {rss:>9}  {row['error'] or ''}")
+    total = sum(row['seconds'] for row in rows)
+    failed = sum(1 for row in rows if row['error'])
+    lines.append(f"{len(rows)} modules, {failed} failed, {total * 1000:.1f} ms total")
+    return '\n'.join(lines)
+
+
+class ToolRegistry:
+    """Known tool modules, imported on first use and cached per process."""
+
+    def __init__(self, module_groups: Dict[str, List[str]]):
+        self.groups = {}
+        for group, keys in module_groups.items():
+            for key in keys:
+                self.groups[key] = group
+        self._loaded = {}
+        self._available = {}
+        self._pending = {}
+        self._warm_started = False
+        self._lock = threading.Lock()
+
+    def keys(self) -> List[str]:
+        return list(self.groups)
+
+    def is_available(self, key: str) -> bool:
+        """Check that a module can be found without executing it."""
+        if key not in self.groups:
+            return False
+        found = self._available.get(key)
+        if found is None:
+            try:
+                found = importlib.util.find_spec(key) is not None
+            except (ImportError, ValueError):
+                found = False
+            self._available[key] = found
+        return found
+
+    def available(self) -> List[str]:
+        return [k for k in self.groups if self.is_available(k)]
+
+    def load(self, key: str):
+        """Import a module the first time it is asked for; None if it fails.
+
+        If a warm-up is running, this waits only for this module's import:
+        a queued warm-up import is cancelled and done inline, and only one
+        already in progress is waited for.
+        """
+        if key in self._loaded:
+            return self._loaded[key]
+        if key not in self.groups:
+            return None
+        pending = self._pending.get(key)
+        if pending is not None and not pending.cancel():
+            pending.result()
+            if key in self._loaded:
+                return self._loaded[key]
+        return self._import(key)
+
+    def _import(self, key: str):
+        # The import system already serialises concurrent imports of one
+        # module, so the lock only guards the cache itself.
+        module = safe_import(key)
+        with self._lock:
+            return self._loaded.setdefault(key, module)
+
+    def _warm(self, key: str):
+        if key not in self._loaded and self.is_available(key):
+            self._import(key)
+
+    def warm_up(self, max_workers: int = 4) -> bool:
+        """Import every available module in a background thread pool.
+
+        Runs at most once per process and returns False if already started.
+        Import timings in import_stats overlap while this is running, so the
+        RSS column is only indicative for warmed-up modules.
+        """
+        with self._lock:
+            if self._warm_started:
+                return False
+            self._warm_started = True
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='tool-warmup')
+            for key in self.groups:
+                if key not in self._loaded:
+                    self._pending[key] = executor.submit(self._warm, key)
+        executor.shutdown(wait=False)
+        return True
+
+    def status(self, key: str) -> str:
+        """Readiness of one module: loaded, failed, loading, queued or not loaded"""
+        if key in self._loaded:
+            return 'loaded' if self._loaded[key] is not None else 'failed'
+        pending = self._pending.get(key)
+        if pending is None or pending.done():
+            return 'not loaded'
+        return 'loading' if pending.running() else 'queued'
+
+    def readiness(self) -> Dict[str, int]:
+        """Count of registered modules in each status"""
+        counts = {}
+        for key in self.groups:
+            state = self.status(key)
+            counts[state] = counts.get(state, 0) + 1
+        return counts
+
+    def loaded(self) -> Dict[str, object]:
+        """Modules that imported successfully so far."""
+        return {k: v for k, v in self._loaded.items() if v is not None}
+
+    def failed(self) -> List[str]:
+        """Modules that were found or requested but failed to import."""
+        return [k for k, v in self._loaded.items() if v is None]
+
+    def refresh(self):
+        """Forget cached availability so new or removed files are noticed."""
+        importlib.invalidate_caches()
+        self._available.clear()
+
+
+registry = ToolRegistry(module_groups())
+
+
+def main(argv=None):
+    """Import every registered module and print the cost report without Streamlit"""
+    parser = argparse.ArgumentParser(description='Profile SportAI tool module imports.')
+    parser.add_argument('--sort', choices=['seconds', 'rss_kb'], default='seconds')
+    parser.add_argument('--failed-only', action='store_true', help='only list modules that failed to import')
+    args = parser.parse_args(argv)
+
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    if base_dir not in sys.path:
+        sys.path.insert(0, base_dir)
+    for key in registry.keys():
+        registry.load(key)
+
+    rows = import_report(args.sort)
+    if args.failed_only:
+        rows = [row for row in rows if row['error']]
+    print(format_report(rows))
+    return 1 if any(row['error'] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
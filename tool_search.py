@@ -0,0 +1,100 @@
+"""Search index for the sidebar tool filter.
+
+Built once from the tool menu. Each tool is indexed by the words in its
+display name, category, module key and keywords; every prefix of every word
+maps to the tools containing it, so a query is a handful of dict lookups
+instead of a scan over the whole catalogue. Words that match nothing by
+prefix fall back to fuzzy matching against the vocabulary.
+"""
+import difflib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Tuple
+
+# How much a match in each field counts towards a tool's rank
+FIELD_WEIGHTS = {
+    'name': 3.0,
+    'keywords': 2.0,
+    'category': 1.5,
+    'module': 1.0,
+}
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase words and numbers; emoji and punctuation are dropped"""
+    return re.findall(r'[a-z0-9]+', text.lower())
+
+
+class ToolSearchIndex:
+    """Token and prefix index over tool names with fuzzy fallback and a query cache."""
+
+    def __init__(self, entries: Iterable[Dict[str, object]], cache_size: int = 512):
+        self.names: List[str] = []
+        # prefix -> {tool position: best weight for that prefix}
+        self._prefixes: Dict[str, Dict[int, float]] = {}
+        # full word -> {tool position: best weight}
+        self._words: Dict[str, Dict[int, float]] = {}
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+        self._lock = threading.Lock()
+
+        for entry in entries:
+            position = len(self.names)
+            self.names.append(entry['name'])
+            for field, weight in FIELD_WEIGHTS.items():
+                value = entry.get(field) or ''
+                text = ' '.join(value) if isinstance(value, (list, tuple)) else str(value)
+                for word in tokenize(text):
+                    self._add(self._words, word, position, weight)
+                    for end in range(1, len(word) + 1):
+                        self._add(self._prefixes, word[:end], position, weight)
+        self._vocabulary = sorted(self._words)
+
+    @staticmethod
+    def _add(table: Dict[str, Dict[int, float]], key: str, position: int, weight: float):
+        hits = table.setdefault(key, {})
+        if weight > hits.get(position, 0.0):
+            hits[position] = weight
+
+    def _match(self, word: str) -> Dict[int, float]:
+        """Scores for one query word: exact > prefix > fuzzy"""
+        scores = dict(self._prefixes.get(word, {}))
+        for position, weight in self._words.get(word, {}).items():
+            scores[position] = weight * 1.5
+        if scores:
+            return scores
+        for close in difflib.get_close_matches(word, self._vocabulary, n=3, cutoff=0.75):
+            similarity = difflib.SequenceMatcher(None, word, close).ratio()
+            for position, weight in self._words[close].items():
+                scores[position] = max(scores.get(position, 0.0), weight * similarity)
+        return scores
+
+    def search(self, query: str) -> List[str]:
+        """Tool names matching every word of the query, best match first"""
+        words = tokenize(query)
+        if not words:
+            return []
+        key = ' '.join(words)
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                return list(self._cache[key])
+
+        totals = None
+        for word in words:
+            scores = self._match(word)
+            if totals is None:
+                totals = scores
+            else:
+                totals = {p: totals[p] + s for p, s in scores.items() if p in totals}
+            if not totals:
+                break
+        ranked: List[Tuple[float, int]] = sorted(((-s, p) for p, s in (totals or {}).items()))
+        result = tuple(self.names[p] for _, p in ranked)
+
+        with self._lock:
+            self._cache[key] = result
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return list(result)
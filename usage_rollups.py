@@ -0,0 +1,387 @@
+"""Materialized usage and revenue rollups for heatmaps and dashboards.
+
+    from usage_rollups import get_rollups
+    rollups = get_rollups()
+    rollups.ingest_bookings(new_bookings)         # incremental and idempotent
+    rollups.cancel_bookings(['B1042'])
+    grid = rollups.heatmap('hours', facility='North Dome')   # surfaces x 7 weekdays x 24 hours
+    daily = rollups.series('revenue', grain='day', start='2026-01-01')
+
+Bookings and transactions are folded into totals once, when they arrive,
+instead of on every render:
+- facility x surface x hour, day and week totals, stored in SQLite, indexed
+  by time bucket.
+- facility x surface x weekday x hour-of-day cells, held in memory as one
+  NumPy cube.
+
+A heatmap is a slice of the cube and a series is a range scan, so read cost
+depends on the grid size and the requested range, not on how many seasons
+of history have been ingested. The last folded-in state of each event id
+is kept, so re-ingesting an overlapping extract is safe, and an edited or
+cancelled booking has its old contribution subtracted before the new one
+is added. Other worker processes notice new data through a version counter
+and reload the cube, which is small.
+
+bookings: ``booking_id, facility, surface, start, end[, revenue][, status]``
+transactions: ``txn_id, facility, surface, timestamp, amount``
+"""
+import argparse
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+ROLLUP_DB = 'usage_rollups.db'
+METRICS = ('bookings', 'hours', 'revenue')
+GRAINS = {'hour': 'rollup_hour', 'day': 'rollup_day', 'week': 'rollup_week'}
+WEEKDAYS = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+EVENT_COLUMNS = ('facility', 'surface', 'start', 'end', 'value')
+CANCELLED = ('cancelled', 'canceled')
+
+
+def _epoch_hours(values: pd.Series) -> np.ndarray:
+    """Timestamps as fractional hours since 1970-01-01 (naive local time)"""
+    stamps = pd.to_datetime(values)
+    if stamps.dt.tz is not None:
+        stamps = stamps.dt.tz_localize(None)
+    return stamps.to_numpy('datetime64[s]').astype(np.int64) / 3600.0
+
+
+def _buckets(hours: np.ndarray) -> Dict[str, np.ndarray]:
+    hour = hours.astype(np.int64)
+    day = hour // 24
+    # 1970-01-01 was a Thursday; +3 makes weeks (and weekday 0) start on Monday
+    return {'hour': hour, 'day': day, 'week': (day + 3) // 7, 'weekday': (day + 3) % 7, 'hour_of_day': hour % 24}
+
+
+def _bucket_start(grain: str, bucket: np.ndarray) -> pd.DatetimeIndex:
+    hours = {'hour': bucket, 'day': bucket * 24, 'week': (bucket * 7 - 3) * 24}[grain]
+    return pd.to_datetime(np.asarray(hours, dtype=np.int64) * 3600, unit='s')
+
+
+class UsageRollups:
+    """Incrementally maintained rollup tables plus an in-memory weekday x hour cube"""
+
+    def __init__(self, path: str = ROLLUP_DB):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        conn = self._conn()
+        for table in GRAINS.values():
+            conn.execute(f'CREATE TABLE IF NOT EXISTS {table} (facility INTEGER NOT NULL, surface INTEGER NOT NULL, '
+                         'bucket INTEGER NOT NULL, bookings REAL NOT NULL, hours REAL NOT NULL, revenue REAL NOT NULL, '
+                         'PRIMARY KEY (bucket, facility, surface)) WITHOUT ROWID')
+        conn.execute('CREATE TABLE IF NOT EXISTS heatmap_cells (facility INTEGER NOT NULL, surface INTEGER NOT NULL, '
+                     'weekday INTEGER NOT NULL, hour INTEGER NOT NULL, bookings REAL NOT NULL, hours REAL NOT NULL, '
+                     'revenue REAL NOT NULL, PRIMARY KEY (facility, surface, weekday, hour)) WITHOUT ROWID')
+        conn.execute('CREATE TABLE IF NOT EXISTS dims (kind TEXT NOT NULL, name TEXT NOT NULL, code INTEGER NOT NULL, '
+                     'PRIMARY KEY (kind, name))')
+        # The last folded-in state of every event, so an edit or cancellation can be subtracted
+        conn.execute('CREATE TABLE IF NOT EXISTS ingested (feed TEXT NOT NULL, event_id TEXT NOT NULL, '
+                     'facility TEXT NOT NULL, surface TEXT NOT NULL, start REAL NOT NULL, end REAL NOT NULL, '
+                     'value REAL NOT NULL, active INTEGER NOT NULL, PRIMARY KEY (feed, event_id)) WITHOUT ROWID')
+        conn.execute('CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL)')
+        conn.execute("INSERT OR IGNORE INTO meta (key, value) VALUES ('version', 0)")
+        self._cube: Optional[np.ndarray] = None
+        self._cube_version = -1
+        self._dims: Dict[str, Dict[str, int]] = {'facility': {}, 'surface': {}}
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def version(self) -> int:
+        return self._conn().execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def _codes(self, conn: sqlite3.Connection, kind: str, names: pd.Series) -> np.ndarray:
+        """Integer code per name, assigning new codes inside the caller's transaction"""
+        known = dict(conn.execute('SELECT name, code FROM dims WHERE kind = ?', (kind,)).fetchall())
+        new = [name for name in pd.unique(names) if name not in known]
+        for name in new:
+            known[name] = len(known)
+        conn.executemany('INSERT INTO dims (kind, name, code) VALUES (?, ?, ?)', [(kind, n, known[n]) for n in new])
+        return names.map(known).to_numpy(np.int64)
+
+    def _previous(self, conn: sqlite3.Connection, feed: str, ids: pd.Series) -> pd.DataFrame:
+        """What was last folded in for these event ids, indexed by event id"""
+        conn.execute('CREATE TEMP TABLE IF NOT EXISTS batch_ids (event_id TEXT PRIMARY KEY)')
+        conn.execute('DELETE FROM batch_ids')
+        conn.executemany('INSERT OR IGNORE INTO batch_ids (event_id) VALUES (?)', ((i,) for i in ids))
+        rows = conn.execute(
+            'SELECT i.event_id, i.facility, i.surface, i.start, i.end, i.value, i.active FROM ingested i '
+            'JOIN batch_ids b ON i.event_id = b.event_id WHERE i.feed = ?', (feed,)).fetchall()
+        return pd.DataFrame(rows, columns=['event_id', *EVENT_COLUMNS, 'active']).set_index('event_id')
+
+    def ingest_bookings(self, bookings: pd.DataFrame) -> int:
+        """Fold new, edited and cancelled bookings into every rollup; returns how many changed.
+
+        A booking id seen before with different fields is an edit: its old
+        contribution is subtracted and the new one added. A ``status`` of
+        cancelled (or ``cancel_bookings``) subtracts it.
+        """
+        if bookings.empty:
+            return 0
+        revenue = (pd.to_numeric(bookings['revenue'], errors='coerce').fillna(0).to_numpy(float)
+                   if 'revenue' in bookings else np.zeros(len(bookings)))
+        events = pd.DataFrame({
+            'event_id': bookings['booking_id'].astype(str).to_numpy(),
+            'facility': bookings['facility'].astype(str).to_numpy(),
+            'surface': bookings['surface'].astype(str).to_numpy(),
+            'start': _epoch_hours(bookings['start']),
+            'end': _epoch_hours(bookings['end']),
+            'value': revenue,
+        })
+        cancelled = (bookings['status'].astype(str).str.lower().isin(CANCELLED).to_numpy()
+                     if 'status' in bookings else np.zeros(len(bookings), dtype=bool))
+        return self._ingest('bookings', events, cancelled)
+
+    def cancel_bookings(self, booking_ids) -> int:
+        """Subtract cancelled bookings from every rollup; returns how many were still counted"""
+        ids = pd.Series(list(booking_ids), dtype=object).astype(str)
+        if ids.empty:
+            return 0
+        with self._lock:
+            known = self._previous(self._conn(), 'bookings', ids)
+        if known.empty:
+            return 0
+        events = known[list(EVENT_COLUMNS)].reset_index()
+        return self._ingest('bookings', events, np.ones(len(events), dtype=bool))
+
+    def ingest_transactions(self, transactions: pd.DataFrame) -> int:
+        """Fold new or corrected revenue transactions into every rollup; returns how many changed"""
+        if transactions.empty:
+            return 0
+        hours = _epoch_hours(transactions['timestamp'])
+        events = pd.DataFrame({
+            'event_id': transactions['txn_id'].astype(str).to_numpy(),
+            'facility': transactions['facility'].astype(str).to_numpy(),
+            'surface': transactions['surface'].astype(str).to_numpy(),
+            'start': hours,
+            'end': hours,
+            'value': pd.to_numeric(transactions['amount'], errors='coerce').fillna(0).to_numpy(float),
+        })
+        return self._ingest('transactions', events, np.zeros(len(events), dtype=bool))
+
+    @staticmethod
+    def _contributions(feed: str, events: pd.DataFrame):
+        """(event row, hour bucket, bookings, hours, revenue) per bucket each event touches"""
+        start, end = events['start'].to_numpy(float), events['end'].to_numpy(float)
+        value = events['value'].to_numpy(float)
+        if feed == 'transactions':
+            zeros = np.zeros(len(events))
+            return np.arange(len(events)), np.floor(start), zeros, zeros, value
+        end = np.maximum(end, start)
+        # Spread booked hours over every hour bucket a booking overlaps
+        first = np.floor(start)
+        spans = np.maximum(np.ceil(end) - first, 1).astype(np.int64)
+        row = np.repeat(np.arange(len(events)), spans)
+        offset = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        bucket = first[row] + offset
+        hours = np.minimum(end[row], bucket + 1) - np.maximum(start[row], bucket)
+        is_start = offset == 0
+        return row, bucket, is_start.astype(float), np.clip(hours, 0, 1), np.where(is_start, value[row], 0.0)
+
+    def _ingest(self, feed: str, events: pd.DataFrame, cancelled: np.ndarray) -> int:
+        # The last row for an id within one batch is its current state
+        keep = ~events['event_id'].duplicated(keep='last').to_numpy()
+        events, cancelled = events[keep].reset_index(drop=True), cancelled[keep]
+        conn = self._conn()
+        with self._lock:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                previous = self._previous(conn, feed, events['event_id']).reindex(events['event_id'])
+                known = previous['active'].notna().to_numpy()
+                was_active = (previous['active'] == 1).to_numpy()
+                same = known.copy()
+                for column in EVENT_COLUMNS:
+                    same &= (previous[column].to_numpy() == events[column].to_numpy())
+                changed = ~(same & (was_active == ~cancelled))
+                if not changed.any():
+                    conn.execute('ROLLBACK')
+                    return 0
+                # Subtract what was folded in before, add the current state
+                old = previous[changed & was_active][list(EVENT_COLUMNS)].reset_index()
+                new = events[changed & ~cancelled]
+                delta = pd.concat([old, new], ignore_index=True)
+                sign = np.concatenate([-np.ones(len(old)), np.ones(len(new))])
+                if len(delta):
+                    self._fold(conn, feed, delta, sign)
+                stored = events[changed].assign(active=(~cancelled[changed]).astype(int))
+                conn.executemany(
+                    'INSERT INTO ingested (feed, event_id, facility, surface, start, end, value, active) '
+                    'VALUES (?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT(feed, event_id) DO UPDATE SET '
+                    'facility = excluded.facility, surface = excluded.surface, start = excluded.start, '
+                    'end = excluded.end, value = excluded.value, active = excluded.active',
+                    ((feed, *row) for row in stored[['event_id', *EVENT_COLUMNS, 'active']].itertuples(
+                        index=False, name=None)))
+                conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+                conn.execute('COMMIT')
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+            # Everything is committed; the next read reloads the cube (a few thousand cells)
+            self._cube_version = -1
+        return int(changed.sum())
+
+    def _fold(self, conn: sqlite3.Connection, feed: str, delta: pd.DataFrame, sign: np.ndarray):
+        """Add signed contributions to every rollup table and heatmap cell"""
+        facility = self._codes(conn, 'facility', delta['facility'])
+        surface = self._codes(conn, 'surface', delta['surface'])
+        row, bucket, bookings, hours, revenue = self._contributions(feed, delta)
+        parts = _buckets(bucket)
+        values = pd.DataFrame({'facility': facility[row], 'surface': surface[row],
+                               'bookings': bookings * sign[row], 'hours': hours * sign[row],
+                               'revenue': revenue * sign[row]})
+        for grain, table in GRAINS.items():
+            totals = values.assign(bucket=parts[grain]).groupby(['bucket', 'facility', 'surface'], sort=False).sum()
+            conn.executemany(
+                f'INSERT INTO {table} (bucket, facility, surface, bookings, hours, revenue) '
+                'VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT(bucket, facility, surface) DO UPDATE SET '
+                'bookings = bookings + excluded.bookings, hours = hours + excluded.hours, '
+                'revenue = revenue + excluded.revenue',
+                totals.reset_index().itertuples(index=False, name=None))
+        cells = values.assign(weekday=parts['weekday'], hour=parts['hour_of_day']).groupby(
+            ['facility', 'surface', 'weekday', 'hour'], sort=False).sum().reset_index()
+        conn.executemany(
+            'INSERT INTO heatmap_cells (facility, surface, weekday, hour, bookings, hours, revenue) '
+            'VALUES (?, ?, ?, ?, ?, ?, ?) ON CONFLICT(facility, surface, weekday, hour) DO UPDATE SET '
+            'bookings = bookings + excluded.bookings, hours = hours + excluded.hours, '
+            'revenue = revenue + excluded.revenue',
+            cells[['facility', 'surface', 'weekday', 'hour', *METRICS]].itertuples(index=False, name=None))
+
+    def _load_cube(self):
+        version = self.version()
+        if version == self._cube_version:
+            return
+        with self._lock:
+            conn = self._conn()
+            dims = {'facility': {}, 'surface': {}}
+            for kind, name, code in conn.execute('SELECT kind, name, code FROM dims'):
+                dims[kind][name] = code
+            cells = np.array(conn.execute(
+                'SELECT facility, surface, weekday, hour, bookings, hours, revenue FROM heatmap_cells').fetchall(),
+                dtype=float).reshape(-1, 7)
+            cube = np.zeros((max(len(dims['facility']), 1), max(len(dims['surface']), 1), 7, 24, len(METRICS)))
+            if len(cells):
+                index = cells[:, :4].astype(np.int64)
+                cube[index[:, 0], index[:, 1], index[:, 2], index[:, 3]] = cells[:, 4:]
+            self._cube, self._dims, self._cube_version = cube, dims, version
+
+    def facilities(self) -> List[str]:
+        self._load_cube()
+        return sorted(self._dims['facility'], key=self._dims['facility'].get)
+
+    def surfaces(self) -> List[str]:
+        self._load_cube()
+        return sorted(self._dims['surface'], key=self._dims['surface'].get)
+
+    def heatmap(self, metric: str = 'hours', facility: Optional[str] = None) -> pd.DataFrame:
+        """Weekday x hour-of-day totals summed over surfaces (and facilities unless one is given)"""
+        grid = self.heatmap_array(metric, facility).sum(axis=0)
+        return pd.DataFrame(grid, index=WEEKDAYS, columns=range(24))
+
+    def heatmap_array(self, metric: str = 'hours', facility: Optional[str] = None) -> np.ndarray:
+        """surface x weekday x hour-of-day array for one facility, or all facilities summed"""
+        self._load_cube()
+        cube, dims = self._cube, self._dims
+        values = cube[..., METRICS.index(metric)]
+        if facility is None:
+            return values.sum(axis=0)
+        if facility not in dims['facility']:
+            return np.zeros(values.shape[1:])
+        return values[dims['facility'][facility]]
+
+    def day_totals(self, day) -> Dict[str, Dict[str, float]]:
+        """Per-facility totals for one calendar day, summed over surfaces"""
+        bucket = int(_buckets(_epoch_hours(pd.Series([pd.Timestamp(day)])))['day'][0])
+        rows = self._conn().execute(
+            "SELECT d.name, SUM(r.bookings), SUM(r.hours), SUM(r.revenue) FROM rollup_day r "
+            "JOIN dims d ON d.kind = 'facility' AND d.code = r.facility WHERE r.bucket = ? GROUP BY d.name",
+            (bucket,)).fetchall()
+        return {name: dict(zip(METRICS, values)) for name, *values in rows}
+
+    def series(self, metric: str = 'revenue', grain: str = 'day', start=None, end=None,
+               facility: Optional[str] = None, surface: Optional[str] = None) -> pd.Series:
+        """Totals per time bucket over [start, end), read from the rollup for that grain"""
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric '{metric}'")
+        table = GRAINS[grain]
+        clauses, args = [], []
+        for bound, op in ((start, '>='), (end, '<')):
+            if bound is not None:
+                clauses.append(f'bucket {op} ?')
+                args.append(int(_buckets(_epoch_hours(pd.Series([bound])))[grain][0]))
+        self._load_cube()
+        for kind, name in (('facility', facility), ('surface', surface)):
+            if name is not None:
+                clauses.append(f'{kind} = ?')
+                args.append(self._dims[kind].get(name, -1))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        rows = self._conn().execute(
+            f'SELECT bucket, SUM({metric}) FROM {table} {where} GROUP BY bucket ORDER BY bucket', args).fetchall()
+        if not rows:
+            return pd.Series([], dtype=float, name=metric)
+        buckets, totals = zip(*rows)
+        return pd.Series(totals, index=_bucket_start(grain, np.array(buckets)), name=metric)
+
+
+def build_weekly_report(params: Dict, output_path: str):
+    """Report-job builder: weekly bookings, hours and revenue as a text PDF.
+
+    params: ``db``, ``end`` (exclusive week start), ``weeks`` and optionally
+    ``facility``. Runs in a report worker process, not a script thread.
+    """
+    from report_jobs import build_text_pdf
+
+    rollups = UsageRollups(params['db'])
+    facility = params.get('facility')
+    end = pd.Timestamp(params['end'])
+    start = end - pd.Timedelta(weeks=int(params.get('weeks', 12)))
+    weekly = pd.DataFrame({metric: rollups.series(metric, 'week', start, end, facility) for metric in METRICS})
+    weekly = weekly.reindex(pd.date_range(start, end, freq='7D', inclusive='left'), fill_value=0).fillna(0)
+    lines = [f"Facility: {facility or 'All facilities'}",
+             f"Weeks starting {start:%Y-%m-%d} to {end - pd.Timedelta(days=1):%Y-%m-%d}", '',
+             'Week of      Bookings     Hours       Revenue']
+    lines += [f"{week:%Y-%m-%d}   {row.bookings:>8,.0f}  {row.hours:>8,.1f}  ${row.revenue:>12,.2f}"
+              for week, row in weekly.iterrows()]
+    total = weekly.sum()
+    lines += ['', f"Total        {total['bookings']:>8,.0f}  {total['hours']:>8,.1f}  ${total['revenue']:>12,.2f}"]
+    build_text_pdf({'title': params.get('title', 'Weekly Usage Report'), 'lines': lines}, output_path)
+
+
+_rollups: Dict[str, UsageRollups] = {}
+_rollups_lock = threading.Lock()
+
+
+def get_rollups(path: Optional[str] = None) -> UsageRollups:
+    """Process-wide rollups for SPORTAI_ROLLUP_DB"""
+    path = path or os.environ.get('SPORTAI_ROLLUP_DB', ROLLUP_DB)
+    with _rollups_lock:
+        if path not in _rollups:
+            _rollups[path] = UsageRollups(path)
+        return _rollups[path]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Fold booking or transaction CSVs into the usage rollups.')
+    parser.add_argument('kind', choices=['bookings', 'transactions'])
+    parser.add_argument('paths', nargs='+')
+    parser.add_argument('--db', default=None)
+    parser.add_argument('--chunksize', type=int, default=100000)
+    args = parser.parse_args(argv)
+    rollups = get_rollups(args.db)
+    ingest = rollups.ingest_bookings if args.kind == 'bookings' else rollups.ingest_transactions
+    for path in args.paths:
+        added = sum(ingest(chunk) for chunk in pd.read_csv(path, chunksize=args.chunksize))
+        print(f"{path}: {added} new {args.kind}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""User account storage for SportAI.
+
+`UserStore` is the interface the app talks to; `SQLiteUserStore` is the
+default backend. Records are looked up by email through the table's primary
+key index and written one at a time, so a login never reads or rewrites the
+whole user table.
+"""
+import abc
+import hashlib
+import hmac
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+
+
+def hash_pw(password: str) -> str:
+    """Return the hex sha256 digest stored for a password"""
+    return hashlib.sha256(password.encode('utf-8')).hexdigest()
+
+
+def verify_pw(password: str, hashed: str) -> bool:
+    """Check a plaintext password against its stored digest"""
+    return hmac.compare_digest(hash_pw(password), hashed)
+
+
+def is_hashed(password: str) -> bool:
+    """Stored passwords are hex sha256; anything else is a legacy plaintext value"""
+    return len(password) == 64 and all(c in '0123456789abcdef' for c in password)
+
+
+DEFAULT_USERS = {
+    "admin@sportai.com": {"password": hash_pw("admin123"), "role": "admin"},
+    "manager@sportai.com": {"password": hash_pw("manager123"), "role": "manager"},
+    "user@sportai.com": {"password": hash_pw("user123"), "role": "user"},
+}
+
+
+class UserStore(abc.ABC):
+    """Interface for user lookups; backends implement get and put."""
+
+    @abc.abstractmethod
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        """The user's record (``password`` digest and ``role``), or None"""
+
+    @abc.abstractmethod
+    def put(self, email: str, record: Dict[str, Any]):
+        """Create or replace a user's record"""
+
+
+class SQLiteUserStore(UserStore):
+    """User table in a local SQLite file with a small read-through cache.
+
+    Legacy plaintext passwords are upgraded to sha256 the first time their
+    record is read, one row at a time. On first use the table is seeded from
+    an existing users.json if there is one, otherwise from DEFAULT_USERS.
+    """
+
+    def __init__(self, path: str = 'users.db', legacy_json: str = 'users.json',
+                 cache_size: int = 256, cache_ttl: float = 30.0):
+        self.path = path
+        self.cache_size = cache_size
+        self.cache_ttl = cache_ttl
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()
+        self._setup(legacy_json)
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are not shared between Streamlit script threads
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def _setup(self, legacy_json: str):
+        conn = self._conn()
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS users ('
+            'email TEXT PRIMARY KEY, password TEXT NOT NULL, role TEXT NOT NULL)'
+        )
+        if conn.execute('SELECT 1 FROM users LIMIT 1').fetchone():
+            return
+        users = DEFAULT_USERS
+        if legacy_json and os.path.exists(legacy_json):
+            with open(legacy_json, 'r') as f:
+                users = json.load(f)
+        # INSERT OR IGNORE keeps concurrent workers from seeding twice
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR IGNORE INTO users (email, password, role) VALUES (?, ?, ?)',
+                [(email, u['password'], u.get('role', 'user')) for email, u in users.items()],
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get(self, email: str) -> Optional[Dict[str, Any]]:
+        now = time.monotonic()
+        with self._cache_lock:
+            hit = self._cache.get(email)
+            if hit and now - hit[0] < self.cache_ttl:
+                self._cache.move_to_end(email)
+                return dict(hit[1])
+
+        row = self._conn().execute(
+            'SELECT password, role FROM users WHERE email = ?', (email,)
+        ).fetchone()
+        if row is None:
+            return None
+        record = {'password': row[0], 'role': row[1]}
+        if not is_hashed(record['password']):
+            record['password'] = self._upgrade(email, record['password'])
+
+        with self._cache_lock:
+            self._cache[email] = (now, record)
+            self._cache.move_to_end(email)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return dict(record)
+
+    def _upgrade(self, email: str, plaintext: str) -> str:
+        """Hash one legacy password; the WHERE clause makes racing workers harmless"""
+        hashed = hash_pw(plaintext)
+        self._conn().execute(
+            'UPDATE users SET password = ? WHERE email = ? AND password = ?',
+            (hashed, email, plaintext),
+        )
+        return hashed
+
+    def put(self, email: str, record: Dict[str, Any]):
+        password = record['password']
+        if not is_hashed(password):
+            password = hash_pw(password)
+        self._conn().execute(
+            'INSERT INTO users (email, password, role) VALUES (?, ?, ?) '
+            'ON CONFLICT(email) DO UPDATE SET password = excluded.password, role = excluded.role',
+            (email, password, record.get('role', 'user')),
+        )
+        with self._cache_lock:
+            self._cache.pop(email, None)
+
+    def __len__(self) -> int:
+        return self._conn().execute('SELECT COUNT(*) FROM users').fetchone()[0]
@@ -0,0 +1,54 @@
+"""Weekly Report Generator: bookings, hours and revenue per week as a PDF.
+
+Numbers come from the usage rollups. The PDF is built by the report job
+queue in a worker process, so building never holds this script thread, and
+the same facility, range and rollup version is built once and shared by
+every session that asks for it.
+"""
+import os
+from datetime import date, timedelta
+from functools import partial
+
+import streamlit as st
+
+from report_jobs import jobs
+from usage_rollups import get_rollups
+
+BUILDER = 'usage_rollups:build_weekly_report'
+
+
+def run():
+    st.title("📄 Weekly Report Generator")
+    rollups = get_rollups()
+    facilities = rollups.facilities()
+    if not facilities:
+        st.info("💡 No usage history yet. Load it with `python usage_rollups.py bookings <export.csv>`.")
+        return
+
+    col1, col2 = st.columns(2)
+    choice = col1.selectbox("Facility", ["All Facilities"] + facilities, key="weekly_report_facility")
+    weeks = col2.selectbox("Weeks", [4, 12, 26, 52], index=1, key="weekly_report_weeks")
+    facility = None if choice == "All Facilities" else choice
+
+    if st.button("📄 Build Report", key="weekly_report_build"):
+        # Up to and including the current week; the rollup version makes new bookings a new report
+        end = date.today() + timedelta(days=7 - date.today().weekday())
+        title = f"Weekly Usage Report - {choice}"
+        params = {'db': os.path.abspath(rollups.path), 'version': rollups.version(), 'facility': facility,
+                  'weeks': weeks, 'end': end.isoformat(), 'title': title}
+        st.session_state['weekly_report_job'] = jobs.submit(BUILDER, params, title=title)
+
+    job_id = st.session_state.get('weekly_report_job')
+    job = jobs.status(job_id) if job_id else None
+    if job is None:
+        return
+    if job['status'] == 'done':
+        # The file is read only when the button is clicked, not on every rerun
+        st.download_button("⬇️ Download PDF", partial(jobs.read_artifact, job_id),
+                           file_name=f"weekly_usage_report_{job_id[:8]}.pdf", mime="application/pdf",
+                           key="weekly_report_download")
+    elif job['status'] == 'failed':
+        st.error(f"❌ Report failed: {job['error']}")
+    else:
+        st.info("⏳ Building the report in the background. It also appears under Report Jobs for admins.")
+        st.button("🔄 Refresh", key="weekly_report_refresh")